@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -74,7 +75,97 @@ API_DESCRIPTION = '''API REST pour la gestion des Open Badges v3.0
 Endpoints disponibles :
 - GET /api/v3/badges/ : Liste des badges
 - GET /api/v3/badges/{id}/ : Détails d'un badge
-- GET /api/v3/badges/{id}/achievement/ : Achievement d'un badge'''
+- GET /api/v3/badges/{id}/achievement/ : Achievement d'un badge
+- GET /api/v3/badges/export/?format=json|ndjson : Export en flux de tous les badges
+- GET|POST /api/v3/badges/batch/ : Lecture groupée de plusieurs badges
+- GET /api/v3/badges/{id}/baked/ : Image du badge avec le credential intégré (PNG ou SVG)
+- GET /api/v3/badges/baked/?badge_class={id} : Archive ZIP des badges cuits d'une cohorte
+- GET /api/v3/issuers/{id}/ : Profile d'un émetteur (cible de ?issuer=ref)
+- POST /api/v3/verify/ : Vérification en masse de credentials signés
+- POST /api/v3/verify/baked/ : Extraction et vérification du credential d'un badge cuit (PNG ou SVG)
+- GET /api/v3/status-lists/{id}/ : Liste de statut de révocation d'un émetteur (compressée)
+- GET /api/v3/async/... : Variantes asynchrones (ASGI) des endpoints de lecture'''
+
+# Pagination par curseur de l'API JSON-LD
+API_PAGE_SIZE = 50
+API_MAX_PAGE_SIZE = 500
+
+# Taille des lots lus par l'export en flux de l'API
+API_EXPORT_CHUNK_SIZE = 500
+
+# Nombre maximal d'identifiants par lecture groupée (/api/v3/badges/batch/)
+API_BATCH_MAX_SIZE = 100
+
+# Nombre maximal de credentials par vérification groupée (/api/v3/verify/)
+API_VERIFY_MAX_SIZE = 500
+
+# Processus de vérification des signatures (nombre de processeurs si None)
+VERIFY_WORKERS = None
+
+# Caches : « default » est propre à chaque processus ; « shared » est commun
+# à tous les processus (table créée par `python manage.py createcachetable`)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'core_shared_cache',
+    },
+}
+# En production, Redis (paquet redis requis) remplace la table de cache
+if os.environ.get('REDIS_URL'):
+    CACHES['shared'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ['REDIS_URL'],
+    }
+
+# Cache des verdicts de vérification (core.verification_cache) : il doit être
+# partagé par tous les processus pour qu'une révocation soit vue partout ;
+# un LocMemCache désactive la mise en cache des verdicts
+VERIFY_CACHE_ALIAS = 'shared'
+
+# Durée de conservation (secondes) des verdicts de vérification en cache
+VERIFY_CACHE_TIMEOUT = 300
+
+# Durée de conservation (secondes) des Profiles d'émetteurs en cache
+API_PROFILE_CACHE_TIMEOUT = 3600
+
+# URL publique de l'API, utilisée pour les liens absolus hors requête HTTP
+# (documents signés par sign_assertions). À définir en production : la
+# signature est refusée tant qu'elle garde la valeur par défaut
+API_BASE_URL = os.environ.get('API_BASE_URL', 'http://localhost:8000')
+
+# Nombre de clés d'émetteurs chargées conservées en mémoire (core.utils.keys)
+KEY_REGISTRY_SIZE = 256
+
+# Réserve de paires de clés pré-générées (core.utils.keypool) : paires
+# conservées par type, seuil de remplissage, remplissage dès le démarrage
+KEY_POOL_SIZE = 8
+KEY_POOL_LOW_WATER = 2
+KEY_POOL_TYPES = ['rsa', 'ed25519']
+KEY_POOL_PREFILL = False
+
+# Durée de conservation (secondes) des mesures de débit cryptographique
+# affichées lors de la génération des clés (core.utils.crypto_benchmark)
+CRYPTO_BENCHMARK_TIMEOUT = 86400
+
+# Listes de statut de révocation (core.status_list) : nombre de bits d'une
+# nouvelle liste (131072 au minimum) et durée de cache du document compressé
+STATUS_LIST_SIZE = 131072
+STATUS_LIST_CACHE_TIMEOUT = 3600
+
+# Durée de conservation (secondes) des images de badges découpées pour la
+# cuisson (core.baking)
+BAKING_CACHE_TIMEOUT = 86400
+
+# Tailles (côté le plus long, en pixels) des images dérivées de l'image d'un
+# BadgeClass, produites en PNG et WebP (core.images). Après modification :
+# python manage.py generate_image_derivatives --force
+BADGE_IMAGE_SIZES = {'thumb': 100, 'card': 200, 'full': 512}
+
+# Autorise le téléchargement des contextes JSON-LD absents de core/contexts/
+JSONLD_REMOTE_CONTEXTS = False
 
 
 MIDDLEWARE = [
@@ -9,7 +9,8 @@ from django.template.response import TemplateResponse
 
 from .models import User, Issuer
 from .models.badge import BadgeVersion, KeyType
-from .utils.crypto import generate_key_pair
+from .utils import crypto_benchmark
+from .utils.keypool import pool as key_pool
 
 
 @admin.register(User)
@@ -122,6 +123,7 @@ class IssuerAdmin(admin.ModelAdmin):
                 'key_types': KeyType.choices(),
                 'opts': self.model._meta,
                 'title': _('Générer des clés pour %s') % issuer,
+                **self.get_key_advice(request),
             })
 
         key_type = request.POST.get('key_type')
@@ -130,7 +132,8 @@ class IssuerAdmin(admin.ModelAdmin):
             return HttpResponseRedirect('.')
 
         try:
-            private_key, public_key = generate_key_pair(key_type)
+            # Paire pré-générée : la requête n'attend pas la génération RSA
+            private_key, public_key = key_pool.take(key_type)
             issuer.key_type = key_type
             issuer.public_key = public_key
             issuer.save()
@@ -154,6 +157,20 @@ class IssuerAdmin(admin.ModelAdmin):
             )
         )
 
+    def get_key_advice(self, request):
+        """Mesures de débit par type de clé et type conseillé pour le nombre de vérifications demandé"""
+        try:
+            verifications = max(int(request.GET.get('verifications', '')), 0)
+        except ValueError:
+            verifications = crypto_benchmark.DEFAULT_VERIFICATIONS
+        measures = crypto_benchmark.get_measures(refresh='measure' in request.GET)
+        if not measures:
+            return {'verifications': verifications, 'measures': None, 'recommended': None}
+        ranked = crypto_benchmark.advise(measures, verifications)
+        # Seules les clés RSA 2048 bits sont générées ici
+        recommended = next(measure for measure in ranked if measure['key_size'] in (None, 2048))
+        return {'verifications': verifications, 'measures': ranked, 'recommended': recommended}
+
     def response_change(self, request, obj):
         if '_generate_keys' in request.POST:
             return HttpResponseRedirect(
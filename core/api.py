@@ -1,158 +1,80 @@
-from rest_framework import viewsets
+import gzip
+import json
+import re
+
+from rest_framework import mixins, viewsets
+from rest_framework.negotiation import BaseContentNegotiation
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
 from rest_framework.decorators import action
+from rest_framework.renderers import BrowsableAPIRenderer
+from django.db.models import Q
+from django.http import HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils.cache import patch_vary_headers
 from django.conf import settings
 
-from .models import BadgeClass, Assertion
+from . import baking, conditional, credential_cache, profile_cache, status_list, verification
+from .models import Issuer, BadgeClass, Assertion, StatusList
+from .jsonld import FieldSet, OpenBadgeBuilder, embeds_issuer, plan_assertions, plan_badge_classes
+from .pagination import KeysetPagination
+from .renderers import NDJSONRenderer, OpenBadgeJSONRenderer, iter_json_array, iter_ndjson
+from .utils.ids import parse_pk
+
+ACCEPTS_GZIP = re.compile(r'\bgzip\b')
+
+
+class IgnoreClientContentNegotiation(BaseContentNegotiation):
+    """Premier renderer, quel que soit l'en-tête Accept : pour les vues qui produisent elles-mêmes leur corps (images, archives)"""
+
+    def select_parser(self, request, parsers):
+        return parsers[0]
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return renderers[0], renderers[0].media_type
+
 
 class OpenBadgeViewSet(viewsets.ReadOnlyModelViewSet):
     """
     API en lecture seule pour les Open Badges au format JSON-LD v3.0.
-    
+
     Cette API expose les badges selon la spécification IMS Global v3.0 avec :
     * Contexte @context standard
     * Types de données XMLSchema
     * Support des collections (@set)
     * Propriétés standardisées
+
+    Tous les endpoints acceptent le paramètre `fields` (ex:
+    `?fields=id,name,awardedDate,achievement.name`) pour ne recevoir que
+    certaines propriétés ; seules les colonnes correspondantes sont lues.
+
+    L'émetteur des credentials est référencé par l'URL de son Profile
+    (`/api/v3/issuers/{id}/`) dans la liste et l'export, et intégré partout
+    ailleurs ; `?issuer=embed` ou `?issuer=ref` imposent l'un ou l'autre.
     """
     queryset = Assertion.objects.all()
-    
-    def get_json_ld_context(self):
-        """Retourne le contexte JSON-LD v3.0 pour les Open Badges"""
-        return {
-            "@context": "https://purl.imsglobal.org/spec/ob/v3p0/context-3.0.3.json"
-        }
-        
-    def get_image_url(self, image):
-        """Retourne l'URL absolue d'une image"""
-        if not image:
-            return None
-        if isinstance(image, str) and (image.startswith('http://') or image.startswith('https://')):
-            return image
-        try:
-            return self.request.build_absolute_uri(image.url)
-        except:
-            return None
-
-    def get_achievement_json_ld(self, badge_class):
-        """Convertit un BadgeClass en Achievement JSON-LD"""
-        achievement = {
-            "type": ["Achievement"],
-            "achievementType": badge_class.type,
-            "name": badge_class.name,
-            "description": badge_class.description,
-            "criteria": badge_class.criteria_url,
-            "image": self.get_image_url(badge_class.image),
-            "tag": badge_class.tags.names() if hasattr(badge_class, 'tags') else [],
-            "version": str(badge_class.version)
-        }
-        
-        # Ajouter les endorsements s'il y en a
-        endorsements = self.get_endorsements_json_ld(badge_class)
-        if endorsements:
-            achievement["endorsement"] = endorsements
-            
-        return achievement
-
-    def get_profile_json_ld(self, profile):
-        """Convertit un Profile ou User en JSON-LD"""
-        from django.contrib.auth import get_user_model
-        User = get_user_model()
-        
-        if isinstance(profile, User):
-            # C'est un utilisateur
-            return {
-                "type": ["Profile"],
-                "name": profile.display_name or profile.email,
-                "email": profile.email,
-                "url": None,
-                "image": profile.avatar_url if hasattr(profile, 'avatar_url') else None
-            }
-        else:
-            # C'est un Profile standard (Issuer)
-            return {
-                "type": ["Profile"],
-                "name": profile.name,
-                "email": profile.email,
-                "url": profile.url,
-                "image": self.get_image_url(profile.image)
-            }
+    # Actions servant de nombreux credentials : l'émetteur n'y est que référencé par défaut
+    referenced_issuer_actions = {'list', 'export'}
+    pagination_class = KeysetPagination
+    # Le JSON est servi en premier : seuls les navigateurs (Accept: text/html)
+    # obtiennent l'API navigable
+    renderer_classes = [OpenBadgeJSONRenderer, BrowsableAPIRenderer]
 
-    def get_endorsements_json_ld(self, obj):
-        """Récupère les endorsements pour un badge, un émetteur ou une assertion au format JSON-LD"""
-        from .models.endorsement import Endorsement
-        
-        endorsements = []
-        
-        # Déterminer le type d'objet et récupérer les endorsements correspondants
-        if hasattr(obj, 'id') and hasattr(obj, 'name'):
-            if hasattr(obj, 'issuer'):
-                # C'est un badge (BadgeClass)
-                endorsements_list = Endorsement.objects.filter(badge_class=obj).order_by('-issued_on')
-            elif hasattr(obj, 'url'):
-                # C'est un émetteur (Issuer)
-                endorsements_list = Endorsement.objects.filter(issuer=obj).order_by('-issued_on')
-            else:
-                # C'est une assertion (Assertion)
-                endorsements_list = Endorsement.objects.filter(assertion=obj).order_by('-issued_on')
-        else:
-            return []
-        
-        # Convertir chaque endorsement en format JSON-LD
-        for endorsement in endorsements_list:
-            endorsement_json = {
-                "type": ["EndorsementCredential"],
-                "id": endorsement.id,
-                "issuanceDate": endorsement.issued_on.isoformat(),
-                "issuer": self.get_profile_json_ld(endorsement.endorser),
-                "credentialSubject": {
-                    "type": ["EndorsementSubject"],
-                    "id": obj.id,
-                    "endorsementComment": endorsement.claim.get('text', '')
-                }
-            }
-            endorsements.append(endorsement_json)
-        
-        return endorsements
-    
-    def get_assertion_json_ld(self, assertion):
-        """Convertit une Assertion en OpenBadgeCredential JSON-LD"""
-        badge_class = assertion.badge_class
-        recipient = assertion.recipient
-        
-        credential = {
-            "@context": self.get_json_ld_context()["@context"],
-            "type": assertion.credential_type if assertion.credential_type else ["OpenBadgeCredential"],
-            "id": assertion.credential_id or assertion.identifier,
-            "name": f"{badge_class.name} Credential",
-            "awardedDate": assertion.issued_on.isoformat(),
-            
-            "achievement": self.get_achievement_json_ld(badge_class),
-            
-            "credentialSubject": {
-                "type": ["AchievementSubject"],
-                "identifier": assertion.recipient_identifier,
-                "achievement": self.get_achievement_json_ld(badge_class)
-            }
-        }
-        
-        if assertion.evidence_url:
-            credential["evidence"] = [{
-                "type": ["Evidence"],
-                "id": assertion.evidence_url,
-                "narrative": assertion.narrative
-            }]
-            
-        if assertion.expires:
-            credential["expirationDate"] = assertion.expires.isoformat()
-        
-        # Ajouter les endorsements s'il y en a
-        endorsements = self.get_endorsements_json_ld(assertion)
-        if endorsements:
-            credential["endorsement"] = endorsements
-            
-        return credential
+    def get_fields(self):
+        """Retourne la sélection de propriétés demandée par le paramètre `fields`"""
+        return FieldSet.parse(self.request.query_params.get('fields'))
+
+    def embeds_issuer(self):
+        """Indique si le Profile de l'émetteur est intégré aux credentials (paramètre `issuer`)"""
+        return embeds_issuer(self.request.query_params, default=self.action not in self.referenced_issuer_actions)
+
+    def get_queryset(self):
+        """Retourne les assertions avec leurs relations préchargées pour la sérialisation"""
+        return plan_assertions(self.queryset.all(), self.get_fields(), self.embeds_issuer())
+
+    def get_builder(self):
+        """Retourne le constructeur JSON-LD lié à la requête courante"""
+        return OpenBadgeBuilder(request=self.request, embed_issuer=self.embeds_issuer())
 
     def retrieve(self, request, pk=None):
         """
@@ -163,21 +85,124 @@ class OpenBadgeViewSet(viewsets.ReadOnlyModelViewSet):
         * Informations du destinataire
         * Preuves d'obtention
         * Dates d'émission et d'expiration
+
+        Le document est servi depuis le cache matérialisé lorsqu'il existe,
+        et y est enregistré sinon. Les en-têtes If-None-Match et
+        If-Modified-Since sont honorés (réponse 304) sans construire le document.
         """
-        assertion = get_object_or_404(self.queryset, pk=pk)
-        json_ld = self.get_assertion_json_ld(assertion)
-        return Response(json_ld)
+        fields = self.get_fields()
+        # Seuls les documents complets sont matérialisés
+        materialized = fields.is_all and self.embeds_issuer()
+        base_url = credential_cache.get_base_url(request) if materialized else None
+        freshness = conditional.credential_freshness(request, pk, base_url=base_url)
+        response = conditional.not_modified(request, freshness)
+        if response is not None:
+            return response
+
+        content = freshness.cached_content
+        if content is None:
+            assertion = get_object_or_404(self.get_queryset(), pk=pk)
+            json_ld = self.get_builder().get_assertion_json_ld(assertion, fields)
+            if base_url is not None:
+                credential_cache.store_credentials([(assertion.pk, json_ld)], base_url)
+            response = Response(json_ld)
+        elif request.accepted_renderer.format == 'json':
+            response = HttpResponse(content, content_type='application/json')
+        else:
+            response = Response(json.loads(content))
+        return conditional.add_conditional_headers(response, freshness)
 
     def list(self, request):
         """
         Liste tous les badges disponibles au format JSON-LD v3.0
 
         Retourne une liste d'OpenBadgeCredential avec leurs Achievements associés.
-        Les badges sont triés par date d'émission décroissante.
+        Les badges sont triés par date d'émission décroissante et paginés par
+        curseur (paramètres `cursor` et `page_size`).
+        """
+        builder = self.get_builder()
+        fields = self.get_fields()
+        assertions = self.paginate_queryset(self.get_queryset())
+        json_ld_list = [builder.get_assertion_json_ld(assertion, fields) for assertion in assertions]
+        return self.get_paginated_response(json_ld_list)
+
+    @action(detail=False, methods=['get', 'post'])
+    def batch(self, request):
+        """
+        Récupère plusieurs badges en un seul appel au format JSON-LD v3.0
+
+        Paramètres:
+        * GET: `id` répété (`?id=1&id=https://example.com/badges/2`)
+        * POST: corps JSON `{"ids": [...]}`
+
+        Chaque identifiant est une clé primaire ou une URL (`credential_id` ou
+        `identifier`). Retourne les credentials trouvés dans l'ordre demandé et
+        la liste des identifiants inconnus. Le nombre de requêtes est constant :
+        une pour les assertions, une par relation d'endorsements.
         """
-        assertions = self.queryset.all()
-        json_ld_list = [self.get_assertion_json_ld(assertion) for assertion in assertions]
-        return Response(json_ld_list)
+        if request.method == 'POST':
+            values = request.data.get('ids') if isinstance(request.data, dict) else None
+        else:
+            values = request.query_params.getlist('id')
+        if not isinstance(values, list) or not values:
+            return Response({"error": "Au moins un identifiant est requis"}, status=400)
+
+        max_size = getattr(settings, 'API_BATCH_MAX_SIZE', 100)
+        if len(values) > max_size:
+            return Response({"error": f"Au plus {max_size} identifiants par requête"}, status=400)
+
+        # Les doublons sont ignorés, l'ordre de la demande est conservé
+        values = list(dict.fromkeys(str(value).strip() for value in values))
+        parsed = {value: parse_pk(value) for value in values}
+        pks = [pk for pk in parsed.values() if pk is not None]
+        urls = [value for value, pk in parsed.items() if pk is None]
+        assertions = self.get_queryset().filter(
+            Q(pk__in=pks) | Q(credential_id__in=urls) | Q(identifier__in=urls)
+        )
+
+        found = {}
+        for assertion in assertions:
+            for key in (str(assertion.pk), assertion.credential_id, assertion.identifier):
+                if key:
+                    found[key] = assertion
+
+        builder = self.get_builder()
+        fields = self.get_fields()
+        results = []
+        missing = []
+        for value in values:
+            if value in found:
+                results.append(builder.get_assertion_json_ld(found[value], fields))
+            else:
+                missing.append(value)
+        return Response({"results": results, "missing": missing})
+
+    @action(detail=False, methods=['get'], renderer_classes=[OpenBadgeJSONRenderer, NDJSONRenderer])
+    def export(self, request):
+        """
+        Exporte tous les badges au format JSON-LD v3.0 en flux continu
+
+        Paramètre de requête:
+        * format: `json` (tableau JSON, par défaut) ou `ndjson` (un credential par ligne)
+
+        Les assertions sont lues par lots avec un curseur côté serveur et
+        sérialisées au fil de l'eau : la mémoire reste constante quelle que
+        soit la taille de la table et les premiers octets partent immédiatement.
+        """
+        chunk_size = getattr(settings, 'API_EXPORT_CHUNK_SIZE', 500)
+        assertions = self.get_queryset().order_by('-issuance_date', '-pk').iterator(chunk_size=chunk_size)
+        builder = self.get_builder()
+        fields = self.get_fields()
+        documents = (builder.get_assertion_json_ld(assertion, fields) for assertion in assertions)
+
+        if request.accepted_renderer.format == NDJSONRenderer.format:
+            stream, extension = iter_ndjson(documents), 'ndjson'
+        else:
+            stream, extension = iter_json_array(documents), 'json'
+
+        response = StreamingHttpResponse(stream, content_type=request.accepted_renderer.media_type)
+        response['Content-Disposition'] = f'attachment; filename="openbadges.{extension}"'
+        return response
 
     @action(detail=True, methods=['get'])
     def achievement(self, request, pk=None):
@@ -190,27 +215,232 @@ class OpenBadgeViewSet(viewsets.ReadOnlyModelViewSet):
         * Alignements avec standards
         * Tags et métadonnées
         """
-        assertion = get_object_or_404(self.queryset, pk=pk)
-        json_ld = self.get_achievement_json_ld(assertion.badge_class)
-        return Response(json_ld)
-        
+        freshness = conditional.achievement_freshness(request, pk)
+        response = conditional.not_modified(request, freshness)
+        if response is not None:
+            return response
+
+        fields = self.get_fields()
+        queryset = plan_badge_classes(self.queryset.select_related('badge_class'), 'badge_class__', fields)
+        assertion = get_object_or_404(queryset, pk=pk)
+        json_ld = self.get_builder().get_achievement_json_ld(assertion.badge_class, fields)
+        return conditional.add_conditional_headers(Response(json_ld), freshness)
+
+    @action(detail=True, methods=['get'], content_negotiation_class=IgnoreClientContentNegotiation)
+    def baked(self, request, pk=None):
+        """
+        Image du badge (PNG ou SVG) avec le credential intégré (badge cuit)
+
+        PNG : chunk iTXt `openbadges` ; SVG : élément `openbadges:assertion`
+        dont l'attribut `verify` est l'URL du credential. Les pixels ne sont
+        pas réencodés. If-None-Match et If-Modified-Since sont honorés.
+        """
+        base_url = credential_cache.get_base_url(request)
+        freshness = conditional.credential_freshness(request, pk, base_url=base_url)
+        response = conditional.not_modified(request, freshness)
+        if response is not None:
+            return response
+
+        content = freshness.cached_content
+        if content is None:
+            assertion = get_object_or_404(plan_assertions(self.queryset.all()), pk=pk)
+            json_ld = OpenBadgeBuilder(request=request).get_assertion_json_ld(assertion)
+            [entry] = credential_cache.store_credentials([(assertion.pk, json_ld)], base_url)
+            content, badge_class = entry.content, assertion.badge_class
+        else:
+            badge_class = get_object_or_404(BadgeClass.objects.only('image', 'updated_at'), v2_assertions=pk)
+        try:
+            template = baking.get_template(badge_class)
+        except ValueError as error:
+            return Response({"error": str(error)}, status=400)
+
+        chunks = baking.bake(template, content, OpenBadgeBuilder(request=request).get_credential_url(pk))
+        response = StreamingHttpResponse(chunks, content_type=template.content_type)
+        response['Content-Length'] = sum(len(chunk) for chunk in chunks)
+        response['Content-Disposition'] = f'inline; filename="badge-{pk}.{template.format}"'
+        return conditional.add_conditional_headers(response, freshness)
+
+    @action(
+        detail=False, methods=['get'], url_path='baked', url_name='baked-archive',
+        content_negotiation_class=IgnoreClientContentNegotiation
+    )
+    def baked_archive(self, request):
+        """
+        Archive ZIP des badges cuits d'une cohorte, en flux continu
+
+        Paramètre de requête:
+        * badge_class: ID du badge dont les assertions non révoquées sont cuites
+
+        L'image du badge est découpée une seule fois ; les credentials sont lus
+        par lots depuis le cache matérialisé et l'archive est produite au fil
+        de l'eau, un fichier `badge-{id}.png` (ou `.svg`) par assertion.
+        """
+        badge_class_id = parse_pk(request.query_params.get('badge_class', ''))
+        if badge_class_id is None:
+            return Response({"error": "Le paramètre badge_class est requis"}, status=400)
+        badge_class = get_object_or_404(BadgeClass.objects.only('image', 'updated_at'), pk=badge_class_id)
+        try:
+            template = baking.get_template(badge_class)
+        except ValueError as error:
+            return Response({"error": str(error)}, status=400)
+
+        builder = OpenBadgeBuilder(request=request)
+        assertions = self.queryset.filter(badge_class=badge_class, revoked=False).order_by('pk')
+        credentials = credential_cache.iter_credentials(
+            assertions,
+            credential_cache.get_base_url(request),
+            getattr(settings, 'API_EXPORT_CHUNK_SIZE', 500)
+        )
+        entries = (
+            (
+                f'badge-{assertion.pk}.{template.format}',
+                baking.bake(template, content, builder.get_credential_url(assertion.pk)),
+                assertion.issuance_date,
+            )
+            for assertion, content in credentials
+        )
+        response = StreamingHttpResponse(baking.iter_zip(entries, template.compress_type), content_type='application/zip')
+        response['Content-Disposition'] = f'attachment; filename="badges-{badge_class.pk}.zip"'
+        return response
+
     @action(detail=False, methods=['get'])
     def badge_with_endorsements(self, request):
         """
         Récupère un badge avec ses endorsements au format JSON-LD v3.0
-        
+
         Paramètre de requête:
         * badge_id: ID du badge à récupérer
-        
+
         Retourne un Achievement complet avec ses endorsements intégrés
         conformément à la spécification Open Badges v3.0
         """
         badge_id = request.query_params.get('badge_id')
         if not badge_id:
             return Response({"error": "Le paramètre badge_id est requis"}, status=400)
-            
-        from .models import BadgeClass
-        badge = get_object_or_404(BadgeClass, pk=badge_id)
-        
-        json_ld = self.get_achievement_json_ld(badge)
-        return Response(json_ld)
+
+        freshness = conditional.badge_class_freshness(request, badge_id)
+        response = conditional.not_modified(request, freshness)
+        if response is not None:
+            return response
+
+        fields = self.get_fields()
+        badge = get_object_or_404(plan_badge_classes(BadgeClass.objects.all(), fields=fields), pk=badge_id)
+
+        json_ld = self.get_builder().get_achievement_json_ld(badge, fields)
+        return conditional.add_conditional_headers(Response(json_ld), freshness)
+
+
+class IssuerProfileViewSet(mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+    """
+    Profile d'un émetteur au format JSON-LD v3.0, avec ses endorsements.
+
+    C'est la cible des références produites par `?issuer=ref` sur les
+    credentials. Le document est mis en cache tant que l'émetteur et ses
+    endorsements ne changent pas ; If-None-Match et If-Modified-Since sont
+    honorés (réponse 304). Le paramètre `fields` est accepté.
+    """
+    queryset = Issuer.objects.all()
+    renderer_classes = [OpenBadgeJSONRenderer, BrowsableAPIRenderer]
+
+    def retrieve(self, request, pk=None):
+        """Récupère le Profile JSON-LD d'un émetteur"""
+        freshness = conditional.issuer_freshness(request, pk)
+        response = conditional.not_modified(request, freshness)
+        if response is not None:
+            return response
+
+        json_ld = profile_cache.get_profile(freshness)
+        if json_ld is None:
+            fields = FieldSet.parse(request.query_params.get('fields'))
+            issuer = get_object_or_404(self.queryset, pk=pk)
+            builder = OpenBadgeBuilder(request=request)
+            json_ld = {
+                "@context": builder.get_json_ld_context()["@context"],
+                **builder.get_profile_json_ld(issuer, fields),
+            }
+            profile_cache.store_profile(freshness, json_ld)
+        return conditional.add_conditional_headers(Response(json_ld), freshness)
+
+
+class StatusListViewSet(viewsets.ViewSet):
+    """
+    Liste de statut de révocation d'un émetteur (BitstringStatusListCredential).
+
+    Un bit par assertion, désignée par la propriété `credentialStatus` des
+    credentials. Le document est servi compressé (GZIP) aux clients qui
+    l'acceptent ; If-None-Match et If-Modified-Since sont honorés.
+    """
+    renderer_classes = [OpenBadgeJSONRenderer]
+
+    def retrieve(self, request, pk=None):
+        """Récupère la liste de statut d'un émetteur"""
+        freshness = conditional.status_list_freshness(request, pk)
+        response = conditional.not_modified(request, freshness)
+        if response is not None:
+            return response
+
+        blob = status_list.get_blob(
+            freshness,
+            lambda: get_object_or_404(StatusList.objects.defer('bitstring'), issuer_id=pk),
+            OpenBadgeBuilder(request=request)
+        )
+        if ACCEPTS_GZIP.search(request.META.get('HTTP_ACCEPT_ENCODING', '')):
+            response = HttpResponse(blob, content_type='application/json')
+            response['Content-Encoding'] = 'gzip'
+        else:
+            response = HttpResponse(gzip.decompress(blob), content_type='application/json')
+        patch_vary_headers(response, ['Accept-Encoding'])
+        return conditional.add_conditional_headers(response, freshness)
+
+
+class VerifyViewSet(viewsets.ViewSet):
+    """
+    Vérification en masse d'OpenBadgeCredentials signés.
+
+    POST `/api/v3/verify/` avec le corps `{"credentials": [...]}` : chaque
+    credential reçoit un verdict (`verified`, détail des contrôles
+    `signature`, `expiry`, `revocation` et raisons des échecs), dans
+    l'ordre de la demande.
+    """
+    renderer_classes = [OpenBadgeJSONRenderer, BrowsableAPIRenderer]
+
+    def create(self, request):
+        """Vérifie un lot de credentials"""
+        credentials = request.data.get('credentials') if isinstance(request.data, dict) else None
+        if not isinstance(credentials, list) or not credentials:
+            return Response({"error": "Au moins un credential est requis"}, status=400)
+
+        max_size = getattr(settings, 'API_VERIFY_MAX_SIZE', 500)
+        if len(credentials) > max_size:
+            return Response({"error": f"Au plus {max_size} credentials par requête"}, status=400)
+
+        return Response({"results": verification.verify_credentials(credentials)})
+
+    @action(detail=False, methods=['post'], parser_classes=[MultiPartParser])
+    def baked(self, request):
+        """
+        Extrait et vérifie le credential intégré à un badge cuit
+
+        POST multipart avec le fichier `image` (PNG ou SVG). L'image n'est
+        pas chargée : les chunks PNG autres que iTXt sont sautés, et l'analyse
+        d'un SVG s'arrête au premier élément `openbadges:assertion`. Retourne
+        le credential extrait et son verdict.
+        """
+        image = request.FILES.get('image')
+        if image is None:
+            return Response({"error": "Le fichier image est requis"}, status=400)
+        try:
+            image_format, content = baking.unbake(image)
+        except ValueError as error:
+            return Response({"error": str(error)}, status=400)
+        if content is None:
+            return Response({"error": "Aucun credential intégré à l'image"}, status=400)
+        try:
+            credential = json.loads(content)
+        except ValueError:
+            credential = None
+        if not isinstance(credential, dict):
+            return Response({"error": "Le credential intégré n'est pas un document JSON"}, status=400)
+
+        [verdict] = verification.verify_credentials([credential])
+        return Response({"format": image_format, "credential": credential, "result": verdict})
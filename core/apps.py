@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "core"
+
+    def ready(self):
+        from django.conf import settings
+        from . import signals  # noqa: F401
+        from .utils import contexts, keypool
+        contexts.install()
+        if getattr(settings, 'KEY_POOL_PREFILL', False):
+            keypool.pool.start()
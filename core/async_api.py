@@ -0,0 +1,120 @@
+"""Variantes asynchrones (ASGI) de l'API JSON-LD en lecture.
+
+Ces vues reprennent ``OpenBadgeViewSet.retrieve``, ``list``, ``achievement``
+et ``badge_with_endorsements`` avec l'ORM asynchrone de Django (``aget``,
+``afirst``, ``async for``) : servies par un serveur ASGI (uvicorn, daphne),
+elles n'occupent pas un thread pendant qu'une requête attend la base ou un
+client lent, et un seul processus peut tenir des milliers de connexions.
+
+Les documents, ETags et curseurs sont identiques à ceux de l'API
+synchrone ; seul le JSON compact est servi (pas d'API navigable).
+"""
+
+from functools import wraps
+
+from django.http import Http404, HttpResponse
+from django.shortcuts import aget_object_or_404
+from django.views.decorators.http import require_GET
+from rest_framework.exceptions import NotFound
+
+from . import conditional, credential_cache
+from .jsonld import FieldSet, OpenBadgeBuilder, embeds_issuer, plan_assertions, plan_badge_classes
+from .models import BadgeClass, Assertion
+from .pagination import KeysetPagination
+from .renderers import OpenBadgeJSONRenderer
+
+renderer = OpenBadgeJSONRenderer()
+
+
+def json_response(data, status=200):
+    return HttpResponse(renderer.render(data), content_type='application/json', status=status)
+
+
+def api_view(view):
+    """Vue asynchrone en lecture seule : GET uniquement, erreurs au format JSON comme DRF"""
+    @require_GET
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        try:
+            return await view(request, *args, **kwargs)
+        except NotFound as exc:
+            return json_response({"detail": exc.detail}, status=404)
+        except Http404:
+            return json_response({"detail": NotFound.default_detail}, status=404)
+    return wrapper
+
+
+async def respond(request, freshness, build):
+    """Répond 304 si possible, sinon construit le document avec ``build`` et ajoute les en-têtes conditionnels"""
+    response = conditional.not_modified(request, freshness)
+    if response is not None:
+        return response
+    return conditional.add_conditional_headers(json_response(await build()), freshness)
+
+
+@api_view
+async def credential_detail(request, pk):
+    """Variante asynchrone de ``OpenBadgeViewSet.retrieve``"""
+    fields = FieldSet.parse(request.GET.get('fields'))
+    embed_issuer = embeds_issuer(request.GET)
+    base_url = credential_cache.get_base_url(request) if fields.is_all and embed_issuer else None
+    freshness = await conditional.credential_query(pk, base_url).aevaluate(request)
+    response = conditional.not_modified(request, freshness)
+    if response is not None:
+        return response
+
+    content = freshness.cached_content
+    if content is None:
+        queryset = plan_assertions(Assertion.objects.all(), fields, embed_issuer)
+        assertion = await aget_object_or_404(queryset, pk=pk)
+        json_ld = OpenBadgeBuilder(request=request, embed_issuer=embed_issuer).get_assertion_json_ld(assertion, fields)
+        if base_url is not None:
+            await credential_cache.astore_credentials([(assertion.pk, json_ld)], base_url)
+        response = json_response(json_ld)
+    else:
+        response = HttpResponse(content, content_type='application/json')
+    return conditional.add_conditional_headers(response, freshness)
+
+
+@api_view
+async def credential_list(request):
+    """Variante asynchrone de ``OpenBadgeViewSet.list`` (même pagination par curseur)"""
+    fields = FieldSet.parse(request.GET.get('fields'))
+    embed_issuer = embeds_issuer(request.GET, default=False)
+    paginator = KeysetPagination()
+    queryset = plan_assertions(Assertion.objects.all(), fields, embed_issuer)
+    assertions = await paginator.apaginate_queryset(queryset, request)
+    builder = OpenBadgeBuilder(request=request, embed_issuer=embed_issuer)
+    json_ld_list = [builder.get_assertion_json_ld(assertion, fields) for assertion in assertions]
+    return json_response(paginator.get_paginated_data(json_ld_list))
+
+
+@api_view
+async def credential_achievement(request, pk):
+    """Variante asynchrone de ``OpenBadgeViewSet.achievement``"""
+    fields = FieldSet.parse(request.GET.get('fields'))
+    freshness = await conditional.achievement_query(pk).aevaluate(request)
+
+    async def build():
+        queryset = plan_badge_classes(Assertion.objects.select_related('badge_class'), 'badge_class__', fields)
+        assertion = await aget_object_or_404(queryset, pk=pk)
+        return OpenBadgeBuilder(request=request).get_achievement_json_ld(assertion.badge_class, fields)
+
+    return await respond(request, freshness, build)
+
+
+@api_view
+async def badge_with_endorsements(request):
+    """Variante asynchrone de ``OpenBadgeViewSet.badge_with_endorsements``"""
+    badge_id = request.GET.get('badge_id')
+    if not badge_id:
+        return json_response({"error": "Le paramètre badge_id est requis"}, status=400)
+
+    fields = FieldSet.parse(request.GET.get('fields'))
+    freshness = await conditional.badge_class_query(badge_id).aevaluate(request)
+
+    async def build():
+        badge = await aget_object_or_404(plan_badge_classes(BadgeClass.objects.all(), fields=fields), pk=badge_id)
+        return OpenBadgeBuilder(request=request).get_achievement_json_ld(badge, fields)
+
+    return await respond(request, freshness, build)
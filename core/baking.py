@@ -0,0 +1,360 @@
+"""Cuisson des badges : le credential intégré à l'image de son BadgeClass.
+
+* PNG : chunk ``iTXt`` de mot-clé ``openbadges``, inséré juste avant ``IEND`` ;
+* SVG : élément ``<openbadges:assertion verify="URL">`` (credential en
+  CDATA), inséré juste après la balise ouvrante ``<svg>``.
+
+L'image source est lue par blocs depuis le stockage, chunk par chunk pour
+PNG, sans jamais décoder ni réencoder les pixels. Elle est découpée une
+fois par BadgeClass en un gabarit ``(tête, queue)`` conservé dans le cache
+Django pendant ``BAKING_CACHE_TIMEOUT`` secondes : cuire un badge revient à
+émettre la tête, le payload (pour PNG, un chunk dont seul le CRC est
+calculé) puis la queue. Une assertion déjà cuite dans l'image source est
+retirée.
+
+``iter_zip`` produit au fil de l'eau une archive ZIP de toute une cohorte,
+sans la matérialiser en mémoire.
+
+``unbake`` fait le chemin inverse sur une image reçue, sans la charger :
+pour PNG, seuls les en-têtes de chunks sont lus et les données des autres
+chunks (IDAT en tête) sont sautées par ``seek`` ; pour SVG, un analyseur
+XML incrémental s'arrête au premier ``openbadges:assertion``.
+
+Exemple d'utilisation:
+    template = get_template(badge_class)
+    response = StreamingHttpResponse(bake(template, content, url), content_type=template.content_type)
+"""
+
+import codecs
+import hashlib
+import io
+import re
+import struct
+import zipfile
+import zlib
+from html import escape
+from typing import NamedTuple
+from xml.etree.ElementTree import ParseError, XMLPullParser
+
+from django.conf import settings
+from django.core.cache import cache
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+PNG_KEYWORD = b'openbadges'
+
+SVG_NAMESPACE = 'http://openbadges.org'
+SVG_START_TAG = re.compile(r'<svg\b(?:[^>"\']|"[^"]*"|\'[^\']*\')*>')
+SVG_ASSERTION = re.compile(
+    r'<openbadges:assertion\b(?:[^>"\']|"[^"]*"|\'[^\']*\')*?(?:/>|>.*?</openbadges:assertion>)',
+    re.DOTALL
+)
+
+# Taille des lectures dans l'image source
+READ_SIZE = 64 * 1024
+
+# Taille maximale d'un credential extrait d'une image
+MAX_CREDENTIAL_SIZE = 1024 * 1024
+
+CONTENT_TYPES = {'png': 'image/png', 'svg': 'image/svg+xml'}
+
+
+class Template(NamedTuple):
+    """Image source découpée autour de l'emplacement du payload"""
+    format: str
+    head: bytes
+    tail: bytes
+
+    @property
+    def content_type(self):
+        return CONTENT_TYPES[self.format]
+
+    @property
+    def compress_type(self):
+        # Les données d'un PNG sont déjà compressées
+        return zipfile.ZIP_STORED if self.format == 'png' else zipfile.ZIP_DEFLATED
+
+
+def read_exactly(stream, size):
+    data = stream.read(size)
+    if len(data) != size:
+        raise ValueError("Image PNG tronquée")
+    return data
+
+
+class ChainedStream:
+    """Relit des octets déjà consommés avant la suite d'un flux"""
+
+    def __init__(self, start, stream):
+        self.start = start
+        self.stream = stream
+
+    def read(self, size):
+        data, self.start = self.start[:size], self.start[size:]
+        if len(data) < size:
+            data += self.stream.read(size - len(data))
+        return data
+
+
+def iter_png_chunks(stream):
+    """
+    Parcourt les chunks d'un PNG, signature déjà lue : ``(type, chunk complet)``.
+
+    Raises:
+        ValueError: si le fichier est tronqué
+    """
+    while True:
+        header = stream.read(8)
+        if not header:
+            return
+        if len(header) != 8:
+            raise ValueError("Image PNG tronquée")
+        length, chunk_type = struct.unpack('>I4s', header)
+        yield chunk_type, header + read_exactly(stream, length + 4)
+
+
+def is_baked_chunk(chunk_type, chunk):
+    return chunk_type == b'iTXt' and chunk[8:8 + len(PNG_KEYWORD) + 1] == PNG_KEYWORD + b'\x00'
+
+
+def png_chunk(chunk_type, data):
+    """Chunk PNG : longueur, type, données, CRC du type et des données"""
+    return struct.pack('>I', len(data)) + chunk_type + data + struct.pack('>I', zlib.crc32(chunk_type + data))
+
+
+def split_png(stream):
+    """Tête (jusqu'à IEND exclu, sans chunk ``openbadges``) et queue (IEND) d'un PNG"""
+    head = [read_exactly(stream, len(PNG_SIGNATURE))]
+    if head[0] != PNG_SIGNATURE:
+        raise ValueError("Signature PNG invalide")
+    for chunk_type, chunk in iter_png_chunks(stream):
+        if chunk_type == b'IEND':
+            return Template('png', b''.join(head), chunk)
+        if not is_baked_chunk(chunk_type, chunk):
+            head.append(chunk)
+    raise ValueError("Image PNG sans chunk IEND")
+
+
+def read_rest(stream, decoder):
+    blocks = []
+    while block := stream.read(READ_SIZE):
+        blocks.append(decoder.decode(block))
+    blocks.append(decoder.decode(b'', final=True))
+    return ''.join(blocks)
+
+
+def split_svg(stream, start=b''):
+    """Tête (jusqu'à la balise ``<svg>`` incluse, espace de noms ajouté) et queue d'un SVG"""
+    # Décodage incrémental : un caractère multi-octets peut être à cheval sur deux blocs
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    text = decoder.decode(start)
+    match = SVG_START_TAG.search(text)
+    while match is None:
+        block = stream.read(READ_SIZE)
+        if not block:
+            decoder.decode(b'', final=True)
+            raise ValueError("Image SVG sans balise <svg>")
+        text += decoder.decode(block)
+        # La balise est cherchée dans le texte lu jusqu'ici : elle peut être à cheval sur deux blocs
+        match = SVG_START_TAG.search(text)
+    tag = match.group()
+    if tag.endswith('/>'):
+        raise ValueError("Image SVG vide")
+    if 'xmlns:openbadges' not in tag:
+        tag = f'{tag[:-1]} xmlns:openbadges="{SVG_NAMESPACE}">'
+    rest = text[match.end():] + read_rest(stream, decoder)
+    head = text[:match.start()] + tag
+    return Template('svg', head.encode(), SVG_ASSERTION.sub('', rest).encode())
+
+
+def split_image(stream):
+    """
+    Découpe une image PNG ou SVG en gabarit.
+
+    Raises:
+        ValueError: si l'image n'est ni un PNG ni un SVG valide
+    """
+    start = stream.read(len(PNG_SIGNATURE))
+    if start == PNG_SIGNATURE:
+        return split_png(ChainedStream(start, stream))
+    try:
+        return split_svg(stream, start)
+    except UnicodeDecodeError:
+        raise ValueError("Format d'image non supporté : PNG ou SVG requis")
+
+
+def make_key(badge_class):
+    image = hashlib.sha256(f'{badge_class.image.name}|{badge_class.updated_at.isoformat()}'.encode()).hexdigest()
+    return f'baking:{badge_class.pk}:{image}'
+
+
+def get_template(badge_class):
+    """
+    Gabarit de l'image d'un BadgeClass, depuis le cache ou lu dans le stockage.
+
+    Raises:
+        ValueError: si le BadgeClass n'a pas d'image PNG ou SVG
+    """
+    if not badge_class.image:
+        raise ValueError("Badge sans image")
+    key = make_key(badge_class)
+    template = cache.get(key)
+    if template is None:
+        with badge_class.image.storage.open(badge_class.image.name, 'rb') as stream:
+            template = split_image(stream)
+        cache.set(key, template, getattr(settings, 'BAKING_CACHE_TIMEOUT', 86400))
+    return template
+
+
+def make_payload(template, content, verify_url):
+    """Chunk iTXt (PNG) ou élément ``openbadges:assertion`` (SVG) portant le credential sérialisé"""
+    if template.format == 'png':
+        # Mot-clé, drapeau et méthode de compression (aucune), langue et mot-clé traduit vides
+        return png_chunk(b'iTXt', PNG_KEYWORD + b'\x00\x00\x00\x00\x00' + content.encode())
+    cdata = content.replace(']]>', ']]]]><![CDATA[>')
+    return (
+        f'<openbadges:assertion verify="{escape(verify_url)}"><![CDATA[{cdata}]]></openbadges:assertion>'
+    ).encode()
+
+
+def bake(template, content, verify_url):
+    """Image cuite, en morceaux : tête, payload, queue"""
+    return [template.head, make_payload(template, content, verify_url), template.tail]
+
+
+class ZipSink:
+    """Destination non positionnable d'un ``ZipFile`` : les octets écrits sont repris par ``drain``"""
+
+    def __init__(self):
+        self.parts = []
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.parts)
+        self.parts.clear()
+        return data
+
+
+def iter_zip(entries, compress_type=zipfile.ZIP_STORED):
+    """
+    Archive ZIP produite au fil de l'eau, un morceau par fichier.
+
+    ``entries`` est un itérable de triplets ``(nom, morceaux, date)``.
+    """
+    sink = ZipSink()
+    with zipfile.ZipFile(sink, 'w') as archive:
+        for name, chunks, date in entries:
+            info = zipfile.ZipInfo(name, date_time=date.timetuple()[:6])
+            info.compress_type = compress_type
+            with archive.open(info, 'w') as entry:
+                for chunk in chunks:
+                    entry.write(chunk)
+            yield sink.drain()
+    yield sink.drain()
+
+
+def skip(stream, size):
+    """Avance de ``size`` octets, sans les lire si le flux est positionnable"""
+    try:
+        stream.seek(size, io.SEEK_CUR)
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        while size > 0:
+            block = stream.read(min(size, READ_SIZE))
+            if not block:
+                return
+            size -= len(block)
+
+
+def parse_itxt(data):
+    """
+    Texte d'un chunk iTXt ``openbadges``, ou None pour un autre mot-clé.
+
+    Raises:
+        ValueError: si le chunk est mal formé
+    """
+    keyword, separator, rest = data.partition(b'\x00')
+    if keyword != PNG_KEYWORD:
+        return None
+    if not separator or len(rest) < 2:
+        raise ValueError("Chunk iTXt openbadges invalide")
+    compressed, rest = rest[0], rest[2:]
+    # Langue et mot-clé traduit
+    for _ in range(2):
+        _, separator, rest = rest.partition(b'\x00')
+        if not separator:
+            raise ValueError("Chunk iTXt openbadges invalide")
+    if compressed:
+        decompressor = zlib.decompressobj()
+        try:
+            rest = decompressor.decompress(rest, MAX_CREDENTIAL_SIZE)
+        except zlib.error:
+            raise ValueError("Chunk iTXt openbadges invalide")
+        if decompressor.unconsumed_tail:
+            raise ValueError("Credential intégré trop volumineux")
+    return rest.decode('utf-8')
+
+
+def unbake_png(stream):
+    """Texte du chunk iTXt ``openbadges`` d'un PNG (signature déjà lue), ou None"""
+    while True:
+        header = stream.read(8)
+        if len(header) != 8:
+            return None
+        length, chunk_type = struct.unpack('>I4s', header)
+        if chunk_type == b'IEND':
+            return None
+        if chunk_type != b'iTXt':
+            skip(stream, length + 4)
+            continue
+        if length > MAX_CREDENTIAL_SIZE:
+            raise ValueError("Credential intégré trop volumineux")
+        data = read_exactly(stream, length)
+        if struct.unpack('>I', read_exactly(stream, 4))[0] != zlib.crc32(chunk_type + data):
+            raise ValueError("CRC du chunk iTXt invalide")
+        text = parse_itxt(data)
+        if text is not None:
+            return text
+
+
+def unbake_svg(stream, start=b''):
+    """Texte du premier élément ``openbadges:assertion`` d'un SVG, ou None"""
+    parser = XMLPullParser(events=('end',))
+    tag = f'{{{SVG_NAMESPACE}}}assertion'
+    block = start
+    while block:
+        parser.feed(block)
+        for _, element in parser.read_events():
+            if element.tag == tag:
+                text = element.text or ''
+                if len(text) > MAX_CREDENTIAL_SIZE:
+                    raise ValueError("Credential intégré trop volumineux")
+                return text
+            # Les éléments déjà analysés ne sont pas conservés
+            element.clear()
+        block = stream.read(READ_SIZE)
+    parser.close()
+    return None
+
+
+def unbake(stream):
+    """
+    Extrait le credential intégré à une image PNG ou SVG.
+
+    Retourne le format (``png`` ou ``svg``) et le texte intégré, None si
+    l'image n'en contient pas.
+
+    Raises:
+        ValueError: si l'image n'est ni un PNG ni un SVG valide
+    """
+    start = stream.read(len(PNG_SIGNATURE))
+    try:
+        if start == PNG_SIGNATURE:
+            return 'png', unbake_png(stream)
+        return 'svg', unbake_svg(stream, start)
+    except (ParseError, UnicodeDecodeError):
+        raise ValueError("Format d'image non supporté : PNG ou SVG requis")
@@ -0,0 +1,50 @@
+"""Bancs d'essai de performance.
+
+Chaque module déclaré dans ``SUITES`` expose une fonction ``run(**options)``
+qui retourne une liste de mesures (dictionnaires sérialisables en JSON).
+La commande ``python manage.py benchmark [suite ...]`` les exécute, affiche
+un résumé et peut écrire les résultats dans un fichier pour les comparer
+d'un commit à l'autre.
+"""
+
+import statistics
+import time
+
+SUITES = {
+    'api': 'core.benchmarks.api',
+    'canonical': 'core.benchmarks.canonical',
+    'concurrency': 'core.benchmarks.concurrency',
+    'renderers': 'core.benchmarks.renderers',
+    'signatures': 'core.benchmarks.signatures',
+}
+
+
+def measure(func, repeat=5):
+    """Exécute ``func`` ``repeat`` fois et retourne les durées en secondes"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def percentile(samples, fraction):
+    """Percentile par interpolation linéaire d'une liste de durées"""
+    ordered = sorted(samples)
+    position = (len(ordered) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize(samples):
+    """Résumé statistique d'une liste de durées (en secondes)"""
+    return {
+        'samples': len(samples),
+        'min': min(samples),
+        'median': statistics.median(samples),
+        'p95': percentile(samples, 0.95),
+        'p99': percentile(samples, 0.99),
+        'max': max(samples),
+    }
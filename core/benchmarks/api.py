@@ -0,0 +1,151 @@
+"""Latence, requêtes SQL et mémoire des endpoints ``/api/v3/``.
+
+Sur une base temporaire peuplée par ``fixtures.seed`` (de 1k à 1M
+assertions), chaque endpoint est appelé ``repeat`` fois via le client de
+test pour mesurer la latence (percentiles), puis une dernière fois sous
+``CaptureQueriesContext`` et ``tracemalloc`` pour compter les requêtes SQL
+et relever le pic de mémoire. Les deux mesures sont séparées car
+``tracemalloc`` ralentit fortement l'exécution.
+
+``get_assertion_json_ld`` est aussi mesuré seul, sur une page d'assertions
+déjà chargée : aucune requête ne doit être émise pendant la construction.
+"""
+
+import random
+import time
+import tracemalloc
+
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.jsonld import OpenBadgeBuilder, plan_assertions
+from core.models import Assertion, Issuer
+
+from . import summarize
+from .fixtures import seed, temporary_database
+
+# Taille de la page construite pour la mesure isolée de get_assertion_json_ld
+BUILDER_PAGE_SIZE = 500
+
+
+def endpoints(pks, badge_ids, issuer_ids):
+    """
+    Liste des appels mesurés : (nom, URL, paramètres, nombre maximal d'échantillons).
+
+    Les requêtes sur un credential portent sur des assertions différentes à
+    chaque échantillon ; la variante « cached » relit les mêmes assertions,
+    servies depuis le cache matérialisé.
+    """
+    detail = [reverse('core:badges-detail', args=[pk]) for pk in pks]
+    return [
+        ('list', reverse('core:badges-list'), [{}], None),
+        ('list page_size=500', reverse('core:badges-list'), [{'page_size': 500}], None),
+        ('list fields', reverse('core:badges-list'), [{'fields': 'id,name,awardedDate,achievement.name'}], None),
+        ('list issuer=ref', reverse('core:badges-list'), [{'issuer': 'ref'}], None),
+        ('detail', detail, [{}], None),
+        ('detail cached', detail, [{}], None),
+        ('detail fields', detail, [{'fields': 'id,name,awardedDate'}], None),
+        ('achievement', [reverse('core:badges-achievement', args=[pk]) for pk in pks], [{}], None),
+        ('badge_with_endorsements', reverse('core:badge-with-endorsements'),
+         [{'badge_id': badge_id} for badge_id in badge_ids], None),
+        ('issuer profile', [reverse('core:issuers-detail', args=[pk]) for pk in issuer_ids], [{}], None),
+        ('batch 50', reverse('core:badges-batch'), [{'id': [str(pk) for pk in pks[:50]]}], None),
+        ('async list', reverse('core:async-badges-list'), [{}], None),
+        ('async detail', [reverse('core:async-badges-detail', args=[pk]) for pk in pks], [{}], None),
+        # L'export parcourt toute la table : un seul échantillon
+        ('export ndjson', reverse('core:badges-export'), [{'format': 'ndjson'}], 1),
+    ]
+
+
+def get(client, url, params):
+    """Exécute une requête GET et lit tout le corps ; retourne (code HTTP, taille)"""
+    response = client.get(url, params)
+    if response.streaming:
+        size = sum(len(chunk) for chunk in response.streaming_content)
+    else:
+        size = len(response.content)
+    return response.status_code, size
+
+
+def cycle(values, index):
+    return values[index % len(values)] if isinstance(values, list) else values
+
+
+def measure_endpoint(client, name, urls, params, repeat):
+    samples = []
+    for index in range(repeat):
+        start = time.perf_counter()
+        get(client, cycle(urls, index), cycle(params, index))
+        samples.append(time.perf_counter() - start)
+
+    # Dernier appel instrumenté : requêtes SQL et pic de mémoire
+    tracemalloc.start()
+    try:
+        with CaptureQueriesContext(connection) as queries:
+            status, size = get(client, cycle(urls, repeat), cycle(params, repeat))
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'suite': 'api',
+        'name': name,
+        'status': status,
+        'bytes': size,
+        'queries': len(queries),
+        'peak_memory': peak,
+        **summarize(samples),
+    }
+
+
+def measure_builder(repeat):
+    """Mesure get_assertion_json_ld seul, document par document, sur une page préchargée"""
+    assertions = list(plan_assertions(Assertion.objects.order_by('-issuance_date', '-pk'))[:BUILDER_PAGE_SIZE])
+    builder = OpenBadgeBuilder(base_url='http://testserver')
+    samples = []
+    for _ in range(repeat):
+        for assertion in assertions:
+            start = time.perf_counter()
+            builder.get_assertion_json_ld(assertion)
+            samples.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        with CaptureQueriesContext(connection) as queries:
+            documents = [builder.get_assertion_json_ld(assertion) for assertion in assertions]
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'suite': 'api',
+        'name': 'get_assertion_json_ld',
+        'count': len(documents),
+        'queries': len(queries),
+        'peak_memory': peak,
+        **summarize(samples),
+    }
+
+
+def measure_all(repeat=5, seed_value=0):
+    """Mesure chaque endpoint et le constructeur sur la base courante"""
+    rng = random.Random(seed_value)
+    pks = list(Assertion.objects.values_list('pk', flat=True))
+    pks = rng.sample(pks, min(len(pks), max(repeat, 50)))
+    badge_ids = list(Assertion.objects.filter(pk__in=pks).values_list('badge_class_id', flat=True).distinct())
+    issuer_ids = list(Issuer.objects.values_list('pk', flat=True))
+
+    client = Client()
+    results = []
+    for name, urls, params, max_samples in endpoints(pks, badge_ids, issuer_ids):
+        results.append(measure_endpoint(client, name, urls, params, min(repeat, max_samples or repeat)))
+    results.append(measure_builder(repeat))
+    return results
+
+
+def run(count=1_000, repeat=5, **options):
+    with temporary_database():
+        seeded = seed(assertions=count)
+        return [{**result, 'dataset': seeded} for result in measure_all(repeat)]
@@ -0,0 +1,69 @@
+"""Débit de la mise sous forme canonique des credentials avant signature.
+
+Compare, sur ``count`` OpenBadgeCredential synthétiques (10 000 par
+défaut, 50 badges distincts) :
+
+* ``json.dumps(sort_keys=True)``, la forme naïve (non conforme à JCS pour
+  les nombres et l'ordre des clés non ASCII) ;
+* ``jcs.canonicalize``, JCS (RFC 8785) sans mémoire ;
+* ``Canonicalizer``, JCS avec l'Achievement partagé canonicalisé une fois
+  par badge, comme lors de la signature en masse.
+"""
+
+import json
+
+from core.utils.jcs import Canonicalizer, canonicalize
+
+from . import measure, summarize
+from .renderers import synthetic_credentials
+
+
+def json_credentials(count):
+    """Credentials synthétiques ne contenant que des types JSON, Achievements partagés par badge"""
+    achievements = {}
+    credentials = []
+    for credential in synthetic_credentials(count):
+        credential.pop('uuid')
+        credential['awardedDate'] = credential['awardedDate'].isoformat()
+        achievement = credential['achievement']
+        for endorsement in achievement['endorsement']:
+            if not isinstance(endorsement['issuanceDate'], str):
+                endorsement['issuanceDate'] = endorsement['issuanceDate'].isoformat()
+        achievement = achievements.setdefault(achievement['name'], achievement)
+        credential['achievement'] = credential['credentialSubject']['achievement'] = achievement
+        credentials.append(credential)
+    return credentials
+
+
+def run(count=10000, repeat=5, **options):
+    credentials = json_credentials(count)
+
+    def naive():
+        return [
+            json.dumps(credential, sort_keys=True, separators=(',', ':'), ensure_ascii=False).encode()
+            for credential in credentials
+        ]
+
+    def jcs():
+        return [canonicalize(credential) for credential in credentials]
+
+    def memoized():
+        canonicalizer = Canonicalizer()
+        return [
+            canonicalizer.canonicalize(credential, {id(credential['achievement']): credential['achievement']['name']})
+            for credential in credentials
+        ]
+
+    results = []
+    for name, func in [('json.dumps sort_keys', naive), ('jcs', jcs), ('jcs memoized', memoized)]:
+        size = sum(len(payload) for payload in func())
+        stats = summarize(measure(func, repeat))
+        results.append({
+            'suite': 'canonical',
+            'name': name,
+            'count': count,
+            'bytes': size,
+            'bytes_per_second': size / stats['median'],
+            **stats,
+        })
+    return results
@@ -0,0 +1,160 @@
+"""Charge concurrente : API synchrone sous WSGI contre API asynchrone sous ASGI.
+
+Les deux gestionnaires de Django sont appelés dans le processus, sans
+serveur HTTP, sur une base temporaire peuplée par ``fixtures.seed`` :
+
+* WSGI : ``workers`` threads, comme un serveur à pool de threads
+  (gunicorn ``gthread``, mod_wsgi) ; un client lent occupe son thread
+  pendant toute la lecture de la réponse ;
+* ASGI : jusqu'à ``concurrency`` requêtes en cours sur une seule boucle
+  d'événements ; un client lent ne fait qu'attendre sur ``send``.
+
+``client_delay`` simule le temps de lecture de la réponse par le client.
+"""
+
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from wsgiref.util import setup_testing_defaults
+
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.urls import reverse
+
+from core import credential_cache
+from core.models import Assertion
+
+from . import summarize
+from .fixtures import seed, temporary_database
+
+HOST = 'testserver'
+
+
+def wsgi_request(handler, path, client_delay):
+    """Exécute une requête GET via WSGI et retourne (instant de fin, code HTTP)"""
+    environ = {'PATH_INFO': path, 'HTTP_HOST': HOST, 'SERVER_NAME': HOST, 'HTTP_ACCEPT': 'application/json'}
+    setup_testing_defaults(environ)
+    statuses = []
+
+    def start_response(status, headers, exc_info=None):
+        statuses.append(int(status.split()[0]))
+
+    response = handler(environ, start_response)
+    try:
+        for _ in response:
+            pass
+        # Client lent : le thread reste occupé tant que la réponse n'est pas lue
+        time.sleep(client_delay)
+    finally:
+        response.close()
+    return time.perf_counter(), statuses[0]
+
+
+async def asgi_request(handler, path, client_delay):
+    """Exécute une requête GET via ASGI et retourne (instant de fin, code HTTP)"""
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': b'',
+        'root_path': '',
+        'headers': [(b'host', HOST.encode()), (b'accept', b'application/json')],
+        'client': ('127.0.0.1', 0),
+        'server': (HOST, 80),
+    }
+    received = False
+    statuses = []
+
+    async def receive():
+        nonlocal received
+        if not received:
+            received = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        # Le client reste connecté jusqu'à la fin de la réponse
+        await asyncio.Future()
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            statuses.append(message['status'])
+        elif not message.get('more_body'):
+            await asyncio.sleep(client_delay)
+
+    await handler(scope, receive, send)
+    return time.perf_counter(), statuses[0]
+
+
+def run_wsgi(paths, workers, client_delay):
+    handler = WSGIHandler()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(lambda path: wsgi_request(handler, path, client_delay), paths))
+
+
+def run_asgi(paths, concurrency, client_delay):
+    handler = ASGIHandler()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def limited(path):
+        async with semaphore:
+            return await asgi_request(handler, path, client_delay)
+
+    async def main():
+        return await asyncio.gather(*(limited(path) for path in paths))
+
+    return asyncio.run(main())
+
+
+def measure_load(name, load, paths, repeat, **parameters):
+    """
+    Exécute ``load`` ``repeat`` fois et résume latences et débit.
+
+    Toutes les requêtes arrivent ensemble : la latence de chacune court
+    depuis le début de la rafale et inclut donc l'attente d'un thread libre.
+    """
+    walls = []
+    latencies = []
+    errors = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        responses = load(paths)
+        walls.append(time.perf_counter() - start)
+        latencies.extend(finished - start for finished, status in responses)
+        errors += sum(1 for finished, status in responses if status != 200)
+    wall = statistics.median(walls)
+    return {
+        'suite': 'concurrency',
+        'name': name,
+        'count': len(paths),
+        'errors': errors,
+        'wall': wall,
+        'requests_per_second': len(paths) / wall,
+        **parameters,
+        **summarize(latencies),
+    }
+
+
+def run(count=400, repeat=1, concurrency=1000, workers=8, client_delay=0.25, assertions=200, **options):
+    with temporary_database():
+        seed(assertions=assertions)
+        pks = list(Assertion.objects.values_list('pk', flat=True))
+        # Les deux variantes servent le même cache matérialisé
+        credential_cache.warm(Assertion.objects.all(), f'http://{HOST}')
+        sync_paths = [reverse('core:badges-detail', args=[pks[index % len(pks)]]) for index in range(count)]
+        async_paths = [reverse('core:async-badges-detail', args=[pks[index % len(pks)]]) for index in range(count)]
+
+        return [
+            measure_load(
+                'wsgi (sync)',
+                lambda paths: run_wsgi(paths, workers, client_delay),
+                sync_paths, repeat, workers=workers, client_delay=client_delay
+            ),
+            measure_load(
+                'asgi (async)',
+                lambda paths: run_asgi(paths, concurrency, client_delay),
+                async_paths, repeat, concurrency=concurrency, client_delay=client_delay
+            ),
+        ]
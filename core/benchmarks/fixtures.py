@@ -0,0 +1,143 @@
+"""Base de données temporaire et générateur de données pour les bancs d'essai.
+
+Les bancs d'essai qui interrogent l'API tournent sur une base de test
+créée pour l'occasion (comme ``manage.py test``) : la base configurée
+n'est jamais modifiée.
+"""
+
+import random
+import uuid
+from contextlib import contextmanager
+
+from django.test.utils import (
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+
+from core.models import Assertion, BadgeClass, Endorsement, EndorsementType, Issuer, User
+from core.models.badge import BadgeVersion
+
+# Nombre d'assertions des échelles prédéfinies (option --scale)
+SCALES = {
+    '1k': 1_000,
+    '10k': 10_000,
+    '100k': 100_000,
+    '1m': 1_000_000,
+}
+
+# Taille des lots d'insertion : la mémoire reste bornée jusqu'au million d'assertions
+BATCH_SIZE = 5_000
+
+
+@contextmanager
+def temporary_database():
+    """Crée les bases de test le temps du bloc, puis les détruit"""
+    setup_test_environment()
+    old_config = setup_databases(verbosity=0, interactive=False)
+    try:
+        yield
+    finally:
+        teardown_databases(old_config, verbosity=0)
+        teardown_test_environment()
+
+
+def make_endorsements(targets, endorsement_type, field, endorsers, count, rng):
+    """Construit ``count`` endorsements (non enregistrés) pour chaque cible"""
+    return [
+        Endorsement(
+            id=str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+            type=endorsement_type,
+            endorser=rng.choice(endorsers),
+            claim={'text': 'Endorsement de test'},
+            **{field: target}
+        )
+        for target in targets
+        for _ in range(count)
+    ]
+
+
+def seed(assertions=1_000, issuers=None, badges=None, endorsements=2, endorsers=10, seed_value=0):
+    """
+    Remplit la base avec un jeu de données synthétique et reproductible.
+
+    Par défaut, un émetteur pour 1 000 assertions et un badge pour 20.
+    Chaque émetteur, badge et assertion reçoit ``endorsements`` endorsements
+    d'un endorser tiré parmi ``endorsers``. Les objets sont insérés en masse
+    par lots de ``BATCH_SIZE`` : les signaux ne sont pas émis.
+
+    Retourne le nombre d'objets créés par type.
+    """
+    rng = random.Random(seed_value)
+    issuers = issuers or max(1, assertions // 1_000)
+    badges = max(badges or assertions // 20, issuers)
+
+    endorser_list = User.objects.bulk_create([
+        User(email=f'endorser{index}@benchmark.example', password='!', display_name=f'Endorser {index}')
+        for index in range(endorsers)
+    ])
+    owner = endorser_list[0]
+    issuer_list = Issuer.objects.bulk_create([
+        Issuer(
+            name=f'Émetteur {index}',
+            url=f'https://issuer{index}.benchmark.example',
+            email=f'issuer{index}@benchmark.example',
+            image=f'https://issuer{index}.benchmark.example/logo.png',
+            description='Organisme de formation de test.',
+            version=BadgeVersion.V3.value,
+            owner=owner
+        )
+        for index in range(issuers)
+    ])
+    badge_list = BadgeClass.objects.bulk_create([
+        BadgeClass(
+            name=f'Badge {index}',
+            description='Valide la maîtrise des outils numériques collaboratifs.',
+            criteria_url=f'https://benchmark.example/badges/{index}/criteria',
+            issuer=issuer_list[index % issuers],
+            version=BadgeVersion.V3.value
+        )
+        for index in range(badges)
+    ], batch_size=BATCH_SIZE)
+
+    endorsement_count = 0
+    for targets, endorsement_type, field in [
+        (issuer_list, EndorsementType.ISSUER, 'issuer'),
+        (badge_list, EndorsementType.BADGE_CLASS, 'badge_class'),
+    ]:
+        created = Endorsement.objects.bulk_create(
+            make_endorsements(targets, endorsement_type, field, endorser_list, endorsements, rng),
+            batch_size=BATCH_SIZE
+        )
+        endorsement_count += len(created)
+
+    for start in range(0, assertions, BATCH_SIZE):
+        indexes = range(start, min(start + BATCH_SIZE, assertions))
+        recipients = User.objects.bulk_create([
+            User(email=f'recipient{index}@benchmark.example', password='!')
+            for index in indexes
+        ])
+        badge_choices = [badge_list[rng.randrange(badges)] for _ in indexes]
+        assertion_list = Assertion.objects.bulk_create([
+            Assertion(
+                recipient=recipient,
+                badge_class=badge_class,
+                achievement=badge_class,
+                identifier=f'https://benchmark.example/assertions/{index}',
+                recipient_identifier=recipient.email,
+                version=BadgeVersion.V3.value
+            )
+            for index, recipient, badge_class in zip(indexes, recipients, badge_choices)
+        ])
+        created = Endorsement.objects.bulk_create(make_endorsements(
+            assertion_list, EndorsementType.ASSERTION, 'assertion', endorser_list, endorsements, rng
+        ))
+        endorsement_count += len(created)
+
+    return {
+        'issuers': issuers,
+        'badge_classes': badges,
+        'assertions': assertions,
+        'endorsements': endorsement_count,
+    }
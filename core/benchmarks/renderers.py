@@ -0,0 +1,88 @@
+"""Débit des renderers JSON sur une charge synthétique de credentials.
+
+Compare ``rest_framework.renderers.JSONRenderer`` et
+``core.renderers.OpenBadgeJSONRenderer`` sur une page de ``count``
+OpenBadgeCredential (10 000 par défaut) et rapporte les octets par seconde.
+"""
+
+import uuid
+from datetime import timedelta
+
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from core.jsonld import JSON_LD_CONTEXT
+from core.renderers import OpenBadgeJSONRenderer, orjson
+
+from . import measure, summarize
+
+
+def synthetic_credentials(count):
+    """Génère des credentials réalistes, avec dates et UUID non encore sérialisés"""
+    now = timezone.now()
+    endorsement = {
+        "type": ["EndorsementCredential"],
+        "id": str(uuid.uuid4()),
+        "issuanceDate": now,
+        "issuer": {
+            "type": ["Profile"],
+            "name": "Tiers-lieu Exemple",
+            "email": "contact@tiers-lieu.example",
+            "url": None,
+            "image": "https://tiers-lieu.example/avatar.png",
+        },
+        "credentialSubject": {
+            "type": ["EndorsementSubject"],
+            "id": 1,
+            "endorsementComment": "Badge pertinent pour les compétences numériques — validé.",
+        },
+    }
+    credentials = []
+    for index in range(count):
+        achievement = {
+            "type": ["Achievement"],
+            "achievementType": "Achievement",
+            "name": f"Compétence numérique {index % 50}",
+            "description": "Valide la maîtrise des outils numériques collaboratifs. " * 4,
+            "criteria": f"https://example.com/badges/{index % 50}/criteria",
+            "image": f"https://example.com/media/badges/{index % 50}.png",
+            "tag": [],
+            "version": "v3",
+            "endorsement": [endorsement],
+        }
+        credentials.append({
+            "@context": JSON_LD_CONTEXT,
+            "type": ["VerifiableCredential", "OpenBadgeCredential"],
+            "id": f"urn:uuid:{uuid.uuid4()}",
+            "uuid": uuid.uuid4(),
+            "name": f"{achievement['name']} Credential",
+            "awardedDate": now - timedelta(days=index),
+            "achievement": achievement,
+            "credentialSubject": {
+                "type": ["AchievementSubject"],
+                "identifier": f"recipient{index}@example.com",
+                "achievement": achievement,
+            },
+            "expirationDate": (now + timedelta(days=365)).isoformat(),
+        })
+    return credentials
+
+
+def run(count=10000, repeat=5, **options):
+    payload = {"next": None, "previous": None, "results": synthetic_credentials(count)}
+    results = []
+    for name, renderer in [
+        ('drf-json', JSONRenderer()),
+        ('openbadge-json' if orjson is None else 'openbadge-json (orjson)', OpenBadgeJSONRenderer()),
+    ]:
+        size = len(renderer.render(payload))
+        stats = summarize(measure(lambda: renderer.render(payload), repeat))
+        results.append({
+            'suite': 'renderers',
+            'name': name,
+            'count': count,
+            'bytes': size,
+            'bytes_per_second': size / stats['median'],
+            **stats,
+        })
+    return results
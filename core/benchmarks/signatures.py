@@ -0,0 +1,32 @@
+"""Débit de signature et de vérification par profil de clé.
+
+Pour chaque profil de ``core.utils.crypto_benchmark.PROFILES`` (RSA-PSS
+2048 à 4096 bits, Ed25519, ECDSA secp256k1), signe puis vérifie ``count``
+messages de 1 Kio, ``repeat`` fois, avec la même mesure que le conseil de
+type de clé de l'admin (``measure_operations``). Le résultat indique le
+débit en opérations par seconde, la taille des signatures (en octets) et, pour
+secp256k1, la bibliothèque utilisée (``coincurve`` ou ``cryptography``).
+"""
+
+from core.utils.crypto_benchmark import PROFILES, get_backend, get_label, measure_operations, rate
+
+from . import summarize
+
+
+def run(count=1000, repeat=5, profiles=None, **options):
+    results = []
+    for key_type, key_size in profiles or PROFILES:
+        measured = measure_operations(
+            key_type, key_size, duration=0, batch_size=count, repeat=repeat, operations=('sign', 'verify')
+        )
+        for operation, samples in measured['samples'].items():
+            results.append({
+                'suite': 'signatures',
+                'name': f'{get_label(key_type, key_size)} {operation}',
+                'backend': get_backend(key_type),
+                'count': count,
+                'signature_bytes': measured['signature_bytes'],
+                'ops_per_second': rate(samples, count),
+                **summarize(samples),
+            })
+    return results
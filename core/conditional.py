@@ -0,0 +1,208 @@
+"""Requêtes conditionnelles (ETag / Last-Modified / 304) pour l'API JSON-LD.
+
+La fraîcheur d'un document est calculée en une seule requête à partir des
+``updated_at`` des objets qu'il intègre (assertion, badge, émetteur) et
+d'une empreinte des endorsements (nombre et dernière modification, de
+l'endorsement ou du profil de son endorser, pour détecter aussi les
+suppressions et les changements de nom ou d'avatar). Une réponse 304 est donc renvoyée sans
+jamais construire le corps JSON-LD.
+
+Chaque requête de fraîcheur est un ``FreshnessQuery`` évaluable depuis une
+vue synchrone (``evaluate``) ou asynchrone (``aevaluate``).
+"""
+
+import hashlib
+from typing import NamedTuple, Optional
+
+from django.db.models import Count, DateTimeField, F, IntegerField, Max, OuterRef, QuerySet, Subquery
+from django.db.models.functions import Greatest
+from django.http import Http404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from .jsonld import FORMAT_VERSION, FieldSet
+from .models import Issuer, BadgeClass, Assertion, Endorsement, CredentialCache, StatusList
+from .utils.ids import parse_pk
+
+
+class Freshness(NamedTuple):
+    etag: str
+    last_modified: int
+    cached_content: Optional[str] = None
+
+
+def endorsement_stats(field, outer_ref):
+    """
+    Annotations (nombre, dernière modification) des endorsements liés à
+    ``outer_ref`` ; la modification du profil d'un endorser compte aussi.
+    """
+    endorsements = Endorsement.objects.filter(**{field: OuterRef(outer_ref)}).order_by().values(field)
+    return {
+        f'{field}_endorsements': Subquery(
+            endorsements.annotate(count=Count('pk')).values('count'),
+            output_field=IntegerField()
+        ),
+        f'{field}_endorsed_at': Subquery(
+            endorsements.annotate(
+                last=Greatest(Max('updated_at'), Max('endorser__updated_at'))
+            ).values('last'),
+            output_field=DateTimeField()
+        ),
+    }
+
+
+def make_freshness(request, kind, values, cached_content=None):
+    """Construit l'ETag fort et la date de dernière modification d'un document"""
+    timestamps = [value for value in values if hasattr(value, 'timestamp')]
+    parts = [
+        FORMAT_VERSION,
+        kind,
+        request.build_absolute_uri('/'),
+        # Les vues asynchrones, hors DRF, ne servent que du JSON
+        getattr(request, 'accepted_media_type', None) or 'application/json',
+        str(FieldSet.parse(request.GET.get('fields'))),
+        request.GET.get('issuer', ''),
+    ]
+    parts.extend(value.isoformat() if hasattr(value, 'isoformat') else str(value) for value in values)
+    digest = hashlib.sha256('|'.join(parts).encode()).hexdigest()[:32]
+    return Freshness(
+        etag=f'"{digest}"',
+        last_modified=int(max(timestamps).timestamp()),
+        cached_content=cached_content
+    )
+
+
+class FreshnessQuery(NamedTuple):
+    """Requête de fraîcheur d'un document, évaluable en synchrone ou en asynchrone"""
+    kind: str
+    queryset: QuerySet
+    with_content: bool = False
+
+    def resolve(self, request, row):
+        if row is None:
+            raise Http404
+        if self.with_content:
+            return make_freshness(request, self.kind, row[:-1], cached_content=row[-1])
+        return make_freshness(request, self.kind, row)
+
+    def evaluate(self, request):
+        return self.resolve(request, self.queryset.first())
+
+    async def aevaluate(self, request):
+        return self.resolve(request, await self.queryset.afirst())
+
+
+def get_pk(pk):
+    """
+    Clé primaire reçue du client, validée avant de construire la requête :
+    ``filter(pk='abc')`` lève dès sa construction. 404 si elle est invalide.
+    """
+    pk = parse_pk(pk)
+    if pk is None:
+        raise Http404
+    return pk
+
+
+def credential_query(pk, base_url=None):
+    """
+    Requête de fraîcheur d'un OpenBadgeCredential.
+
+    Si ``base_url`` est fourni, le document matérialisé correspondant est
+    récupéré dans la même requête.
+    """
+    annotations = {
+        'badge_updated_at': F('badge_class__updated_at'),
+        'issuer_updated_at': F('badge_class__issuer__updated_at'),
+        **endorsement_stats('assertion', 'pk'),
+        **endorsement_stats('badge_class', 'badge_class_id'),
+        **endorsement_stats('issuer', 'badge_class__issuer_id'),
+    }
+    if base_url is not None:
+        annotations['cached_content'] = Subquery(CredentialCache.objects.filter(
+            assertion=OuterRef('pk'),
+            base_url=base_url,
+            version=FORMAT_VERSION
+        ).values('content')[:1])
+    fields = ['pk', 'updated_at', *annotations]
+    queryset = Assertion.objects.filter(pk=get_pk(pk)).annotate(**annotations).values_list(*fields)
+    return FreshnessQuery('credential', queryset, with_content=base_url is not None)
+
+
+def achievement_query(pk):
+    """Requête de fraîcheur de l'Achievement d'une assertion"""
+    annotations = {
+        'badge_id': F('badge_class_id'),
+        'badge_updated_at': F('badge_class__updated_at'),
+        **endorsement_stats('badge_class', 'badge_class_id'),
+    }
+    return FreshnessQuery(
+        'achievement',
+        Assertion.objects.filter(pk=get_pk(pk)).annotate(**annotations).values_list(*annotations)
+    )
+
+
+def badge_class_query(pk):
+    """Requête de fraîcheur de l'Achievement d'un BadgeClass"""
+    annotations = endorsement_stats('badge_class', 'pk')
+    return FreshnessQuery(
+        'achievement',
+        BadgeClass.objects.filter(pk=get_pk(pk)).annotate(**annotations).values_list('pk', 'updated_at', *annotations)
+    )
+
+
+def issuer_query(pk):
+    """Requête de fraîcheur du Profile d'un émetteur"""
+    annotations = endorsement_stats('issuer', 'pk')
+    return FreshnessQuery(
+        'profile',
+        Issuer.objects.filter(pk=get_pk(pk)).annotate(**annotations).values_list('pk', 'updated_at', *annotations)
+    )
+
+
+def status_list_query(pk):
+    """Requête de fraîcheur de la liste de statut d'un émetteur"""
+    return FreshnessQuery(
+        'status-list',
+        StatusList.objects.filter(issuer_id=get_pk(pk)).values_list('issuer_id', 'revision', 'updated_at')
+    )
+
+
+def credential_freshness(request, pk, base_url=None):
+    """Fraîcheur d'un OpenBadgeCredential (et son document matérialisé si ``base_url`` est fourni)"""
+    return credential_query(pk, base_url).evaluate(request)
+
+
+def achievement_freshness(request, pk):
+    """Fraîcheur de l'Achievement d'une assertion"""
+    return achievement_query(pk).evaluate(request)
+
+
+def badge_class_freshness(request, pk):
+    """Fraîcheur de l'Achievement d'un BadgeClass"""
+    return badge_class_query(pk).evaluate(request)
+
+
+def issuer_freshness(request, pk):
+    """Fraîcheur du Profile d'un émetteur"""
+    return issuer_query(pk).evaluate(request)
+
+
+def status_list_freshness(request, pk):
+    """Fraîcheur de la liste de statut d'un émetteur"""
+    return status_list_query(pk).evaluate(request)
+
+
+def not_modified(request, freshness):
+    """Retourne une réponse 304 (ou 412) si le client possède déjà la version courante"""
+    return get_conditional_response(
+        request,
+        etag=freshness.etag,
+        last_modified=freshness.last_modified
+    )
+
+
+def add_conditional_headers(response, freshness):
+    """Ajoute ETag et Last-Modified à une réponse"""
+    response['ETag'] = freshness.etag
+    response['Last-Modified'] = http_date(freshness.last_modified)
+    return response
@@ -0,0 +1,139 @@
+"""Cache matérialisé des OpenBadgeCredential.
+
+Les assertions ne changent quasiment plus après leur émission : plutôt que
+de reconstruire le document JSON-LD à chaque lecture, on le stocke déjà
+sérialisé dans ``CredentialCache``. Une lecture à chaud se résume alors à
+une recherche sur l'index unique ``(assertion, base_url, version)``.
+
+L'invalidation est pilotée par les signaux déclarés dans ``core.signals``.
+"""
+
+from itertools import islice
+
+from django.db.models import Exists, OuterRef, Q
+
+from .jsonld import FORMAT_VERSION, OpenBadgeBuilder, plan_assertions
+from .models import CredentialCache, User
+from .renderers import dumps
+
+# Champs de l'utilisateur intégrés dans les profils d'endorsement
+USER_PROFILE_FIELDS = User.PROFILE_FIELDS
+
+
+def get_base_url(request):
+    """Retourne l'URL de base d'une requête, sans barre oblique finale"""
+    return request.build_absolute_uri('/').rstrip('/')
+
+
+def get_cached_credential(assertion_id, base_url):
+    """Retourne le credential sérialisé d'une assertion, ou None"""
+    try:
+        return CredentialCache.objects.filter(
+            assertion_id=assertion_id,
+            base_url=base_url,
+            version=FORMAT_VERSION
+        ).values_list('content', flat=True).first()
+    except (TypeError, ValueError):
+        return None
+
+
+# Remplacement des entrées existantes pour la même clé
+UPSERT = {
+    'update_conflicts': True,
+    'unique_fields': ['assertion', 'base_url', 'version'],
+    'update_fields': ['content', 'created_at'],
+}
+
+
+def build_entries(documents, base_url):
+    """Sérialise des couples ``(assertion_id, document)`` en entrées de cache"""
+    return [
+        CredentialCache(
+            assertion_id=assertion_id,
+            base_url=base_url,
+            version=FORMAT_VERSION,
+            content=dumps(document)
+        )
+        for assertion_id, document in documents
+    ]
+
+
+def store_credentials(documents, base_url):
+    """
+    Enregistre des credentials déjà construits.
+
+    ``documents`` est un itérable de couples ``(assertion_id, document)``.
+    Les entrées existantes pour la même clé sont remplacées.
+    """
+    entries = build_entries(documents, base_url)
+    CredentialCache.objects.bulk_create(entries, **UPSERT)
+    return entries
+
+
+async def astore_credentials(documents, base_url):
+    """Variante asynchrone de ``store_credentials``"""
+    entries = build_entries(documents, base_url)
+    await CredentialCache.objects.abulk_create(entries, **UPSERT)
+    return entries
+
+
+def warm(queryset, base_url, chunk_size=500, rebuild=False):
+    """
+    Construit en masse le cache des assertions d'un queryset.
+
+    Sans ``rebuild``, seules les assertions sans entrée à jour sont traitées.
+    Retourne le nombre de credentials mis en cache.
+    """
+    if rebuild:
+        CredentialCache.objects.filter(assertion__in=queryset, base_url=base_url).delete()
+    else:
+        queryset = queryset.filter(~Exists(CredentialCache.objects.filter(
+            assertion=OuterRef('pk'),
+            base_url=base_url,
+            version=FORMAT_VERSION
+        )))
+
+    builder = OpenBadgeBuilder(base_url=base_url)
+    count = 0
+    batch = []
+    for assertion in plan_assertions(queryset).iterator(chunk_size=chunk_size):
+        batch.append((assertion.pk, builder.get_assertion_json_ld(assertion)))
+        if len(batch) >= chunk_size:
+            count += len(store_credentials(batch, base_url))
+            batch = []
+    if batch:
+        count += len(store_credentials(batch, base_url))
+    return count
+
+
+def iter_credentials(queryset, base_url, chunk_size=500):
+    """
+    Parcourt les couples ``(assertion, credential sérialisé)`` d'un queryset.
+
+    Les credentials sont lus dans le cache matérialisé, une requête par lot ;
+    ceux qui manquent sont construits et mis en cache.
+    """
+    builder = OpenBadgeBuilder(base_url=base_url)
+    assertions = plan_assertions(queryset).iterator(chunk_size=chunk_size)
+    while chunk := list(islice(assertions, chunk_size)):
+        contents = dict(CredentialCache.objects.filter(
+            assertion_id__in=[assertion.pk for assertion in chunk],
+            base_url=base_url,
+            version=FORMAT_VERSION
+        ).values_list('assertion_id', 'content'))
+        missing = [
+            (assertion.pk, builder.get_assertion_json_ld(assertion))
+            for assertion in chunk if assertion.pk not in contents
+        ]
+        if missing:
+            contents.update((entry.assertion_id, entry.content) for entry in store_credentials(missing, base_url))
+        for assertion in chunk:
+            yield assertion, contents[assertion.pk]
+
+
+def invalidate(**lookups):
+    """Supprime les credentials en cache des assertions correspondant aux filtres (combinés en OU)"""
+    query = Q()
+    for lookup, value in lookups.items():
+        query |= Q(**{f'assertion__{lookup}': value})
+    CredentialCache.objects.filter(query).delete()
@@ -0,0 +1,141 @@
+"""Images dérivées de l'image d'un BadgeClass (miniatures, WebP, srcset).
+
+L'image téléversée (souvent un PNG de plusieurs centaines de kilo-octets)
+est réduite une fois, à l'enregistrement du BadgeClass (signal
+``post_save``), aux tailles de ``BADGE_IMAGE_SIZES`` (côté le plus long,
+en pixels, sans jamais agrandir), en PNG et en WebP. Les pages n'envoient
+plus que la variante adaptée à l'affichage (``srcset``), au lieu de
+l'original.
+
+Les dérivés sont nommés d'après l'empreinte SHA-256 de leur contenu
+(``badges/derivatives/ab/abcd….webp``) : une même image partagée par
+plusieurs badges, ou réenregistrée à l'identique, n'est écrite qu'une
+fois, et ses URLs ne changent jamais (cache navigateur illimité).
+
+Le résultat est conservé dans ``BadgeClass.image_derivatives`` :
+``{"source": nom de l'image, "variants": [...]}``, variantes par largeur
+croissante. Une image que Pillow ne sait pas lire (SVG, fichier absent) n'a
+pas de variantes : les gabarits affichent alors l'original.
+
+Exemple d'utilisation:
+    update(badge_class)
+    badge_class.image_derivatives['variants'][0]['webp']
+"""
+
+import hashlib
+import io
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+from django.conf import settings
+from django.core.files.base import ContentFile
+
+DERIVATIVES_DIR = 'badges/derivatives'
+
+# Tailles par défaut : liste (1x), carte et liste en haute densité (2x),
+# page de détail
+DEFAULT_SIZES = {'thumb': 100, 'card': 200, 'full': 512}
+
+# Formats produits : extension -> (format Pillow, options d'enregistrement)
+FORMATS = {
+    'webp': ('WEBP', {'quality': 85, 'method': 6}),
+    'png': ('PNG', {'optimize': True}),
+}
+
+
+def get_sizes():
+    """Tailles ``(nom, côté)`` par côté croissant"""
+    sizes = getattr(settings, 'BADGE_IMAGE_SIZES', DEFAULT_SIZES)
+    return sorted(sizes.items(), key=lambda item: item[1])
+
+
+def prepare(image):
+    """Image orientée selon ses métadonnées EXIF, en RGB ou RGBA"""
+    image = ImageOps.exif_transpose(image)
+    if image.mode in ('RGB', 'RGBA'):
+        return image
+    if image.mode in ('P', 'LA', 'PA', 'RGBa') or 'transparency' in image.info:
+        return image.convert('RGBA')
+    return image.convert('RGB')
+
+
+def encode(image, extension):
+    format_name, options = FORMATS[extension]
+    output = io.BytesIO()
+    image.save(output, format_name, **options)
+    return output.getvalue()
+
+
+def store(storage, content, extension):
+    """Enregistre ``content`` sous son empreinte, s'il n'y est pas déjà ; retourne son nom"""
+    digest = hashlib.sha256(content).hexdigest()
+    name = f'{DERIVATIVES_DIR}/{digest[:2]}/{digest}.{extension}'
+    if not storage.exists(name):
+        name = storage.save(name, ContentFile(content))
+    return name
+
+
+def generate(image):
+    """
+    Dérivés d'une image (``FieldFile``) : une variante par taille, avec sa
+    largeur, sa hauteur et le nom de chaque format. Les tailles qui
+    dépasseraient l'original sont omises.
+    """
+    derivatives = {'source': image.name, 'variants': []}
+    try:
+        image.open('rb')
+    except (FileNotFoundError, ValueError):
+        return derivatives
+    try:
+        with Image.open(image) as opened:
+            source = prepare(opened.copy())
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError):
+        return derivatives
+    finally:
+        image.close()
+
+    for name, size in get_sizes():
+        variant = source.copy()
+        variant.thumbnail((size, size), Image.Resampling.LANCZOS)
+        previous = derivatives['variants'][-1] if derivatives['variants'] else None
+        if previous and previous['width'] == variant.width:
+            # Original plus petit que cette taille : la variante précédente suffit
+            continue
+        derivatives['variants'].append({
+            'name': name,
+            'width': variant.width,
+            'height': variant.height,
+            **{extension: store(image.storage, encode(variant, extension), extension) for extension in FORMATS},
+        })
+    return derivatives
+
+
+def update(badge_class, force=False):
+    """
+    Génère les dérivés de l'image d'un BadgeClass s'ils ne correspondent pas
+    à l'image actuelle (ou si ``force``) ; retourne True s'ils ont été
+    régénérés. L'enregistrement passe par ``update()`` : ni ``updated_at``
+    ni les signaux ne sont touchés.
+    """
+    current = badge_class.image_derivatives or {}
+    if not force and current.get('source') == badge_class.image.name:
+        return False
+    derivatives = generate(badge_class.image) if badge_class.image else {}
+    type(badge_class).objects.filter(pk=badge_class.pk).update(image_derivatives=derivatives)
+    badge_class.image_derivatives = derivatives
+    return True
+
+
+def get_variants(image):
+    """Variantes d'une image de BadgeClass (``FieldFile``), vides si elles ne correspondent plus à l'image"""
+    derivatives = getattr(getattr(image, 'instance', None), 'image_derivatives', None) or {}
+    if not getattr(image, 'name', None) or derivatives.get('source') != image.name:
+        return []
+    return derivatives.get('variants', [])
+
+
+def get_srcset(image, extension='png'):
+    """Valeur d'un attribut ``srcset`` (``url largeurw, …``) pour un format, vide sans variantes"""
+    return ', '.join(
+        f"{image.storage.url(variant[extension])} {variant['width']}w"
+        for variant in get_variants(image)
+    )
@@ -0,0 +1,471 @@
+"""Construction des documents JSON-LD Open Badges v3.0.
+
+Ce module regroupe deux responsabilités :
+
+* le *plan de chargement* (``plan_assertions``, ``plan_badge_classes``) qui
+  prépare un queryset avec les ``select_related``/``Prefetch`` nécessaires
+  pour sérialiser une page entière en un nombre constant de requêtes ;
+* le ``OpenBadgeBuilder`` qui transforme les objets ainsi chargés en
+  documents JSON-LD en lisant les caches de prefetch plutôt que la base.
+
+Les deux acceptent un ``FieldSet`` (paramètre ``?fields=`` de l'API) : le
+plan ne charge alors que les colonnes et relations utiles, et le
+constructeur n'émet (ni ne lit) que les propriétés demandées.
+
+Exemple d'utilisation:
+    fields = FieldSet.parse('id,name,achievement.name')
+    builder = OpenBadgeBuilder(request=request)
+    assertions = plan_assertions(Assertion.objects.all(), fields)
+    documents = [builder.get_assertion_json_ld(a, fields) for a in assertions]
+"""
+
+from django.contrib.auth import get_user_model
+from django.db.models import Prefetch
+from django.urls import reverse
+
+from .models.badge import Issuer, BadgeClass, Assertion
+from .models.endorsement import Endorsement
+
+JSON_LD_CONTEXT = "https://purl.imsglobal.org/spec/ob/v3p0/context-3.0.3.json"
+
+# Version du format produit par OpenBadgeBuilder : à incrémenter à chaque
+# changement de la forme des documents pour invalider les caches matérialisés
+FORMAT_VERSION = '4'
+
+# Valeur sentinelle : propriété absente du document
+OMIT = object()
+
+
+class FieldSet:
+    """
+    Sélection de propriétés d'un document JSON-LD.
+
+    ``tree`` vaut None pour « toutes les propriétés », sinon un dictionnaire
+    dont chaque clé est une propriété demandée associée à la sélection de ses
+    sous-propriétés (None si la propriété est demandée en entier).
+    """
+
+    def __init__(self, tree=None):
+        self.tree = tree
+
+    @classmethod
+    def parse(cls, value):
+        """Construit une sélection à partir de chemins pointés séparés par des virgules"""
+        if not value:
+            return ALL_FIELDS
+        tree = {}
+        for path in value.split(','):
+            keys = [key.strip() for key in path.split('.') if key.strip()]
+            if not keys:
+                continue
+            node = tree
+            for key in keys[:-1]:
+                if key in node and node[key] is None:
+                    break
+                node = node.setdefault(key, {})
+            else:
+                node[keys[-1]] = None
+        return cls(tree) if tree else ALL_FIELDS
+
+    @property
+    def is_all(self):
+        return self.tree is None
+
+    def __contains__(self, key):
+        return self.tree is None or key in self.tree
+
+    def __getitem__(self, key):
+        if self.tree is None:
+            return self
+        return FieldSet(self.tree.get(key))
+
+    def __eq__(self, other):
+        return isinstance(other, FieldSet) and self.tree == other.tree
+
+    def __hash__(self):
+        return hash(repr(self.tree))
+
+    def __str__(self):
+        if self.tree is None:
+            return ''
+
+        def paths(tree, prefix=''):
+            for key, subtree in sorted(tree.items()):
+                if subtree is None:
+                    yield prefix + key
+                else:
+                    yield from paths(subtree, f'{prefix}{key}.')
+        return ','.join(paths(self.tree))
+
+
+ALL_FIELDS = FieldSet()
+
+# Colonnes lues pour chaque propriété d'un Achievement
+ACHIEVEMENT_COLUMNS = {
+    'achievementType': ['type'],
+    'name': ['name'],
+    'description': ['description'],
+    'criteria': ['criteria_url'],
+    'image': ['image'],
+    'version': ['version'],
+}
+
+# Colonnes lues pour chaque propriété du Profile d'un émetteur
+PROFILE_COLUMNS = {
+    'name': ['name'],
+    'email': ['email'],
+    'url': ['url'],
+    'image': ['image'],
+    'description': ['description'],
+}
+
+# Colonnes lues pour chaque propriété d'un OpenBadgeCredential
+CREDENTIAL_COLUMNS = {
+    'type': ['credential_type'],
+    'id': ['credential_id', 'identifier'],
+    'name': ['badge_class__name'],
+    'awardedDate': ['issued_on'],
+    'evidence': ['evidence_url', 'narrative'],
+    'expirationDate': ['expires'],
+    'credentialStatus': ['status_list_index', 'badge_class__issuer'],
+    'proof': ['signature', 'merkle_proof', 'badge_class__issuer'],
+}
+
+
+def project(fields, entries):
+    """
+    Construit un document ne contenant que les propriétés sélectionnées.
+
+    ``entries`` associe chaque propriété à une fonction recevant la
+    sous-sélection ; elle n'est appelée que si la propriété est demandée et
+    peut retourner ``OMIT`` pour ne pas l'émettre.
+    """
+    document = {}
+    for key, build in entries.items():
+        if key in fields:
+            value = build(fields[key])
+            if value is not OMIT:
+                document[key] = value
+    return document
+
+
+def endorsements_prefetch(lookup):
+    """Retourne un Prefetch des endorsements avec leur endorser déjà joint"""
+    return Prefetch(
+        lookup,
+        queryset=Endorsement.objects.select_related('endorser').order_by('-issued_on')
+    )
+
+
+def achievement_columns(fields, prefix=''):
+    """Colonnes du BadgeClass nécessaires à un Achievement"""
+    columns = {f'{prefix}id'}
+    for key, names in ACHIEVEMENT_COLUMNS.items():
+        if key in fields:
+            columns.update(prefix + name for name in names)
+    return columns
+
+
+def profile_columns(fields, prefix=''):
+    """Colonnes de l'Issuer nécessaires à un Profile"""
+    columns = {f'{prefix}id'}
+    for key, names in PROFILE_COLUMNS.items():
+        if key in fields:
+            columns.update(prefix + name for name in names)
+    return columns
+
+
+def embeds_issuer(query_params, default=True):
+    """
+    Le Profile de l'émetteur est-il intégré aux credentials : oui avec
+    ``?issuer=embed``, non avec ``?issuer=ref``, ``default`` sinon
+    """
+    value = query_params.get('issuer')
+    if value in ('embed', 'ref'):
+        return value == 'embed'
+    return default
+
+
+def plan_badge_classes(queryset, prefix='', fields=ALL_FIELDS):
+    """Prépare un queryset de BadgeClass (ou d'objets liés via ``prefix``) pour la sérialisation en Achievement"""
+    if not fields.is_all:
+        queryset = queryset.only('id', *achievement_columns(fields, prefix))
+    if 'endorsement' in fields:
+        queryset = queryset.prefetch_related(endorsements_prefetch(f'{prefix}endorsements'))
+    return queryset
+
+
+def plan_assertions(queryset, fields=ALL_FIELDS, embed_issuer=True):
+    """
+    Prépare un queryset d'Assertion pour la sérialisation en OpenBadgeCredential.
+
+    Le nombre de requêtes est constant quelle que soit la taille de la page :
+    une requête pour les assertions, leur badge et leur émetteur, puis une
+    par relation d'endorsements préchargée. Avec une sélection de
+    propriétés, seules les colonnes et relations utiles sont chargées.
+
+    Sans ``embed_issuer``, l'émetteur n'est référencé que par son
+    identifiant : ni sa ligne ni ses endorsements ne sont lus.
+    """
+    if fields.is_all:
+        if not embed_issuer:
+            return queryset.select_related('badge_class').prefetch_related(
+                endorsements_prefetch('endorsements'),
+                endorsements_prefetch('badge_class__endorsements'),
+            )
+        return queryset.select_related('badge_class__issuer').prefetch_related(
+            endorsements_prefetch('endorsements'),
+            endorsements_prefetch('badge_class__endorsements'),
+            endorsements_prefetch('badge_class__issuer__endorsements'),
+        )
+
+    # issuance_date est la clé de tri de la pagination et de l'export
+    columns = {'id', 'issuance_date'}
+    for key, names in CREDENTIAL_COLUMNS.items():
+        if key in fields:
+            columns.update(names)
+
+    achievements = []
+    if 'achievement' in fields:
+        achievements.append(fields['achievement'])
+    if 'credentialSubject' in fields:
+        subject = fields['credentialSubject']
+        if 'identifier' in subject:
+            columns.add('recipient_identifier')
+        if 'achievement' in subject:
+            achievements.append(subject['achievement'])
+    for achievement in achievements:
+        columns.update(achievement_columns(achievement, prefix='badge_class__'))
+
+    prefetches = []
+    if 'endorsement' in fields:
+        prefetches.append(endorsements_prefetch('endorsements'))
+    if any('endorsement' in achievement for achievement in achievements):
+        prefetches.append(endorsements_prefetch('badge_class__endorsements'))
+
+    related = 'badge_class'
+    if 'issuer' in fields:
+        if embed_issuer:
+            related = 'badge_class__issuer'
+            columns.update(profile_columns(fields['issuer'], prefix='badge_class__issuer__'))
+            if 'endorsement' in fields['issuer']:
+                prefetches.append(endorsements_prefetch('badge_class__issuer__endorsements'))
+        else:
+            columns.add('badge_class__issuer')
+
+    if any(column.startswith('badge_class__') for column in columns):
+        queryset = queryset.select_related(related)
+    return queryset.only(*columns).prefetch_related(*prefetches)
+
+
+def get_endorsements(obj):
+    """
+    Retourne les endorsements d'un objet, depuis le cache de prefetch s'il existe.
+
+    Sans prefetch, une requête est émise avec l'endorser joint pour éviter
+    une requête supplémentaire par endorsement.
+    """
+    if 'endorsements' in getattr(obj, '_prefetched_objects_cache', {}):
+        return obj.endorsements.all()
+    return obj.endorsements.select_related('endorser').order_by('-issued_on')
+
+
+class OpenBadgeBuilder:
+    """
+    Convertit les modèles en documents JSON-LD v3.0.
+
+    Les URLs d'images sont rendues absolues à partir de la requête si elle est
+    fournie, sinon à partir de ``base_url`` (utile hors cycle requête/réponse).
+    """
+
+    def __init__(self, request=None, base_url=None, embed_issuer=True):
+        self.request = request
+        self.base_url = base_url.rstrip('/') if base_url else None
+        self.embed_issuer = embed_issuer
+        # Profiles des émetteurs déjà construits, partagés entre les credentials
+        self.profiles = {}
+
+    def get_json_ld_context(self):
+        """Retourne le contexte JSON-LD v3.0 pour les Open Badges"""
+        return {
+            "@context": JSON_LD_CONTEXT
+        }
+
+    def build_absolute_uri(self, path):
+        """Retourne l'URL absolue d'un chemin local"""
+        if self.request is not None:
+            return self.request.build_absolute_uri(path)
+        if self.base_url:
+            return f"{self.base_url}{path}"
+        return path
+
+    def get_image_url(self, image):
+        """Retourne l'URL absolue d'une image"""
+        if not image:
+            return None
+        if isinstance(image, str) and (image.startswith('http://') or image.startswith('https://')):
+            return image
+        try:
+            return self.build_absolute_uri(image.url)
+        except (AttributeError, ValueError):
+            return None
+
+    def get_achievement_json_ld(self, badge_class, fields=ALL_FIELDS):
+        """Convertit un BadgeClass en Achievement JSON-LD"""
+        return project(fields, {
+            "type": lambda f: ["Achievement"],
+            "achievementType": lambda f: badge_class.type,
+            "name": lambda f: badge_class.name,
+            "description": lambda f: badge_class.description,
+            "criteria": lambda f: badge_class.criteria_url,
+            "image": lambda f: self.get_image_url(badge_class.image),
+            "tag": lambda f: badge_class.tags.names() if hasattr(badge_class, 'tags') else [],
+            "version": lambda f: str(badge_class.version),
+            # Les endorsements ne sont ajoutés que s'il y en a
+            "endorsement": lambda f: self.get_endorsements_json_ld(badge_class, f) or OMIT,
+        })
+
+    def get_profile_json_ld(self, profile, fields=ALL_FIELDS):
+        """Convertit un Profile ou User en JSON-LD"""
+        if isinstance(profile, get_user_model()):
+            # C'est un utilisateur
+            return project(fields, {
+                "type": lambda f: ["Profile"],
+                "name": lambda f: profile.display_name or profile.email,
+                "email": lambda f: profile.email,
+                "url": lambda f: None,
+                "image": lambda f: profile.avatar_url if hasattr(profile, 'avatar_url') else None,
+            })
+        # C'est un Profile standard (Issuer)
+        return project(fields, {
+            "id": lambda f: self.get_issuer_url(profile.pk),
+            "type": lambda f: ["Profile"],
+            "name": lambda f: profile.name,
+            "email": lambda f: profile.email,
+            "url": lambda f: profile.url,
+            "image": lambda f: self.get_image_url(profile.image),
+            "description": lambda f: profile.description or OMIT,
+            # Les endorsements ne sont ajoutés que s'il y en a
+            "endorsement": lambda f: self.get_endorsements_json_ld(profile, f) or OMIT,
+        })
+
+    def get_credential_url(self, assertion_id):
+        """Retourne l'URL absolue d'un credential hébergé (/api/v3/badges/{id}/)"""
+        return self.build_absolute_uri(reverse('core:badges-detail', args=[assertion_id]))
+
+    def get_issuer_url(self, issuer_id):
+        """Retourne l'URL absolue du Profile d'un émetteur (/api/v3/issuers/{id}/)"""
+        return self.build_absolute_uri(reverse('core:issuers-detail', args=[issuer_id]))
+
+    def get_status_list_url(self, issuer_id):
+        """Retourne l'URL absolue de la liste de statut d'un émetteur (/api/v3/status-lists/{id}/)"""
+        return self.build_absolute_uri(reverse('core:status-lists-detail', args=[issuer_id]))
+
+    def get_issuer_json_ld(self, badge_class, fields=ALL_FIELDS):
+        """
+        Retourne l'émetteur d'un credential : le Profile complet, ou une
+        simple référence ``{"id", "type"}`` si ``embed_issuer`` est faux.
+        """
+        if not self.embed_issuer:
+            return project(fields, {
+                "id": lambda f: self.get_issuer_url(badge_class.issuer_id),
+                "type": lambda f: ["Profile"],
+            })
+        key = (badge_class.issuer_id, fields)
+        if key not in self.profiles:
+            self.profiles[key] = self.get_profile_json_ld(badge_class.issuer, fields)
+        return self.profiles[key]
+
+    def get_endorsements_json_ld(self, obj, fields=ALL_FIELDS):
+        """Récupère les endorsements pour un badge, un émetteur ou une assertion au format JSON-LD"""
+        if not isinstance(obj, (BadgeClass, Issuer, Assertion)):
+            return []
+
+        return [
+            project(fields, {
+                "type": lambda f: ["EndorsementCredential"],
+                "id": lambda f: endorsement.id,
+                "issuanceDate": lambda f: endorsement.issued_on.isoformat(),
+                "issuer": lambda f: self.get_profile_json_ld(endorsement.endorser, f),
+                "credentialSubject": lambda f: project(f, {
+                    "type": lambda f: ["EndorsementSubject"],
+                    "id": lambda f: obj.id,
+                    "endorsementComment": lambda f: endorsement.claim.get('text', ''),
+                }),
+            })
+            for endorsement in get_endorsements(obj)
+        ]
+
+    def get_evidence_json_ld(self, assertion, fields=ALL_FIELDS):
+        """Convertit les preuves d'une Assertion en liste d'Evidence JSON-LD"""
+        if not assertion.evidence_url:
+            return OMIT
+        return [project(fields, {
+            "type": lambda f: ["Evidence"],
+            "id": lambda f: assertion.evidence_url,
+            "narrative": lambda f: assertion.narrative,
+        })]
+
+    def get_status_json_ld(self, assertion, fields=ALL_FIELDS):
+        """Retourne l'entrée de la liste de statut d'une Assertion (voir ``core.status_list``)"""
+        if assertion.status_list_index is None:
+            return OMIT
+        url = self.get_status_list_url(assertion.badge_class.issuer_id)
+        return project(fields, {
+            "id": lambda f: f"{url}#{assertion.status_list_index}",
+            "type": lambda f: "BitstringStatusListEntry",
+            "statusPurpose": lambda f: "revocation",
+            "statusListIndex": lambda f: str(assertion.status_list_index),
+            "statusListCredential": lambda f: url,
+        })
+
+    def get_proof_json_ld(self, assertion, fields=ALL_FIELDS):
+        """
+        Retourne la preuve d'une Assertion signée (voir ``core.signing``).
+
+        Pour une cohorte signée en une fois, ``proofValue`` est la signature
+        de la racine de l'arbre de Merkle et ``merkleProof`` le chemin
+        d'inclusion du credential.
+        """
+        if not assertion.signature:
+            return OMIT
+        return project(fields, {
+            "type": lambda f: "DataIntegrityProof",
+            "proofPurpose": lambda f: "assertionMethod",
+            "verificationMethod": lambda f: self.get_issuer_url(assertion.badge_class.issuer_id),
+            "proofValue": lambda f: assertion.signature,
+            "merkleProof": lambda f: assertion.merkle_proof or OMIT,
+        })
+
+    def get_assertion_json_ld(self, assertion, fields=ALL_FIELDS):
+        """Convertit une Assertion en OpenBadgeCredential JSON-LD"""
+        # L'Achievement est construit une seule fois par sélection et partagé
+        # entre le credential et son credentialSubject
+        achievements = {}
+
+        def achievement(f):
+            if f not in achievements:
+                achievements[f] = self.get_achievement_json_ld(assertion.badge_class, f)
+            return achievements[f]
+
+        credential = {"@context": self.get_json_ld_context()["@context"]}
+        credential.update(project(fields, {
+            "type": lambda f: assertion.credential_type if assertion.credential_type else ["OpenBadgeCredential"],
+            "id": lambda f: assertion.credential_id or assertion.identifier,
+            "name": lambda f: f"{assertion.badge_class.name} Credential",
+            "awardedDate": lambda f: assertion.issued_on.isoformat(),
+            "issuer": lambda f: self.get_issuer_json_ld(assertion.badge_class, f),
+            "achievement": achievement,
+            "credentialSubject": lambda f: project(f, {
+                "type": lambda f: ["AchievementSubject"],
+                "identifier": lambda f: assertion.recipient_identifier,
+                "achievement": achievement,
+            }),
+            "evidence": lambda f: self.get_evidence_json_ld(assertion, f),
+            "expirationDate": lambda f: assertion.expires.isoformat() if assertion.expires else OMIT,
+            # Les endorsements ne sont ajoutés que s'il y en a
+            "endorsement": lambda f: self.get_endorsements_json_ld(assertion, f) or OMIT,
+            "credentialStatus": lambda f: self.get_status_json_ld(assertion, f),
+            "proof": lambda f: self.get_proof_json_ld(assertion, f),
+        }))
+        return credential
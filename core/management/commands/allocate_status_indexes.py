@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.models import Assertion
+from core.status_list import allocate
+
+
+class Command(BaseCommand):
+    help = "Attribue un index de liste de statut aux assertions qui n'en ont pas (assertions antérieures aux listes de statut)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--issuer', type=int, help="Limite l'attribution aux assertions d'un émetteur")
+        parser.add_argument('--chunk-size', type=int, help="Nombre d'assertions traitées par lot")
+
+    def handle(self, *args, **options):
+        queryset = Assertion.objects.filter(status_list_index__isnull=True)
+        if options['issuer']:
+            queryset = queryset.filter(badge_class__issuer=options['issuer'])
+        chunk_size = options['chunk_size'] or getattr(settings, 'API_EXPORT_CHUNK_SIZE', 500)
+        pks = list(queryset.order_by('pk').values_list('pk', flat=True))
+
+        count = 0
+        for start in range(0, len(pks), chunk_size):
+            count += allocate(
+                Assertion.objects.filter(pk__in=pks[start:start + chunk_size]).select_related('badge_class').order_by('pk')
+            )
+        self.stdout.write(self.style.SUCCESS(f"{count} index de statut attribué(s)"))
@@ -0,0 +1,101 @@
+import json
+import platform
+import subprocess
+from importlib import import_module
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core.benchmarks import SUITES
+from core.benchmarks.fixtures import SCALES
+
+
+class Command(BaseCommand):
+    help = "Exécute les bancs d'essai de performance et affiche (ou enregistre) les résultats"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'suites',
+            nargs='*',
+            choices=sorted(SUITES),
+            help="Bancs d'essai à exécuter (tous par défaut)"
+        )
+        parser.add_argument('--count', type=int, help="Taille de la charge synthétique")
+        parser.add_argument(
+            '--scale',
+            choices=list(SCALES),
+            help="Nombre d'assertions générées (raccourci de --count)"
+        )
+        parser.add_argument('--repeat', type=int, default=5, help="Nombre de répétitions par mesure")
+        parser.add_argument('--concurrency', type=int, help="Requêtes simultanées côté ASGI (concurrency)")
+        parser.add_argument('--workers', type=int, help="Threads du serveur WSGI simulé (concurrency)")
+        parser.add_argument('--client-delay', type=float, help="Temps de lecture simulé d'un client lent, en secondes (concurrency)")
+        parser.add_argument('--output', help="Fichier JSON où écrire les résultats")
+        parser.add_argument('--compare', help="Résultats précédents (--output) auxquels comparer les médianes")
+
+    def handle(self, *args, **options):
+        if options['scale']:
+            options['count'] = SCALES[options['scale']]
+        run_options = {'repeat': options['repeat']}
+        for name in ('count', 'concurrency', 'workers', 'client_delay'):
+            if options[name] is not None:
+                run_options[name] = options[name]
+
+        baseline = self.load_baseline(options['compare']) if options['compare'] else {}
+
+        results = []
+        for suite in options['suites'] or sorted(SUITES):
+            module = import_module(SUITES[suite])
+            for result in module.run(**run_options):
+                results.append(result)
+                self.stdout.write(self.format_result(result, baseline.get((result['suite'], result['name']))))
+
+        if options['output']:
+            report = {
+                'created_at': timezone.now().isoformat(),
+                'commit': self.get_commit(),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'database': settings.DATABASES['default']['ENGINE'],
+                'options': run_options,
+                'results': results,
+            }
+            with open(options['output'], 'w') as output:
+                json.dump(report, output, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Résultats écrits dans {options['output']}"))
+
+    def load_baseline(self, path):
+        try:
+            with open(path) as baseline:
+                report = json.load(baseline)
+        except (OSError, ValueError) as exc:
+            raise CommandError(f"Impossible de lire {path} : {exc}")
+        return {(result['suite'], result['name']): result for result in report['results']}
+
+    def get_commit(self):
+        """Commit courant, pour rattacher les résultats à une version du code"""
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'],
+                cwd=settings.BASE_DIR, capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    def format_result(self, result, previous=None):
+        line = f"{result['suite']:<12} {result['name']:<32} médiane {result['median'] * 1000:10.2f} ms"
+        if previous:
+            change = (result['median'] - previous['median']) / previous['median'] * 100
+            line += f" ({change:+6.1f} %)"
+        if 'bytes_per_second' in result:
+            line += f"  {result['bytes_per_second'] / 1e6:8.1f} Mo/s"
+        if 'ops_per_second' in result:
+            line += f"  {result['ops_per_second']:10.0f} op/s  {result['signature_bytes']:4d} octets ({result['backend']})"
+        if 'requests_per_second' in result:
+            line += f"  p95 {result['p95'] * 1000:8.2f} ms  {result['requests_per_second']:8.1f} req/s"
+        if 'queries' in result:
+            line += f"  p99 {result['p99'] * 1000:8.2f} ms  {result['queries']:4d} requêtes  {result['peak_memory'] / 1e6:8.2f} Mo"
+        if result.get('status', 200) != 200:
+            line = self.style.ERROR(f"{line}  HTTP {result['status']}")
+        return line
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from core.images import update
+from core.models import BadgeClass
+
+
+class Command(BaseCommand):
+    help = "Génère les images dérivées (miniatures PNG et WebP) des BadgeClass qui n'en ont pas encore (images antérieures à core.images)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--issuer', type=int, help="Limite la génération aux badges d'un émetteur")
+        parser.add_argument('--force', action='store_true', help="Régénère aussi les dérivés déjà à jour (après un changement de BADGE_IMAGE_SIZES)")
+
+    def handle(self, *args, **options):
+        queryset = BadgeClass.objects.exclude(image='')
+        if options['issuer']:
+            queryset = queryset.filter(issuer=options['issuer'])
+
+        count = 0
+        for badge_class in queryset.order_by('pk').iterator():
+            count += update(badge_class, force=options['force'])
+        self.stdout.write(self.style.SUCCESS(f"{count} badge(s) mis à jour"))
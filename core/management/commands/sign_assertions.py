@@ -0,0 +1,80 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Assertion, Issuer
+from core.signing import sign_assertions, sign_cohort
+
+
+class Command(BaseCommand):
+    help = (
+        "Signe en masse les assertions d'un émetteur avec sa clé privée. Les documents signés "
+        "sont construits depuis l'URL publique de l'API (--base-url, ou la variable d'environnement "
+        "API_BASE_URL) : l'API doit être servie depuis cette URL pour que les signatures restent "
+        "vérifiables. La signature est refusée tant que API_BASE_URL vaut http://localhost:8000."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('issuer', type=int, help="Identifiant de l'émetteur")
+        parser.add_argument(
+            '--key-file',
+            required=True,
+            help="Fichier contenant la clé privée de l'émetteur (PEM pour RSA, base64 pour Ed25519)"
+        )
+        parser.add_argument(
+            '--base-url',
+            help="URL de base publique de l'API (API_BASE_URL par défaut, obligatoire si elle n'est pas configurée)"
+        )
+        parser.add_argument('--workers', type=int, help="Processus de signature (nombre de processeurs par défaut)")
+        parser.add_argument('--chunk-size', type=int, help="Nombre d'assertions traitées par lot")
+        parser.add_argument(
+            '--resign',
+            action='store_true',
+            help=(
+                "Signe à nouveau les assertions déjà signées. Inutile après une modification de "
+                "l'émetteur, d'un badge ou d'un endorsement : leurs signatures sont effacées et "
+                "reprises sans cette option"
+            )
+        )
+        parser.add_argument(
+            '--merkle',
+            action='store_true',
+            help="Signe la cohorte en une fois : une signature de la racine d'un arbre de Merkle"
+        )
+        parser.add_argument('--badge-class', type=int, help="Limite la signature aux assertions d'un badge")
+
+    def handle(self, *args, **options):
+        try:
+            issuer = Issuer.objects.get(pk=options['issuer'])
+        except Issuer.DoesNotExist:
+            raise CommandError(f"Émetteur {options['issuer']} introuvable")
+        try:
+            with open(options['key_file']) as key_file:
+                private_key = key_file.read().strip()
+        except OSError as exc:
+            raise CommandError(f"Impossible de lire {options['key_file']} : {exc}")
+
+        queryset = Assertion.objects.all()
+        if options['badge_class']:
+            queryset = queryset.filter(badge_class=options['badge_class'])
+        try:
+            if options['merkle']:
+                count = sign_cohort(
+                    issuer,
+                    private_key,
+                    queryset,
+                    base_url=options['base_url'],
+                    chunk_size=options['chunk_size'],
+                    resign=options['resign']
+                )
+            else:
+                count = sign_assertions(
+                    issuer,
+                    private_key,
+                    queryset,
+                    base_url=options['base_url'],
+                    workers=options['workers'],
+                    chunk_size=options['chunk_size'],
+                    resign=options['resign']
+                )
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        self.stdout.write(self.style.SUCCESS(f"{count} assertion(s) signée(s) pour {issuer.name}"))
@@ -0,0 +1,34 @@
+import json
+from urllib.request import Request, urlopen
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.utils.contexts import CONTEXTS, CONTEXTS_DIR
+
+
+class Command(BaseCommand):
+    help = "Télécharge la version publiée des contextes JSON-LD embarqués dans core/contexts/"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'urls',
+            nargs='*',
+            help="URL des contextes à mettre à jour (tous par défaut)"
+        )
+        parser.add_argument('--timeout', type=int, default=30, help="Délai d'attente en secondes")
+
+    def handle(self, *args, **options):
+        urls = options['urls'] or list(CONTEXTS)
+        unknown = [url for url in urls if url not in CONTEXTS]
+        if unknown:
+            raise CommandError(f"Contexte(s) non déclaré(s) : {', '.join(unknown)}")
+
+        for url in urls:
+            request = Request(url, headers={'Accept': 'application/ld+json, application/json'})
+            with urlopen(request, timeout=options['timeout']) as response:
+                document = json.load(response)
+            if '@context' not in document:
+                raise CommandError(f"{url} n'est pas un contexte JSON-LD")
+            path = CONTEXTS_DIR / CONTEXTS[url]
+            path.write_text(json.dumps(document, indent=2, ensure_ascii=False) + '\n', encoding='utf-8')
+            self.stdout.write(self.style.SUCCESS(f"{url} -> {path.name}"))
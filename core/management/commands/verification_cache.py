@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from core import verification_cache
+
+
+class Command(BaseCommand):
+    help = "Affiche les compteurs du cache des verdicts de vérification (succès, échecs, taux)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help="Remet les compteurs à zéro après affichage"
+        )
+
+    def handle(self, *args, **options):
+        if verification_cache.get_cache() is None:
+            self.stdout.write(self.style.WARNING(
+                "Cache propre au processus (LocMemCache) : les verdicts ne sont pas mis en cache. "
+                "Configurer un cache partagé dans VERIFY_CACHE_ALIAS"
+            ))
+            return
+        stats = verification_cache.get_stats()
+        total = stats['hits'] + stats['misses']
+        ratio = stats['hits'] / total if total else 0
+        self.stdout.write(f"Succès : {stats['hits']}")
+        self.stdout.write(f"Échecs : {stats['misses']}")
+        self.stdout.write(f"Taux de succès : {ratio:.1%}")
+        if options['reset']:
+            verification_cache.reset_stats()
+            self.stdout.write(self.style.SUCCESS("Compteurs remis à zéro"))
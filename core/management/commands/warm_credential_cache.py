@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core import credential_cache
+from core.models import Assertion
+
+
+class Command(BaseCommand):
+    help = "Construit en masse le cache matérialisé des OpenBadgeCredential"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--base-url',
+            default=getattr(settings, 'API_BASE_URL', 'http://localhost:8000'),
+            help="URL de base publique de l'API (liens absolus des documents)"
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=getattr(settings, 'API_EXPORT_CHUNK_SIZE', 500),
+            help="Nombre d'assertions traitées par lot"
+        )
+        parser.add_argument(
+            '--rebuild',
+            action='store_true',
+            help="Reconstruit toutes les entrées au lieu de compléter les manquantes"
+        )
+
+    def handle(self, *args, **options):
+        base_url = options['base_url'].rstrip('/')
+        count = credential_cache.warm(
+            Assertion.objects.all(),
+            base_url,
+            chunk_size=options['chunk_size'],
+            rebuild=options['rebuild']
+        )
+        self.stdout.write(self.style.SUCCESS(f"{count} credential(s) mis en cache pour {base_url}"))
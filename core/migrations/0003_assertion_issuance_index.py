@@ -0,0 +1,17 @@
+# Generated by Django 5.1.15 on 2026-10-18 12:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_user_is_place_admin'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='assertion',
+            index=models.Index(fields=['-issuance_date', '-id'], name='assertion_issuance_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.1.15 on 2026-10-18 12:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_assertion_issuance_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CredentialCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('base_url', models.CharField(help_text='URL de base utilisée pour les liens absolus du document', max_length=255, verbose_name='URL de base')),
+                ('version', models.CharField(help_text='Version du format JSON-LD ayant produit le document', max_length=32, verbose_name='version du format')),
+                ('content', models.TextField(help_text='OpenBadgeCredential sérialisé en JSON', verbose_name='contenu')),
+                ('created_at', models.DateTimeField(auto_now=True, verbose_name='créé le')),
+                ('assertion', models.ForeignKey(help_text='Assertion dont le credential est mis en cache', on_delete=django.db.models.deletion.CASCADE, related_name='cached_credentials', to='core.assertion', verbose_name='assertion')),
+            ],
+            options={
+                'verbose_name': 'credential en cache',
+                'verbose_name_plural': 'credentials en cache',
+                'constraints': [models.UniqueConstraint(fields=('assertion', 'base_url', 'version'), name='credential_cache_unique_key')],
+            },
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.1.15 on 2026-10-18 12:52
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_credential_cache'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assertion',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now, verbose_name='mis à jour le'),
+            preserve_default=False,
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.1.15 on 2026-10-18 13:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_assertion_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assertion',
+            name='status_list_index',
+            field=models.PositiveIntegerField(blank=True, help_text="Position de l'assertion dans la liste de statut de son émetteur", null=True, verbose_name='index de statut'),
+        ),
+        migrations.CreateModel(
+            name='StatusList',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('size', models.PositiveIntegerField(help_text='Nombre de bits de la liste', verbose_name='taille')),
+                ('next_index', models.PositiveIntegerField(default=0, help_text='Index attribué à la prochaine assertion', verbose_name='prochain index')),
+                ('bitstring', models.BinaryField(help_text='Liste de bits brute, un bit par assertion', verbose_name='liste de bits')),
+                ('encoded_list', models.TextField(help_text='Liste compressée (GZIP) et encodée en base64url multibase', verbose_name='liste encodée')),
+                ('revision', models.PositiveIntegerField(default=0, help_text='Incrémentée à chaque modification de la liste', verbose_name='révision')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='mis à jour le')),
+                ('issuer', models.OneToOneField(help_text='Émetteur dont la liste recense les assertions', on_delete=django.db.models.deletion.CASCADE, related_name='status_list', to='core.issuer', verbose_name='émetteur')),
+            ],
+            options={
+                'verbose_name': 'liste de statut',
+                'verbose_name_plural': 'listes de statut',
+            },
+        ),
+    ]
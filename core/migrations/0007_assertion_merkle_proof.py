@@ -0,0 +1,19 @@
+# Generated by Django 5.1.15 on 2026-10-18 14:05
+
+import core.models.badge
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_status_list'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assertion',
+            name='merkle_proof',
+            field=core.models.badge.JSONTextField(blank=True, default=list, help_text="Chemin d'inclusion dans l'arbre de Merkle de sa cohorte, si la signature porte sur la racine de l'arbre", verbose_name='chemin Merkle'),
+        ),
+    ]
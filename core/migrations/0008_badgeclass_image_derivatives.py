@@ -0,0 +1,19 @@
+# Generated by Django 5.1.15 on 2026-10-18 14:40
+
+import core.models.badge
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_assertion_merkle_proof'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='badgeclass',
+            name='image_derivatives',
+            field=core.models.badge.JSONTextField(blank=True, default=dict, editable=False, help_text="Miniatures PNG et WebP de l'image (core.images)", verbose_name='images dérivées'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.15 on 2026-10-18 14:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_badgeclass_image_derivatives'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='mis à jour le'),
+        ),
+    ]
@@ -1,6 +1,8 @@
 from .badge import Issuer, BadgeClass, Assertion, Alignment
 from .user import User
 from .endorsement import Endorsement, EndorsementType
+from .cache import CredentialCache
+from .status import StatusList
 
 __all__ = [
     'User',
@@ -10,4 +12,6 @@ __all__ = [
     'Alignment',
     'Endorsement',
     'EndorsementType',
+    'CredentialCache',
+    'StatusList',
 ]
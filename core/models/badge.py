@@ -172,6 +172,13 @@ class BadgeClass(models.Model):
         upload_to='badges',
         help_text=_('Image du badge')
     )
+    image_derivatives = JSONTextField(
+        _('images dérivées'),
+        default=dict,
+        blank=True,
+        editable=False,
+        help_text=_('Miniatures PNG et WebP de l\'image (core.images)')
+    )
     criteria_url = models.URLField(
         _('critères'),
         validators=[URLValidator()],
@@ -373,6 +380,13 @@ class Assertion(models.Model):
         blank=True,
         help_text=_('Signature cryptographique de l\'assertion')
     )
+    merkle_proof = JSONTextField(
+        _('chemin Merkle'),
+        default=list,
+        default_type=list,
+        blank=True,
+        help_text=_('Chemin d\'inclusion dans l\'arbre de Merkle de sa cohorte, si la signature porte sur la racine de l\'arbre')
+    )
     expires_at = models.DateTimeField(
         _('expire le'),
         null=True,
@@ -389,12 +403,23 @@ class Assertion(models.Model):
         blank=True,
         help_text=_('Raison de la révocation du badge')
     )
+    status_list_index = models.PositiveIntegerField(
+        _('index de statut'),
+        null=True,
+        blank=True,
+        help_text=_('Position de l\'assertion dans la liste de statut de son émetteur')
+    )
+    updated_at = models.DateTimeField(_('mis à jour le'), auto_now=True)
 
     class Meta:
         verbose_name = _('assertion')
         verbose_name_plural = _('assertions')
         ordering = ['-issuance_date']
         unique_together = [['badge_class', 'recipient']]
+        indexes = [
+            # Clé de la pagination keyset de l'API
+            models.Index(fields=['-issuance_date', '-id'], name='assertion_issuance_idx'),
+        ]
 
     def __str__(self):
         return f"{self.achievement} - {self.recipient.email}"
@@ -0,0 +1,50 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+from .badge import Assertion
+
+
+class CredentialCache(models.Model):
+    """
+    Représentation JSON-LD matérialisée d'une assertion.
+
+    Le document est stocké déjà sérialisé, par URL de base (les URLs d'images
+    sont absolues) et par version du format produit par le constructeur
+    JSON-LD. Les lignes sont supprimées par signaux dès qu'un objet intégré
+    au document est modifié.
+    """
+    assertion = models.ForeignKey(
+        Assertion,
+        on_delete=models.CASCADE,
+        verbose_name=_('assertion'),
+        related_name='cached_credentials',
+        help_text=_('Assertion dont le credential est mis en cache')
+    )
+    base_url = models.CharField(
+        _('URL de base'),
+        max_length=255,
+        help_text=_('URL de base utilisée pour les liens absolus du document')
+    )
+    version = models.CharField(
+        _('version du format'),
+        max_length=32,
+        help_text=_('Version du format JSON-LD ayant produit le document')
+    )
+    content = models.TextField(
+        _('contenu'),
+        help_text=_('OpenBadgeCredential sérialisé en JSON')
+    )
+    created_at = models.DateTimeField(_('créé le'), auto_now=True)
+
+    class Meta:
+        verbose_name = _('credential en cache')
+        verbose_name_plural = _('credentials en cache')
+        constraints = [
+            models.UniqueConstraint(
+                fields=['assertion', 'base_url', 'version'],
+                name='credential_cache_unique_key'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.assertion_id} ({self.base_url}, {self.version})"
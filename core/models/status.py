@@ -0,0 +1,52 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+from .badge import Issuer
+
+
+class StatusList(models.Model):
+    """
+    Liste de statut (Bitstring Status List) des assertions d'un émetteur.
+
+    Chaque assertion reçoit un index dans la liste de son émetteur
+    (``Assertion.status_list_index``) ; le bit correspondant vaut 1 si elle
+    est révoquée. La liste brute est mise à jour bit par bit et sa forme
+    publiée (compressée, encodée) est recalculée à chaque modification.
+    """
+    issuer = models.OneToOneField(
+        Issuer,
+        on_delete=models.CASCADE,
+        verbose_name=_('émetteur'),
+        related_name='status_list',
+        help_text=_('Émetteur dont la liste recense les assertions')
+    )
+    size = models.PositiveIntegerField(
+        _('taille'),
+        help_text=_('Nombre de bits de la liste')
+    )
+    next_index = models.PositiveIntegerField(
+        _('prochain index'),
+        default=0,
+        help_text=_('Index attribué à la prochaine assertion')
+    )
+    bitstring = models.BinaryField(
+        _('liste de bits'),
+        help_text=_('Liste de bits brute, un bit par assertion')
+    )
+    encoded_list = models.TextField(
+        _('liste encodée'),
+        help_text=_('Liste compressée (GZIP) et encodée en base64url multibase')
+    )
+    revision = models.PositiveIntegerField(
+        _('révision'),
+        default=0,
+        help_text=_('Incrémentée à chaque modification de la liste')
+    )
+    updated_at = models.DateTimeField(_('mis à jour le'), auto_now=True)
+
+    class Meta:
+        verbose_name = _('liste de statut')
+        verbose_name_plural = _('listes de statut')
+
+    def __str__(self):
+        return f"{self.issuer_id} ({self.next_index}/{self.size})"
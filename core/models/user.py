@@ -43,6 +43,7 @@ class User(AbstractBaseUser, PermissionsMixin):
         help_text=_('Indique si ce compte est actif.')
     )
     date_joined = models.DateTimeField(_('date d\'inscription'), auto_now_add=True)
+    updated_at = models.DateTimeField(_('mis à jour le'), auto_now=True)
 
     # Validation d'email
     email_verified = models.BooleanField(
@@ -112,6 +113,9 @@ class User(AbstractBaseUser, PermissionsMixin):
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = []
 
+    # Champs intégrés dans les profils d'endorsement des credentials
+    PROFILE_FIELDS = {'email', 'display_name', 'avatar_url'}
+
     class Meta:
         verbose_name = _('utilisateur')
         verbose_name_plural = _('utilisateurs')
@@ -119,6 +123,13 @@ class User(AbstractBaseUser, PermissionsMixin):
     def __str__(self):
         return self.display_name or self.email
 
+    def save(self, *args, update_fields=None, **kwargs):
+        # updated_at date aussi les enregistrements partiels du profil public
+        # (ETag des credentials endorsés, core.conditional)
+        if update_fields is not None and self.PROFILE_FIELDS & set(update_fields):
+            update_fields = {*update_fields, 'updated_at'}
+        super().save(*args, update_fields=update_fields, **kwargs)
+
     def get_display_name(self):
         return self.display_name or self.email.split('@')[0]
 
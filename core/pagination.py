@@ -0,0 +1,137 @@
+"""Pagination par curseur (keyset) pour l'API JSON-LD.
+
+Contrairement à la pagination par offset, dont le coût croît avec la
+profondeur de la page, la pagination keyset filtre directement sur la
+clé de tri ``(issuance_date, id)`` : chaque page coûte le même parcours
+d'index, et l'insertion de nouvelles assertions pendant la navigation ne
+décale pas les pages suivantes.
+"""
+
+import base64
+import json
+from collections import OrderedDict
+from datetime import datetime
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Pagination keyset sur un champ de tri décroissant départagé par la clé primaire.
+
+    Le curseur est opaque pour le client : il encode la position du dernier
+    (ou du premier) élément de la page et le sens de parcours.
+    """
+    ordering_field = 'issuance_date'
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    invalid_cursor_message = _('Curseur invalide')
+
+    def get_page_size(self, request):
+        default = getattr(settings, 'API_PAGE_SIZE', 50)
+        maximum = getattr(settings, 'API_MAX_PAGE_SIZE', 500)
+        try:
+            page_size = int(request.GET[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return default
+        if page_size <= 0:
+            return default
+        return min(page_size, maximum)
+
+    def encode_cursor(self, position, pk, reverse):
+        payload = {'p': position.isoformat(), 'i': pk}
+        if reverse:
+            payload['r'] = 1
+        data = json.dumps(payload, separators=(',', ':')).encode()
+        cursor = base64.urlsafe_b64encode(data).decode().rstrip('=')
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request):
+        encoded = request.GET.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            data = base64.urlsafe_b64decode(encoded + '=' * (-len(encoded) % 4))
+            payload = json.loads(data)
+            return datetime.fromisoformat(payload['p']), int(payload['i']), bool(payload.get('r'))
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_page_queryset(self, queryset, request):
+        """Filtre et trie le queryset selon le curseur ; retourne la tranche à lire"""
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.cursor = self.decode_cursor(request)
+        field = self.ordering_field
+
+        self.reverse = False
+        if self.cursor is None:
+            queryset = queryset.order_by(f'-{field}', '-pk')
+        else:
+            position, pk, self.reverse = self.cursor
+            if self.reverse:
+                # Page précédente : on parcourt l'index dans l'autre sens
+                queryset = queryset.filter(
+                    Q(**{f'{field}__gt': position}) | Q(**{field: position, 'pk__gt': pk})
+                ).order_by(field, 'pk')
+            else:
+                queryset = queryset.filter(
+                    Q(**{f'{field}__lt': position}) | Q(**{field: position, 'pk__lt': pk})
+                ).order_by(f'-{field}', '-pk')
+        # Un élément de plus pour savoir s'il reste une page
+        return queryset[:self.page_size + 1]
+
+    def get_page(self, results):
+        """Calcule les liens de navigation et retourne les éléments de la page"""
+        field = self.ordering_field
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if self.reverse:
+            results.reverse()
+
+        self.next_link = None
+        self.previous_link = None
+        if results:
+            first, last = results[0], results[-1]
+            if has_more or self.reverse:
+                self.next_link = self.encode_cursor(getattr(last, field), last.pk, False)
+            if self.cursor is not None and (has_more or not self.reverse):
+                self.previous_link = self.encode_cursor(getattr(first, field), first.pk, True)
+        elif self.cursor is not None and not self.reverse:
+            self.previous_link = remove_query_param(self.base_url, self.cursor_query_param)
+
+        return results
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.get_page(list(self.get_page_queryset(queryset, request)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Variante asynchrone de ``paginate_queryset``, pour les vues ASGI"""
+        return self.get_page([item async for item in self.get_page_queryset(queryset, request)])
+
+    def get_paginated_data(self, data):
+        return OrderedDict([
+            ('next', self.next_link),
+            ('previous', self.previous_link),
+            ('results', data),
+        ])
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
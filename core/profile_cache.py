@@ -0,0 +1,25 @@
+"""Cache des Profiles d'émetteurs servis par ``/api/v3/issuers/{id}/``.
+
+Le document est stocké dans le cache Django sous une clé dérivée de l'ETag,
+lui-même calculé à partir de ``Issuer.updated_at`` et de l'empreinte des
+endorsements de l'émetteur, profil de leurs endorsers compris
+(``User.updated_at``) : toute modification de l'un ou de l'autre change
+la clé, sans invalidation explicite.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+def make_key(freshness):
+    etag = freshness.etag.strip('"')
+    return f'issuer-profile:{etag}'
+
+
+def get_profile(freshness):
+    """Retourne le Profile en cache pour cette fraîcheur, ou None"""
+    return cache.get(make_key(freshness))
+
+
+def store_profile(freshness, document):
+    cache.set(make_key(freshness), document, getattr(settings, 'API_PROFILE_CACHE_TIMEOUT', 3600))
@@ -0,0 +1,105 @@
+"""Renderers et flux de sérialisation pour l'API JSON-LD.
+
+Les fonctions ``iter_ndjson`` et ``iter_json_array`` produisent la
+réponse morceau par morceau à partir d'un itérable de documents, ce qui
+permet d'exporter toute la table sans jamais la matérialiser en mémoire.
+
+La sérialisation utilise ``orjson`` lorsqu'il est installé (dépendance
+optionnelle), et la bibliothèque standard sinon. Dans les deux cas les
+dates, UUID et décimaux sont encodés comme le fait ``DjangoJSONEncoder``
+pour les ``JSONTextField``.
+"""
+
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dépend de l'environnement
+    orjson = None
+
+django_encoder = DjangoJSONEncoder()
+rest_encoder = encoders.JSONEncoder()
+
+
+def encode_default(obj):
+    """Encode les types non natifs comme DjangoJSONEncoder, puis comme DRF"""
+    try:
+        return django_encoder.default(obj)
+    except TypeError:
+        return rest_encoder.default(obj)
+
+
+def dumps_stdlib(data):
+    """Sérialise un document en JSON compact (octets UTF-8) avec la bibliothèque standard"""
+    return json.dumps(data, default=encode_default, ensure_ascii=False, separators=(',', ':')).encode()
+
+
+if orjson is not None:
+    # Les dates passent par encode_default pour garder le format de DjangoJSONEncoder
+    # (millisecondes, suffixe Z) plutôt que le format RFC 3339 natif d'orjson
+    ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+    def dumps_bytes(data):
+        """Sérialise un document en JSON compact (octets UTF-8)"""
+        try:
+            return orjson.dumps(data, default=encode_default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            # Entiers de plus de 64 bits (valides en JSON, refusés par orjson) : rendu standard
+            return dumps_stdlib(data)
+else:
+    dumps_bytes = dumps_stdlib
+
+
+def dumps(data):
+    """Sérialise un document JSON-LD de manière compacte"""
+    return dumps_bytes(data).decode()
+
+
+def iter_ndjson(documents):
+    """Produit un document JSON par ligne (NDJSON)"""
+    for document in documents:
+        yield dumps(document) + '\n'
+
+
+def iter_json_array(documents):
+    """Produit un tableau JSON élément par élément"""
+    separator = '['
+    for document in documents:
+        yield separator + dumps(document)
+        separator = ','
+    yield '[]' if separator == '[' else ']'
+
+
+class NDJSONRenderer(BaseRenderer):
+    """Renderer NDJSON (un document JSON par ligne)"""
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        documents = data if isinstance(data, list) else [data]
+        return ''.join(iter_ndjson(documents)).encode(self.charset)
+
+
+class OpenBadgeJSONRenderer(JSONRenderer):
+    """
+    Renderer JSON rapide pour l'API JSON-LD.
+
+    Produit la même sortie que ``JSONRenderer`` en mode compact, mais via
+    ``orjson`` lorsqu'il est disponible. Les demandes d'indentation
+    (``application/json; indent=4``, API navigable) reviennent au rendu DRF.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Comme DRF, on échappe U+2028 et U+2029 pour rester un sous-ensemble strict de JavaScript
+        return dumps_bytes(data).replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
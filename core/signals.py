@@ -0,0 +1,135 @@
+"""Signaux de l'application core.
+
+Invalident le cache matérialisé des credentials (``core.credential_cache``)
+dès qu'un objet intégré dans un document JSON-LD est modifié ou supprimé.
+Le cache des Profiles (``core.profile_cache``) suit de lui-même les
+émetteurs, leurs endorsements et leurs endorsers.
+Le registre des clés chargées (``core.utils.keys``) évince la clé d'un
+émetteur dont ``public_key`` ou ``key_type`` change. La liste de statut
+de l'émetteur (``core.status_list``) attribue un index aux nouvelles
+assertions et suit leur révocation. Les verdicts de vérification en cache
+(``core.verification_cache``) d'un émetteur sont invalidés dès que lui ou
+l'une de ses assertions change. Les images dérivées (``core.images``) d'un
+BadgeClass sont générées dès que son image change. Les signatures
+(``core.signing``) des assertions dont le document signé intègre un
+émetteur, un badge, un endorsement ou un endorser modifié sont effacées :
+elles sont à signer à nouveau.
+"""
+
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from . import credential_cache, images, signing, status_list, verification_cache
+from .models import User, Issuer, BadgeClass, Assertion, Endorsement
+from .utils.keys import registry as key_registry
+
+
+@receiver([post_save, post_delete], sender=Assertion)
+def invalidate_assertion_credential(sender, instance, **kwargs):
+    credential_cache.invalidate(pk=instance.pk)
+
+
+@receiver(post_save, sender=Assertion)
+def update_assertion_status(sender, instance, created, update_fields=None, **kwargs):
+    if instance.status_list_index is None:
+        if created:
+            status_list.allocate([instance])
+    elif update_fields is None or 'revoked' in update_fields:
+        status_list.set_status(instance)
+
+
+@receiver([post_save, post_delete], sender=Assertion)
+def invalidate_assertion_verdicts(sender, instance, **kwargs):
+    try:
+        verification_cache.invalidate(instance.badge_class.issuer_id)
+    except BadgeClass.DoesNotExist:
+        pass
+
+
+@receiver([post_save, post_delete], sender=BadgeClass)
+def invalidate_badge_class_credentials(sender, instance, **kwargs):
+    credential_cache.invalidate(badge_class=instance.pk)
+
+
+@receiver(post_save, sender=BadgeClass)
+def clear_badge_class_signatures(sender, instance, created, raw=False, **kwargs):
+    if not created and not raw:
+        signing.clear_signatures(badge_class=instance.pk)
+
+
+@receiver(post_save, sender=BadgeClass)
+def update_badge_class_images(sender, instance, raw=False, **kwargs):
+    # Les fixtures (raw) sont chargées telles quelles, sans générer de fichiers
+    if not raw:
+        images.update(instance)
+
+
+@receiver([post_save, post_delete], sender=Issuer)
+def invalidate_issuer_credentials(sender, instance, **kwargs):
+    credential_cache.invalidate(badge_class__issuer=instance.pk)
+
+
+@receiver([post_save, post_delete], sender=Issuer)
+def invalidate_issuer_verdicts(sender, instance, **kwargs):
+    verification_cache.invalidate(instance.pk)
+
+
+@receiver(post_save, sender=Issuer)
+def clear_issuer_signatures(sender, instance, created, raw=False, **kwargs):
+    if not created and not raw:
+        signing.clear_signatures(badge_class__issuer=instance.pk)
+
+
+@receiver(post_save, sender=Issuer)
+def forget_issuer_key(sender, instance, **kwargs):
+    key_registry.forget_issuer(instance)
+
+
+@receiver(post_delete, sender=Issuer)
+def forget_deleted_issuer_key(sender, instance, **kwargs):
+    key_registry.forget_issuer(instance, deleted=True)
+
+
+@receiver([post_save, post_delete], sender=Endorsement)
+def invalidate_endorsed_credentials(sender, instance, **kwargs):
+    if instance.assertion_id:
+        credential_cache.invalidate(pk=instance.assertion_id)
+    elif instance.badge_class_id:
+        credential_cache.invalidate(badge_class=instance.badge_class_id)
+    elif instance.issuer_id:
+        credential_cache.invalidate(badge_class__issuer=instance.issuer_id)
+
+
+@receiver([post_save, post_delete], sender=Endorsement)
+def clear_endorsed_signatures(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    if instance.assertion_id:
+        signing.clear_signatures(pk=instance.assertion_id)
+    elif instance.badge_class_id:
+        signing.clear_signatures(badge_class=instance.badge_class_id)
+    elif instance.issuer_id:
+        signing.clear_signatures(badge_class__issuer=instance.issuer_id)
+
+
+@receiver(post_save, sender=User)
+def invalidate_endorser_credentials(sender, instance, update_fields=None, **kwargs):
+    # Les connexions mettent à jour last_login : inutile d'invalider dans ce cas
+    if update_fields is not None and not credential_cache.USER_PROFILE_FIELDS & set(update_fields):
+        return
+    credential_cache.invalidate(
+        endorsements__endorser=instance.pk,
+        badge_class__endorsements__endorser=instance.pk,
+        badge_class__issuer__endorsements__endorser=instance.pk,
+    )
+
+
+@receiver(post_save, sender=User)
+def clear_endorser_signatures(sender, instance, created, update_fields=None, raw=False, **kwargs):
+    if created or raw or (update_fields is not None and not User.PROFILE_FIELDS & set(update_fields)):
+        return
+    signing.clear_signatures(
+        endorsements__endorser=instance.pk,
+        badge_class__endorsements__endorser=instance.pk,
+        badge_class__issuer__endorsements__endorser=instance.pk,
+    )
@@ -0,0 +1,220 @@
+"""Signature en masse des assertions d'un émetteur.
+
+Chaque assertion est sérialisée en OpenBadgeCredential (sans ``proof``),
+mise sous forme canonique puis signée avec la clé privée de l'émetteur ; la
+signature est enregistrée dans ``Assertion.signature`` et publiée dans la
+propriété ``proof`` des documents.
+
+Les assertions sont traitées par lots : pendant que le pool de processus
+signe un lot, le suivant est construit, et chaque lot est écrit en une
+requête (``bulk_update``) au lieu d'un ``save()`` par assertion.
+
+Pour une cohorte (``sign_cohort``), l'émetteur ne signe qu'une racine :
+celle de l'arbre de Merkle des credentials (``core.utils.merkle``). Chaque
+assertion conserve la signature de la racine et son chemin d'inclusion.
+
+La forme canonique est celle de JCS (RFC 8785). L'Achievement et le
+Profile de l'émetteur, communs à de nombreux credentials, ne sont
+canonicalisés qu'une fois par version du badge et de l'émetteur au cours
+d'une même signature en masse.
+
+Exemple d'utilisation:
+    count = sign_assertions(issuer, private_key)
+    count = sign_cohort(issuer, private_key, badge_class.v2_assertions.all())
+"""
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from . import credential_cache, status_list
+from .jsonld import OpenBadgeBuilder, plan_assertions
+from .models import Assertion
+from .utils import merkle
+from .utils.crypto import load_private_key, sign_message, verify_key_pair
+from .utils.jcs import Canonicalizer, canonicalize
+from .utils.signing import Signer, encode_signature
+
+# Valeur par défaut de API_BASE_URL (config/settings.py), propre au développement
+DEFAULT_BASE_URL = 'http://localhost:8000'
+
+
+def get_base_url(base_url=None):
+    """
+    URL de base des documents signés : ``base_url``, sinon ``API_BASE_URL``.
+
+    Raises:
+        ValueError: si ``API_BASE_URL`` a encore sa valeur par défaut : les
+            signatures ne correspondraient pas aux documents servis en production
+    """
+    if base_url:
+        return base_url
+    base_url = getattr(settings, 'API_BASE_URL', None)
+    if not base_url or base_url == DEFAULT_BASE_URL:
+        raise ValueError(
+            f"API_BASE_URL n'est pas configurée ({DEFAULT_BASE_URL}) : définissez la variable "
+            "d'environnement API_BASE_URL ou passez l'URL publique de l'API explicitement"
+        )
+    return base_url
+
+
+def signing_payload(document, canonicalizer=None, shared=None) -> bytes:
+    """Octets signés d'un credential : sa forme canonique, sans ``proof``"""
+    unsigned = {key: value for key, value in document.items() if key != 'proof'}
+    if canonicalizer is None:
+        return canonicalize(unsigned)
+    return canonicalizer.canonicalize(unsigned, shared)
+
+
+def shared_subtrees(document, assertion):
+    """Sous-arbres d'un credential communs aux autres credentials, avec leur clé de version"""
+    badge_class = assertion.badge_class
+    shared = {}
+    subject = document.get('credentialSubject')
+    for achievement in (document.get('achievement'), subject.get('achievement') if subject else None):
+        if achievement is not None:
+            shared[id(achievement)] = ('achievement', badge_class.pk, badge_class.updated_at)
+    issuer = document.get('issuer')
+    if isinstance(issuer, dict):
+        shared[id(issuer)] = ('issuer', badge_class.issuer_id, badge_class.issuer.updated_at)
+    return shared
+
+
+def check_key(issuer, private_key):
+    """
+    Vérifie que ``private_key`` est la clé privée de l'émetteur.
+
+    Raises:
+        ValueError: si l'émetteur n'a pas de clé publique, si la clé
+            privée ne lui correspond pas ou si ``API_BASE_URL`` n'est pas
+            configurée (``get_base_url``)
+    """
+    if not issuer.public_key or not issuer.key_type:
+        raise ValueError(f"L'émetteur {issuer.pk} n'a pas de clé publique")
+    if not verify_key_pair(private_key, issuer.public_key, issuer.key_type):
+        raise ValueError("La clé privée ne correspond pas à la clé publique de l'émetteur")
+
+
+def select_assertions(issuer, queryset, resign):
+    """Clés des assertions de ``issuer`` à signer, après attribution de leur index de statut"""
+    queryset = (queryset if queryset is not None else Assertion.objects.all()).filter(badge_class__issuer=issuer)
+    if not resign:
+        queryset = queryset.filter(signature='')
+    # L'index de statut fait partie du document signé : il est attribué avant
+    status_list.allocate(queryset.filter(status_list_index__isnull=True).select_related('badge_class'))
+    # Les clés sont lues d'abord : les lots écrits ne perturbent pas la lecture
+    return list(queryset.order_by('pk').values_list('pk', flat=True))
+
+
+def iter_payloads(pks, base_url, chunk_size):
+    """Produit chaque lot d'assertions avec la forme canonique de leurs credentials"""
+    builder = OpenBadgeBuilder(base_url=base_url)
+    canonicalizer = Canonicalizer()
+    for start in range(0, len(pks), chunk_size):
+        assertions = list(plan_assertions(Assertion.objects.filter(pk__in=pks[start:start + chunk_size]).order_by('pk')))
+        messages = []
+        for assertion in assertions:
+            document = builder.get_assertion_json_ld(assertion)
+            messages.append(signing_payload(document, canonicalizer, shared_subtrees(document, assertion)))
+        yield assertions, messages
+
+
+def sign_assertions(issuer, private_key, queryset=None, base_url=None, workers=None, chunk_size=None, resign=False):
+    """
+    Signe les assertions de ``issuer`` et retourne le nombre d'assertions signées.
+
+    Sans ``resign``, seules les assertions non encore signées sont traitées.
+    Les documents sont construits avec ``base_url`` (``API_BASE_URL`` par
+    défaut) : l'API doit être servie depuis cette URL pour que les
+    signatures restent vérifiables.
+
+    Raises:
+        ValueError: si l'émetteur n'a pas de clé publique, si la clé
+            privée ne lui correspond pas ou si ``API_BASE_URL`` n'est pas
+            configurée (``get_base_url``)
+    """
+    check_key(issuer, private_key)
+    base_url = get_base_url(base_url)
+    chunk_size = chunk_size or getattr(settings, 'API_EXPORT_CHUNK_SIZE', 500)
+    pks = select_assertions(issuer, queryset, resign)
+
+    count = 0
+    pending = None
+    with Signer(private_key, issuer.key_type, workers=workers) as signer:
+        for assertions, messages in iter_payloads(pks, base_url, chunk_size):
+            signatures = signer.submit(messages)
+            if pending is not None:
+                count += save_signatures(*pending)
+            pending = (assertions, signatures)
+        if pending is not None:
+            count += save_signatures(*pending)
+    return count
+
+
+def sign_cohort(issuer, private_key, queryset=None, base_url=None, chunk_size=None, resign=False):
+    """
+    Signe les assertions de ``issuer`` en une seule opération de clé privée
+    et retourne le nombre d'assertions signées.
+
+    Les credentials sont les feuilles d'un arbre de Merkle dont seule la
+    racine est signée ; chaque assertion reçoit la signature de la racine
+    et son chemin d'inclusion. Seules les empreintes des credentials sont
+    conservées en mémoire. Une cohorte d'une seule assertion est signée
+    directement. Mêmes paramètres et erreurs que ``sign_assertions``.
+    """
+    check_key(issuer, private_key)
+    base_url = get_base_url(base_url)
+    chunk_size = chunk_size or getattr(settings, 'API_EXPORT_CHUNK_SIZE', 500)
+    pks = select_assertions(issuer, queryset, resign)
+    if len(pks) < 2:
+        return sign_assertions(
+            issuer, private_key, Assertion.objects.filter(pk__in=pks),
+            base_url=base_url, workers=1, chunk_size=chunk_size, resign=resign
+        )
+
+    leaves = []
+    for _, messages in iter_payloads(pks, base_url, chunk_size):
+        leaves.extend(merkle.leaf_hash(message) for message in messages)
+    root, paths = merkle.build_tree(leaves)
+    signature = encode_signature(sign_message(load_private_key(private_key, issuer.key_type), merkle.root_message(root)))
+
+    count = 0
+    for start in range(0, len(pks), chunk_size):
+        assertions = [Assertion(pk=pk) for pk in pks[start:start + chunk_size]]
+        count += save_signatures(assertions, lambda: [signature] * len(assertions), paths[start:start + chunk_size])
+    return count
+
+
+def clear_signatures(**lookups):
+    """
+    Efface la signature des assertions correspondant aux filtres (combinés
+    en OU) et retourne leur nombre.
+
+    Le document signé intègre le Profile de l'émetteur, l'Achievement et
+    leurs endorsements : dès que l'un d'eux change, la signature ne
+    correspond plus au document servi. Les assertions concernées redeviennent
+    non signées et sont reprises par ``sign_assertions`` sans ``resign``.
+    """
+    query = Q()
+    for lookup, value in lookups.items():
+        query |= Q(**{lookup: value})
+    pks = list(Assertion.objects.filter(query).exclude(signature='').values_list('pk', flat=True).distinct())
+    if pks:
+        Assertion.objects.filter(pk__in=pks).update(signature='', merkle_proof=[], updated_at=timezone.now())
+        credential_cache.invalidate(pk__in=pks)
+    return len(pks)
+
+
+def save_signatures(assertions, signatures, paths=None):
+    """
+    Enregistre les signatures d'un lot (et leurs chemins Merkle) en une
+    requête et invalide leurs documents en cache.
+    """
+    now = timezone.now()
+    for index, (assertion, signature) in enumerate(zip(assertions, signatures())):
+        assertion.signature = signature
+        assertion.merkle_proof = paths[index] if paths is not None else []
+        assertion.updated_at = now
+    Assertion.objects.bulk_update(assertions, ['signature', 'merkle_proof', 'updated_at'])
+    credential_cache.invalidate(pk__in=[assertion.pk for assertion in assertions])
+    return len(assertions)
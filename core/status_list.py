@@ -0,0 +1,203 @@
+"""Listes de statut de révocation (W3C Bitstring Status List).
+
+Chaque émetteur publie une liste de bits compressée, un bit par assertion,
+servie par ``/api/v3/status-lists/{id}/`` sous la forme d'un
+``BitstringStatusListCredential``. Les credentials y renvoient par leur
+propriété ``credentialStatus`` (index de l'assertion dans la liste) : un
+vérificateur télécharge la liste une fois, puis contrôle localement la
+révocation de milliers de credentials, sans requête par credential.
+
+Les index sont attribués à la création des assertions ; une révocation ne
+modifie qu'un bit de la liste brute (``StatusList.bitstring``) puis
+recalcule sa forme encodée. Le document publié est compressé une fois par
+révision de la liste et par URL de base, et conservé dans le cache Django.
+
+La liste n'est pas signée : la clé privée des émetteurs n'est pas
+conservée par la plateforme.
+
+Exemple d'utilisation:
+    allocate(Assertion.objects.filter(status_list_index__isnull=True))
+    set_status(assertion)
+"""
+
+import base64
+import gzip
+from urllib.parse import urlparse
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.urls import Resolver404, resolve
+from django.utils import timezone
+
+from . import credential_cache
+from .models import Assertion, StatusList
+from .renderers import dumps_bytes
+from .utils.ids import parse_pk
+
+STATUS_PURPOSE = 'revocation'
+
+# Taille minimale recommandée par la spécification (16 Kio) : les index
+# d'une liste peu remplie restent noyés dans la masse
+MIN_SIZE = 131072
+
+
+def get_size():
+    return max(getattr(settings, 'STATUS_LIST_SIZE', MIN_SIZE), MIN_SIZE)
+
+
+def encode_list(bitstring) -> str:
+    """Liste de bits compressée (GZIP) puis encodée en base64url multibase (préfixe ``u``)"""
+    compressed = gzip.compress(bytes(bitstring), mtime=0)
+    return 'u' + base64.urlsafe_b64encode(compressed).decode().rstrip('=')
+
+
+def decode_list(encoded) -> bytes:
+    """Inverse de ``encode_list``"""
+    if not encoded.startswith('u'):
+        raise ValueError("Liste encodée sans préfixe multibase base64url")
+    data = encoded[1:]
+    return gzip.decompress(base64.urlsafe_b64decode(data + '=' * (-len(data) % 4)))
+
+
+def get_bit(bitstring, index) -> bool:
+    """Valeur du bit ``index`` ; le bit 0 est le bit de poids fort du premier octet"""
+    byte = index >> 3
+    if byte >= len(bitstring):
+        return False
+    return bool(bitstring[byte] & (0x80 >> (index & 7)))
+
+
+def set_bit(bitstring, index, value):
+    if value:
+        bitstring[index >> 3] |= 0x80 >> (index & 7)
+    else:
+        bitstring[index >> 3] &= ~(0x80 >> (index & 7)) & 0xFF
+
+
+def get_locked_list(issuer_id):
+    """Liste de statut d'un émetteur, verrouillée jusqu'à la fin de la transaction (créée si besoin)"""
+    status_list = StatusList.objects.select_for_update().filter(issuer_id=issuer_id).first()
+    if status_list is None:
+        size = get_size()
+        status_list = StatusList(issuer_id=issuer_id, size=size, bitstring=bytes(size // 8))
+    status_list.bitstring = bytearray(status_list.bitstring)
+    return status_list
+
+
+def save_list(status_list):
+    status_list.encoded_list = encode_list(status_list.bitstring)
+    status_list.revision += 1
+    status_list.bitstring = bytes(status_list.bitstring)
+    status_list.save()
+
+
+def allocate(assertions):
+    """
+    Attribue un index de statut aux assertions qui n'en ont pas encore.
+
+    Les bits des assertions déjà révoquées sont positionnés. La liste de
+    chaque émetteur est écrite une fois ; les assertions sont mises à jour
+    en une requête et leurs documents en cache invalidés (ils gagnent une
+    propriété ``credentialStatus``). Retourne le nombre d'index attribués.
+    """
+    by_issuer = {}
+    for assertion in assertions:
+        if assertion.status_list_index is None:
+            by_issuer.setdefault(assertion.badge_class.issuer_id, []).append(assertion)
+
+    count = 0
+    now = timezone.now()
+    for issuer_id, pending in by_issuer.items():
+        with transaction.atomic():
+            status_list = get_locked_list(issuer_id)
+            for assertion in pending:
+                if status_list.next_index >= status_list.size:
+                    # Liste pleine : sa taille double, les index existants sont conservés
+                    status_list.bitstring.extend(bytes(status_list.size // 8))
+                    status_list.size *= 2
+                assertion.status_list_index = status_list.next_index
+                assertion.updated_at = now
+                status_list.next_index += 1
+                if assertion.revoked:
+                    set_bit(status_list.bitstring, assertion.status_list_index, True)
+            save_list(status_list)
+            Assertion.objects.bulk_update(pending, ['status_list_index', 'updated_at'])
+        credential_cache.invalidate(pk__in=[assertion.pk for assertion in pending])
+        count += len(pending)
+    return count
+
+
+def set_status(assertion):
+    """Reporte dans la liste de son émetteur l'état de révocation d'une assertion ; retourne True si un bit a changé"""
+    with transaction.atomic():
+        status_list = get_locked_list(assertion.badge_class.issuer_id)
+        index = assertion.status_list_index
+        if index >= status_list.size or get_bit(status_list.bitstring, index) == assertion.revoked:
+            return False
+        set_bit(status_list.bitstring, index, assertion.revoked)
+        save_list(status_list)
+    return True
+
+
+def get_entry(credential):
+    """
+    Retourne ``(émetteur, index)`` de l'entrée ``credentialStatus`` d'un
+    credential si elle désigne une liste de cette plateforme, sinon None.
+    """
+    entry = credential.get('credentialStatus') if isinstance(credential, dict) else None
+    if not isinstance(entry, dict) or entry.get('statusPurpose') != STATUS_PURPOSE:
+        return None
+    url = entry.get('statusListCredential')
+    try:
+        match = resolve(urlparse(url).path) if isinstance(url, str) else None
+        # int(1e400) lève OverflowError
+        index = int(entry.get('statusListIndex'))
+    except (Resolver404, TypeError, ValueError, OverflowError):
+        return None
+    if match is None or match.view_name != 'core:status-lists-detail' or index < 0:
+        return None
+    issuer_pk = parse_pk(match.kwargs['pk'])
+    if issuer_pk is None:
+        return None
+    return issuer_pk, index
+
+
+def build_credential(status_list, builder):
+    """BitstringStatusListCredential publié pour une liste de statut"""
+    url = builder.get_status_list_url(status_list.issuer_id)
+    return {
+        "@context": ["https://www.w3.org/ns/credentials/v2"],
+        "id": url,
+        "type": ["VerifiableCredential", "BitstringStatusListCredential"],
+        "issuer": builder.get_issuer_url(status_list.issuer_id),
+        "validFrom": status_list.updated_at.isoformat(),
+        "credentialSubject": {
+            "id": f"{url}#list",
+            "type": "BitstringStatusList",
+            "statusPurpose": STATUS_PURPOSE,
+            "encodedList": status_list.encoded_list,
+        },
+    }
+
+
+def make_key(freshness):
+    etag = freshness.etag.strip('"')
+    return f'status-list:{etag}'
+
+
+def get_blob(freshness, load, builder):
+    """
+    Document publié d'une liste de statut, sérialisé et compressé (GZIP).
+
+    ``load`` retourne la ``StatusList`` ; il n'est appelé que si le document
+    n'est pas en cache. Le résultat est mis en cache sous une clé dérivée de
+    l'ETag, qui change avec la révision de la liste : aucune invalidation
+    explicite n'est nécessaire.
+    """
+    key = make_key(freshness)
+    blob = cache.get(key)
+    if blob is None:
+        blob = gzip.compress(dumps_bytes(build_credential(load(), builder)), mtime=0)
+        cache.set(key, blob, getattr(settings, 'STATUS_LIST_CACHE_TIMEOUT', 3600))
+    return blob
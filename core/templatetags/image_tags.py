@@ -0,0 +1,37 @@
+from django import template
+
+from core.images import get_srcset, get_variants
+
+register = template.Library()
+
+@register.filter
+def srcset(image, extension='png'):
+    """
+    Attribut srcset des images dérivées d'une image de badge, dans un format.
+    Exemple d'utilisation: <img srcset="{{ badge.image|srcset:'webp' }}">
+    """
+    return get_srcset(image, extension)
+
+@register.inclusion_tag('core/badge/partials/badge_image.html')
+def badge_image(image, alt='', sizes='100px', css_class='img-fluid', style=''):
+    """
+    Image de badge servie en WebP (PNG en repli) à la taille affichée, via srcset.
+    Sans images dérivées (SVG, URL externe), affiche l'original.
+    Exemple d'utilisation: {% badge_image badge.image alt=badge.name sizes="150px" %}
+    """
+    variants = get_variants(image)
+    if variants:
+        src = image.storage.url(variants[0]['png'])
+    elif getattr(image, 'name', None):
+        src = image.url
+    else:
+        src = image if isinstance(image, str) else ''
+    return {
+        'src': src,
+        'webp_srcset': get_srcset(image, 'webp') if variants else '',
+        'png_srcset': get_srcset(image, 'png') if variants else '',
+        'sizes': sizes,
+        'alt': alt,
+        'css_class': css_class,
+        'style': style,
+    }
@@ -1,4 +1,7 @@
-from django.test import TestCase
+import shutil
+import tempfile
+
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from rest_framework.test import APITestCase
 from rest_framework import status
@@ -8,8 +11,22 @@ from core.models.badge import Issuer, BadgeClass, Assertion, BadgeVersion
 
 User = get_user_model()
 
-class OpenBadgeAPITests(APITestCase):
+
+class TemporaryMediaMixin:
+    """Fichiers téléversés (et images dérivées) écrits dans un MEDIA_ROOT temporaire"""
+
     def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings = override_settings(MEDIA_ROOT=media_root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        super().setUp()
+
+
+class OpenBadgeAPITests(TemporaryMediaMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
         # Créer un utilisateur
         self.user = User.objects.create_user(
             email='test@example.com',
@@ -66,12 +83,12 @@ class OpenBadgeAPITests(APITestCase):
         url = reverse('core:badges-list')
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data['results']), 1)
         
         # Vérifier le format JSON-LD
-        self.assertEqual(response.data[0]['@context'],
+        self.assertEqual(response.data['results'][0]['@context'],
                         'https://purl.imsglobal.org/spec/ob/v3p0/context-3.0.3.json')
-        self.assertIn('OpenBadgeCredential', response.data[0]['type'])
+        self.assertIn('OpenBadgeCredential', response.data['results'][0]['type'])
 
     def test_retrieve_badge(self):
         """Test de la récupération d'un badge spécifique"""
@@ -182,3 +199,477 @@ class OpenBadgeAPITests(APITestCase):
         self.assertEqual(response.data['type'], ['VerifiableCredential', 'EndorsementCredential'])
         self.assertEqual(response.data['achievement']['name'], 'Endorsement Badge')
         self.assertEqual(response.data['achievement']['version'], BadgeVersion.V3.value)
+
+
+class CredentialFixtureMixin:
+    """Jeu de données commun : un émetteur, des badges endorsés et leurs assertions"""
+
+    def setUp(self):
+        self.owner = User.objects.create_user(
+            email='owner@example.com',
+            password='testpass123'
+        )
+        self.endorser = User.objects.create_user(
+            email='endorser@example.com',
+            password='testpass123',
+            display_name='Endorser'
+        )
+        self.issuer = Issuer.objects.create(
+            name='Test Issuer',
+            url='https://example.com',
+            email='issuer@example.com',
+            image='https://example.com/logo.png',
+            version=BadgeVersion.V3.value,
+            owner=self.owner
+        )
+
+    def create_assertions(self, count):
+        """Crée des assertions avec des endorsements sur l'assertion et sur le badge"""
+        from core.models.endorsement import Endorsement, EndorsementType
+
+        start = Assertion.objects.count()
+        for index in range(start, start + count):
+            badge_class = BadgeClass.objects.create(
+                name=f'Badge {index}',
+                description='Description',
+                criteria_url='https://example.com/criteria',
+                issuer=self.issuer,
+                version=BadgeVersion.V3.value
+            )
+            recipient = User.objects.create_user(
+                email=f'recipient{index}@example.com',
+                password='testpass123'
+            )
+            assertion = Assertion.objects.create(
+                recipient=recipient,
+                badge_class=badge_class,
+                achievement=badge_class,
+                version=BadgeVersion.V3.value
+            )
+            Endorsement.objects.create(
+                type=EndorsementType.BADGE_CLASS,
+                badge_class=badge_class,
+                endorser=self.endorser,
+                claim={'text': 'Badge pertinent'}
+            )
+            Endorsement.objects.create(
+                type=EndorsementType.ASSERTION,
+                assertion=assertion,
+                endorser=self.endorser,
+                claim={'text': 'Assertion vérifiée'}
+            )
+
+
+class OpenBadgeAPIQueryCountTests(CredentialFixtureMixin, APITestCase):
+    """Tests du nombre de requêtes émises par l'API JSON-LD"""
+
+    def count_list_queries(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        url = reverse('core:badges-list')
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(context.captured_queries), response
+
+    def test_list_query_count_independent_of_rows(self):
+        """Le nombre de requêtes de la liste ne dépend pas du nombre d'assertions"""
+        self.create_assertions(1)
+        small_count, _ = self.count_list_queries()
+
+        self.create_assertions(5)
+        large_count, response = self.count_list_queries()
+
+        self.assertEqual(small_count, large_count)
+        self.assertEqual(len(response.data['results']), 6)
+
+    def test_list_uses_prefetched_endorsements(self):
+        """Les endorsements du badge et de l'assertion sont sérialisés depuis le prefetch"""
+        self.create_assertions(2)
+        _, response = self.count_list_queries()
+
+        credential = response.data['results'][0]
+        self.assertEqual(credential['endorsement'][0]['credentialSubject']['endorsementComment'], 'Assertion vérifiée')
+        self.assertEqual(credential['achievement']['endorsement'][0]['issuer']['name'], 'Endorser')
+        self.assertEqual(credential['credentialSubject']['achievement'], credential['achievement'])
+
+
+class OpenBadgeAPIPaginationTests(APITestCase):
+    """Tests de la pagination par curseur de la liste des badges"""
+
+    def setUp(self):
+        self.owner = User.objects.create_user(
+            email='owner@example.com',
+            password='testpass123'
+        )
+        self.issuer = Issuer.objects.create(
+            name='Test Issuer',
+            url='https://example.com',
+            email='issuer@example.com',
+            image='https://example.com/logo.png',
+            version=BadgeVersion.V3.value,
+            owner=self.owner
+        )
+        self.badge_class = BadgeClass.objects.create(
+            name='Test Badge',
+            description='Description',
+            criteria_url='https://example.com/criteria',
+            issuer=self.issuer,
+            version=BadgeVersion.V3.value
+        )
+        self.assertions = [self.create_assertion(index) for index in range(5)]
+        self.url = reverse('core:badges-list')
+
+    def create_assertion(self, index):
+        recipient = User.objects.create_user(
+            email=f'recipient{index}@example.com',
+            password='testpass123'
+        )
+        return Assertion.objects.create(
+            recipient=recipient,
+            badge_class=self.badge_class,
+            version=BadgeVersion.V3.value,
+            credential_id=f'https://example.com/credentials/{index}'
+        )
+
+    def collect_ids(self, url):
+        """Parcourt toutes les pages et retourne les identifiants dans l'ordre"""
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids.extend(credential['id'] for credential in response.data['results'])
+            url = response.data['next']
+        return ids
+
+    def test_pages_follow_issuance_order(self):
+        """Les pages successives couvrent toutes les assertions sans doublon"""
+        ids = self.collect_ids(self.url + '?page_size=2')
+        expected = list(
+            Assertion.objects.order_by('-issuance_date', '-id').values_list('credential_id', flat=True)
+        )
+        self.assertEqual(ids, expected)
+
+    def test_ties_on_issuance_date(self):
+        """Les assertions de même date sont départagées par leur identifiant"""
+        Assertion.objects.update(issuance_date=self.assertions[0].issuance_date)
+        ids = self.collect_ids(self.url + '?page_size=2')
+        self.assertEqual(ids, [f'https://example.com/credentials/{index}' for index in range(4, -1, -1)])
+
+    def test_previous_page(self):
+        """Le curseur précédent ramène à la page d'avant"""
+        first = self.client.get(self.url, {'page_size': 2})
+        self.assertIsNone(first.data['previous'])
+        second = self.client.get(first.data['next'])
+        back = self.client.get(second.data['previous'])
+        self.assertEqual(
+            [credential['id'] for credential in back.data['results']],
+            [credential['id'] for credential in first.data['results']]
+        )
+        self.assertIsNone(back.data['previous'])
+
+    def test_stable_under_concurrent_issuance(self):
+        """Une nouvelle émission ne décale pas les pages suivantes"""
+        first = self.client.get(self.url, {'page_size': 2})
+        self.create_assertion(99)
+        second = self.client.get(first.data['next'])
+        first_ids = [credential['id'] for credential in first.data['results']]
+        second_ids = [credential['id'] for credential in second.data['results']]
+        self.assertEqual(len(second_ids), 2)
+        self.assertFalse(set(first_ids) & set(second_ids))
+
+    def test_page_size_is_capped(self):
+        """La taille de page demandée est bornée par API_MAX_PAGE_SIZE"""
+        with self.settings(API_MAX_PAGE_SIZE=3):
+            response = self.client.get(self.url, {'page_size': 1000})
+        self.assertEqual(len(response.data['results']), 3)
+
+    def test_invalid_cursor(self):
+        """Un curseur illisible retourne une 404"""
+        response = self.client.get(self.url, {'cursor': 'invalide'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class OpenBadgeAPIExportTests(CredentialFixtureMixin, APITestCase):
+    """Tests de l'export en flux des credentials"""
+
+    def read_stream(self, response):
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return b''.join(response.streaming_content).decode()
+
+    def test_export_json_array(self):
+        """L'export par défaut est un tableau JSON complet"""
+        import json
+
+        self.create_assertions(3)
+        response = self.client.get(reverse('core:badges-export'))
+        documents = json.loads(self.read_stream(response))
+        self.assertEqual(len(documents), 3)
+        self.assertIn('OpenBadgeCredential', documents[0]['type'])
+
+    def test_export_empty_json_array(self):
+        """L'export d'une table vide est un tableau vide valide"""
+        response = self.client.get(reverse('core:badges-export'))
+        self.assertEqual(self.read_stream(response), '[]')
+
+    def test_export_ndjson(self):
+        """L'export NDJSON contient un credential par ligne"""
+        import json
+
+        self.create_assertions(3)
+        response = self.client.get(reverse('core:badges-export'), {'format': 'ndjson'})
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = self.read_stream(response).splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(json.loads(lines[0])['achievement']['endorsement'][0]['issuer']['name'], 'Endorser')
+
+    def test_export_query_count_per_chunk(self):
+        """L'export émet un nombre constant de requêtes par lot"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        self.create_assertions(5)
+        with self.settings(API_EXPORT_CHUNK_SIZE=100):
+            with CaptureQueriesContext(connection) as context:
+                self.read_stream(self.client.get(reverse('core:badges-export'), {'format': 'ndjson'}))
+        # Émetteur référencé par défaut : ni sa ligne ni ses endorsements ne sont lus
+        self.assertEqual(len(context.captured_queries), 3)
+
+
+class OpenBadgeAPISparseFieldsTests(CredentialFixtureMixin, APITestCase):
+    """Tests des sélections de propriétés (paramètre fields)"""
+
+    def get_with_queries(self, url, params):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response, [query['sql'] for query in context.captured_queries]
+
+    def test_list_prunes_output(self):
+        """Seules les propriétés demandées sont renvoyées"""
+        self.create_assertions(2)
+        response, _ = self.get_with_queries(
+            reverse('core:badges-list'),
+            {'fields': 'id,name,awardedDate,achievement.name'}
+        )
+        credential = response.data['results'][0]
+        self.assertEqual(set(credential), {'@context', 'id', 'name', 'awardedDate', 'achievement'})
+        self.assertEqual(set(credential['achievement']), {'name'})
+
+    def test_list_projects_columns(self):
+        """Les colonnes texte et les endorsements non demandés ne sont pas chargés"""
+        self.create_assertions(2)
+        _, queries = self.get_with_queries(
+            reverse('core:badges-list'),
+            {'fields': 'id,name,awardedDate,achievement.name'}
+        )
+        self.assertEqual(len(queries), 1)
+        for column in ('"description"', '"narrative"', '"evidence"', '"signature"'):
+            self.assertNotIn(column, queries[0])
+
+    def test_nested_endorsement_fields(self):
+        """Les sous-propriétés des endorsements peuvent être sélectionnées"""
+        self.create_assertions(1)
+        response, queries = self.get_with_queries(
+            reverse('core:badges-list'),
+            {'fields': 'achievement.endorsement.issuer.name'}
+        )
+        achievement = response.data['results'][0]['achievement']
+        self.assertEqual(achievement, {'endorsement': [{'issuer': {'name': 'Endorser'}}]})
+        self.assertEqual(len(queries), 2)
+
+    def test_retrieve_with_fields(self):
+        """Le détail accepte une sélection et ne la met pas en cache"""
+        from core.models import CredentialCache
+
+        self.create_assertions(1)
+        assertion = Assertion.objects.get()
+        url = reverse('core:badges-detail', args=[assertion.id])
+        response, _ = self.get_with_queries(url, {'fields': 'credentialSubject.identifier'})
+        self.assertEqual(response.data['credentialSubject'], {'identifier': assertion.recipient_identifier})
+        self.assertFalse(CredentialCache.objects.exists())
+
+    def test_badge_with_endorsements_fields(self):
+        """Le paramètre fields s'applique aussi aux Achievements"""
+        self.create_assertions(1)
+        badge_class = BadgeClass.objects.get()
+        response, queries = self.get_with_queries(
+            reverse('core:badge-with-endorsements'),
+            {'badge_id': badge_class.id, 'fields': 'name'}
+        )
+        self.assertEqual(response.data, {'name': badge_class.name})
+        self.assertNotIn('"description"', queries[-1])
+
+
+class FieldSetTests(TestCase):
+    """Tests de l'analyse du paramètre fields"""
+
+    def test_parse(self):
+        from core.jsonld import FieldSet
+
+        fields = FieldSet.parse('id, achievement.name,achievement.image')
+        self.assertIn('id', fields)
+        self.assertNotIn('name', fields)
+        self.assertIn('name', fields['achievement'])
+        self.assertNotIn('description', fields['achievement'])
+        self.assertEqual(str(fields), 'achievement.image,achievement.name,id')
+
+    def test_whole_property_wins(self):
+        from core.jsonld import FieldSet
+
+        fields = FieldSet.parse('achievement.name,achievement')
+        self.assertTrue(fields['achievement'].is_all)
+        self.assertEqual(FieldSet.parse('achievement,achievement.name'), fields)
+
+    def test_empty_selects_everything(self):
+        from core.jsonld import FieldSet
+
+        self.assertTrue(FieldSet.parse('').is_all)
+        self.assertTrue(FieldSet.parse(' , ').is_all)
+
+
+class OpenBadgeAPIBatchTests(CredentialFixtureMixin, APITestCase):
+    """Tests de la lecture groupée de credentials"""
+
+    def setUp(self):
+        super().setUp()
+        self.create_assertions(4)
+        self.assertions = list(Assertion.objects.order_by('pk'))
+        self.url = reverse('core:badges-batch')
+
+    def test_batch_get_by_pk_and_url(self):
+        """Les identifiants peuvent être des clés primaires ou des URLs"""
+        first, second = self.assertions[:2]
+        response = self.client.get(self.url, {'id': [second.identifier, str(first.pk), 'https://unknown.example/1']})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([credential['id'] for credential in response.data['results']], [second.identifier, first.identifier])
+        self.assertEqual(response.data['missing'], ['https://unknown.example/1'])
+
+    def test_batch_post(self):
+        """La lecture groupée accepte un corps JSON"""
+        ids = [assertion.pk for assertion in self.assertions]
+        response = self.client.post(self.url, {'ids': ids}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 4)
+        self.assertEqual(response.data['missing'], [])
+
+    def test_batch_query_count(self):
+        """Une requête par table liée, quel que soit le nombre d'identifiants"""
+        ids = [assertion.pk for assertion in self.assertions]
+        with self.assertNumQueries(4):
+            self.client.post(self.url, {'ids': ids}, format='json')
+
+    def test_batch_invalid_pks(self):
+        """Des chiffres non ASCII ou une clé hors bornes sont des identifiants inconnus"""
+        first = self.assertions[0]
+        invalid = ['²', '99999999999999999999999', '9' * 5000]
+        response = self.client.get(self.url, {'id': [str(first.pk), *invalid]})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['missing'], invalid)
+
+    def test_batch_limits(self):
+        """Une demande vide ou trop grande est refusée"""
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_400_BAD_REQUEST)
+        with self.settings(API_BATCH_MAX_SIZE=2):
+            response = self.client.post(self.url, {'ids': [1, 2, 3]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class IssuerProfileAPITests(CredentialFixtureMixin, APITestCase):
+    """Tests du Profile des émetteurs et des credentials qui le référencent"""
+
+    def setUp(self):
+        from django.core.cache import cache
+        from core.models.endorsement import Endorsement, EndorsementType
+
+        super().setUp()
+        cache.clear()
+        self.issuer.description = 'Organisme de formation'
+        self.issuer.save()
+        Endorsement.objects.create(
+            type=EndorsementType.ISSUER,
+            issuer=self.issuer,
+            endorser=self.endorser,
+            claim={'text': 'Émetteur reconnu'}
+        )
+        self.create_assertions(3)
+        self.url = reverse('core:issuers-detail', args=[self.issuer.pk])
+
+    def test_profile(self):
+        """Le Profile contient son identifiant, sa description et ses endorsements"""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['id'], f'http://testserver{self.url}')
+        self.assertEqual(response.data['type'], ['Profile'])
+        self.assertEqual(response.data['description'], 'Organisme de formation')
+        self.assertEqual(response.data['endorsement'][0]['credentialSubject']['endorsementComment'], 'Émetteur reconnu')
+        self.assertEqual(self.client.get(reverse('core:issuers-detail', args=[0])).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_invalid_pk(self):
+        """Une clé non numérique ou hors bornes donne une 404, pas une erreur serveur"""
+        for pk in ('abc', '²', '99999999999999999999999'):
+            with self.subTest(pk=pk):
+                response = self.client.get(f'/api/v3/issuers/{pk}/')
+                self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_credentials_embed_profile(self):
+        """Le détail d'un credential intègre le Profile de son émetteur, la liste avec issuer=embed"""
+        profile = {key: value for key, value in self.client.get(self.url).data.items() if key != '@context'}
+        detail = reverse('core:badges-detail', args=[Assertion.objects.first().pk])
+        self.assertEqual(self.client.get(detail).data['issuer'], profile)
+        credential = self.client.get(reverse('core:badges-list'), {'issuer': 'embed'}).data['results'][0]
+        self.assertEqual(credential['issuer'], profile)
+
+    def test_list_references_profile_by_default(self):
+        """La liste et l'export ne répètent pas le Profile de l'émetteur dans chaque credential"""
+        import json
+
+        reference = {'id': f'http://testserver{self.url}', 'type': ['Profile']}
+        referenced = self.client.get(reverse('core:badges-list'))
+        self.assertEqual(referenced.data['results'][0]['issuer'], reference)
+        embedded = self.client.get(reverse('core:badges-list'), {'issuer': 'embed'})
+        self.assertLess(len(referenced.content), len(embedded.content))
+
+        response = self.client.get(reverse('core:badges-export'), {'format': 'ndjson'})
+        lines = b''.join(response.streaming_content).splitlines()
+        self.assertEqual([json.loads(line)['issuer'] for line in lines], [reference] * 3)
+
+    def test_credentials_reference_profile(self):
+        """Avec issuer=ref, seul l'identifiant du Profile est émis et l'émetteur n'est pas lu"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse('core:badges-list'), {'issuer': 'ref'})
+        credential = response.data['results'][0]
+        self.assertEqual(credential['issuer'], {'id': f'http://testserver{self.url}', 'type': ['Profile']})
+        self.assertEqual(len(context.captured_queries), 3)
+        self.assertTrue(all('"core_issuer"' not in query['sql'] for query in context.captured_queries))
+
+        detail = reverse('core:badges-detail', args=[Assertion.objects.first().pk])
+        embedded = self.client.get(detail)
+        referenced = self.client.get(detail, {'issuer': 'ref'})
+        self.assertNotEqual(embedded['ETag'], referenced['ETag'])
+        self.assertEqual(referenced.data['issuer']['id'], f'http://testserver{self.url}')
+
+    def test_profile_cached_until_issuer_changes(self):
+        """Le Profile est servi depuis le cache jusqu'à la modification de l'émetteur ou d'un endorser"""
+        first = self.client.get(self.url)
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(self.url).data, first.data)
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.issuer.name = 'Nouveau nom'
+        self.issuer.save()
+        self.assertEqual(self.client.get(self.url).data['name'], 'Nouveau nom')
+
+        self.endorser.display_name = 'Nouvel endorser'
+        self.endorser.save()
+        self.assertEqual(self.client.get(self.url).data['endorsement'][0]['issuer']['name'], 'Nouvel endorser')
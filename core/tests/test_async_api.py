@@ -0,0 +1,84 @@
+import json
+
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from core.models.badge import Assertion
+from .test_api import CredentialFixtureMixin
+
+
+class AsyncOpenBadgeAPITests(CredentialFixtureMixin, APITestCase):
+    """Les vues asynchrones servent les mêmes documents que l'API synchrone"""
+
+    def setUp(self):
+        super().setUp()
+        self.create_assertions(3)
+        self.assertion = Assertion.objects.order_by('pk').first()
+
+    async def assertSameAsSync(self, sync_url, async_url, **params):
+        expected = await self.async_client.get(sync_url, params, headers={'Accept': 'application/json'})
+        response = await self.async_client.get(async_url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        # Les liens de pagination ne diffèrent que par le chemin
+        content = response.content.decode().replace(async_url, sync_url)
+        self.assertEqual(json.loads(content), json.loads(expected.content))
+        return expected, response
+
+    async def test_list(self):
+        await self.assertSameAsSync(reverse('core:badges-list'), reverse('core:async-badges-list'), page_size=2)
+
+    async def test_list_cursor(self):
+        first = await self.async_client.get(reverse('core:async-badges-list'), {'page_size': 2})
+        next_url = json.loads(first.content)['next']
+        response = await self.async_client.get(next_url.replace('http://testserver', ''))
+        data = json.loads(response.content)
+        self.assertEqual(len(data['results']), 1)
+        self.assertIsNone(data['next'])
+
+    async def test_retrieve(self):
+        expected, response = await self.assertSameAsSync(
+            reverse('core:badges-detail', args=[self.assertion.pk]),
+            reverse('core:async-badges-detail', args=[self.assertion.pk])
+        )
+        self.assertEqual(response['ETag'], expected['ETag'])
+
+        response = await self.async_client.get(
+            reverse('core:async-badges-detail', args=[self.assertion.pk]),
+            headers={'If-None-Match': response['ETag']}
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    async def test_retrieve_with_fields(self):
+        await self.assertSameAsSync(
+            reverse('core:badges-detail', args=[self.assertion.pk]),
+            reverse('core:async-badges-detail', args=[self.assertion.pk]),
+            fields='id,achievement.name'
+        )
+
+    async def test_achievement(self):
+        await self.assertSameAsSync(
+            reverse('core:badges-achievement', args=[self.assertion.pk]),
+            reverse('core:async-badges-achievement', args=[self.assertion.pk])
+        )
+
+    async def test_badge_with_endorsements(self):
+        await self.assertSameAsSync(
+            reverse('core:badge-with-endorsements'),
+            reverse('core:async-badge-with-endorsements'),
+            badge_id=self.assertion.badge_class_id
+        )
+        response = await self.async_client.get(reverse('core:async-badge-with-endorsements'))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    async def test_errors(self):
+        response = await self.async_client.get(reverse('core:async-badges-detail', args=[999999]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertIn('detail', json.loads(response.content))
+
+        response = await self.async_client.get(reverse('core:async-badges-list'), {'cursor': 'invalide'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        response = await self.async_client.post(reverse('core:async-badges-list'))
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
@@ -0,0 +1,291 @@
+import io
+import json
+import zipfile
+from datetime import datetime
+from unittest import mock
+from xml.etree import ElementTree
+
+from PIL import Image
+from PIL.PngImagePlugin import PngInfo
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from core import baking
+from core.signing import sign_assertions
+from core.utils import crypto
+from core.models import Assertion, BadgeClass
+
+from .test_api import CredentialFixtureMixin, TemporaryMediaMixin
+
+User = get_user_model()
+
+SVG = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<svg xmlns="http://www.w3.org/2000/svg" data-title="a > b" width="10" height="10">'
+    '<rect width="10" height="10"/></svg>'
+)
+
+
+def make_png(text=None, image_format='PNG'):
+    image = Image.new('RGB', (4, 4), 'red')
+    output = io.BytesIO()
+    if text is not None:
+        info = PngInfo()
+        info.add_itxt('openbadges', text)
+        image.save(output, image_format, pnginfo=info)
+    else:
+        image.save(output, image_format)
+    return output.getvalue()
+
+
+def bake_bytes(template, content, url='https://example.com/badges/1'):
+    return b''.join(baking.bake(template, content, url))
+
+
+class BakingTests(SimpleTestCase):
+    """Tests de la cuisson des images PNG et SVG"""
+
+    def test_png(self):
+        template = baking.split_image(io.BytesIO(make_png()))
+        self.assertEqual(template.content_type, 'image/png')
+        self.assertTrue(template.tail.startswith(b'\x00\x00\x00\x00IEND'))
+        baked = bake_bytes(template, '{"id":"é"}')
+
+        image = Image.open(io.BytesIO(baked))
+        image.load()
+        self.assertEqual(image.info['openbadges'], '{"id":"é"}')
+        self.assertEqual(image.getpixel((0, 0)), (255, 0, 0))
+
+    def test_png_already_baked(self):
+        template = baking.split_image(io.BytesIO(make_png('{"id":"ancien"}')))
+        self.assertNotIn(b'ancien', template.head)
+        image = Image.open(io.BytesIO(bake_bytes(template, '{"id":"nouveau"}')))
+        image.load()
+        self.assertEqual(image.info['openbadges'], '{"id":"nouveau"}')
+
+    def test_png_truncated(self):
+        with self.assertRaises(ValueError):
+            baking.split_image(io.BytesIO(make_png()[:-20]))
+
+    def test_svg(self):
+        # Des lectures de 16 octets coupent la balise <svg> entre deux blocs
+        with mock.patch.object(baking, 'READ_SIZE', 16):
+            template = baking.split_image(io.BytesIO(SVG.encode()))
+        baked = bake_bytes(template, '{"name":"]]>"}', 'https://example.com/badges/1?a=1&b=2').decode()
+        self.assertIn('data-title="a > b" width="10" height="10" xmlns:openbadges="http://openbadges.org">', baked)
+        self.assertIn('<openbadges:assertion verify="https://example.com/badges/1?a=1&amp;b=2">', baked)
+        self.assertTrue(baked.endswith('<rect width="10" height="10"/></svg>'))
+
+        root = ElementTree.fromstring(baked.encode())
+        assertion = root.find('{http://openbadges.org}assertion')
+        self.assertEqual(json.loads(assertion.text), {"name": "]]>"})
+
+        # Une image déjà cuite ne garde que la nouvelle assertion
+        template = baking.split_image(io.BytesIO(baked.encode()))
+        rebaked = bake_bytes(template, '{}').decode()
+        self.assertEqual(rebaked.count('<openbadges:assertion'), 1)
+        self.assertEqual(rebaked.count('xmlns:openbadges'), 1)
+
+    def test_svg_multibyte_across_blocks(self):
+        # La limite de lecture de 64 Kio tombe au milieu d'un « é » selon le décalage
+        title = 'é' * 40000
+        for offset in (0, 2):
+            svg = ' ' * offset + f'<svg xmlns="http://www.w3.org/2000/svg"><title>{title}</title></svg>'
+            with self.subTest(offset=offset):
+                template = baking.split_image(io.BytesIO(svg.encode()))
+                baked = bake_bytes(template, '{}').decode()
+                self.assertIn(f'<title>{title}</title>', baked)
+
+    def test_unsupported_format(self):
+        for data in (make_png(image_format='JPEG'), b'<html></html>', b''):
+            with self.subTest(data=data[:8]), self.assertRaises(ValueError):
+                baking.split_image(io.BytesIO(data))
+
+    def test_iter_zip(self):
+        entries = [
+            (f'badge-{index}.svg', [b'<svg>', str(index).encode(), b'</svg>'], datetime(2024, 1, 2, 3, 4, 5))
+            for index in range(3)
+        ]
+        parts = list(baking.iter_zip(entries, zipfile.ZIP_DEFLATED))
+        # Un morceau par fichier, puis le répertoire central
+        self.assertEqual(len(parts), 4)
+        with zipfile.ZipFile(io.BytesIO(b''.join(parts))) as archive:
+            self.assertEqual(archive.namelist(), ['badge-0.svg', 'badge-1.svg', 'badge-2.svg'])
+            self.assertEqual(archive.read('badge-2.svg'), b'<svg>2</svg>')
+            self.assertEqual(archive.getinfo('badge-0.svg').date_time, (2024, 1, 2, 3, 4, 4))
+
+
+class RecordingStream(io.BytesIO):
+    """Flux qui compte les octets lus"""
+
+    def __init__(self, data, seekable=True):
+        super().__init__(data)
+        self.read_bytes = 0
+        self.can_seek = seekable
+
+    def read(self, size=-1):
+        data = super().read(size)
+        self.read_bytes += len(data)
+        return data
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if not self.can_seek:
+            raise io.UnsupportedOperation('seek')
+        return super().seek(offset, whence)
+
+
+class UnbakingTests(SimpleTestCase):
+    """Tests de l'extraction du credential d'une image cuite"""
+
+    def setUp(self):
+        # Image de bruit : ses données IDAT ne se compressent pas
+        image = Image.frombytes('RGB', (256, 256), bytes(range(256)) * 768)
+        output = io.BytesIO()
+        image.save(output, 'PNG', compress_level=0)
+        self.template = baking.split_image(io.BytesIO(output.getvalue()))
+
+    def test_png_data_is_skipped(self):
+        baked = bake_bytes(self.template, '{"id":"x"}')
+        for seekable in (True, False):
+            with self.subTest(seekable=seekable):
+                stream = RecordingStream(baked, seekable)
+                self.assertEqual(baking.unbake(stream), ('png', '{"id":"x"}'))
+                if seekable:
+                    self.assertLess(stream.read_bytes, 1000)
+                    self.assertGreater(len(baked), 190000)
+
+    def test_png_compressed_and_missing(self):
+        self.assertEqual(baking.unbake(io.BytesIO(make_png())), ('png', None))
+        image = Image.new('RGB', (4, 4))
+        info = PngInfo()
+        info.add_itxt('openbadges', '{"id":"zip"}', zip=True)
+        output = io.BytesIO()
+        image.save(output, 'PNG', pnginfo=info)
+        self.assertEqual(baking.unbake(io.BytesIO(output.getvalue())), ('png', '{"id":"zip"}'))
+
+    def test_png_bad_crc(self):
+        baked = bytearray(bake_bytes(self.template, '{"id":"x"}'))
+        baked[-20] ^= 0xFF
+        with self.assertRaises(ValueError):
+            baking.unbake(io.BytesIO(bytes(baked)))
+
+    def test_svg_stops_at_assertion(self):
+        template = baking.split_image(io.BytesIO(SVG.encode()))
+        baked = bake_bytes(template, '{"name":"]]>"}')
+        # La suite du document n'est pas analysée
+        stream = RecordingStream(baked + b'<pas du XML' * 20000)
+        with mock.patch.object(baking, 'READ_SIZE', 256):
+            self.assertEqual(baking.unbake(stream), ('svg', '{"name":"]]>"}'))
+        self.assertLess(stream.read_bytes, 2000)
+
+    def test_svg_without_assertion(self):
+        self.assertEqual(baking.unbake(io.BytesIO(SVG.encode())), ('svg', None))
+        for data in (b'', b'<svg><rect></svg>', make_png(image_format='JPEG')):
+            with self.subTest(data=data[:8]), self.assertRaises(ValueError):
+                baking.unbake(io.BytesIO(data))
+
+
+class BakedBadgeAPITests(TemporaryMediaMixin, CredentialFixtureMixin, APITestCase):
+    """Tests des badges cuits servis par l'API"""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+        self.create_assertions(1)
+        self.assertion = Assertion.objects.get()
+        self.badge_class = self.assertion.badge_class
+        self.badge_class.image = SimpleUploadedFile('badge.png', make_png())
+        self.badge_class.save()
+        for index in range(2):
+            Assertion.objects.create(
+                recipient=User.objects.create_user(email=f'cohort{index}@example.com', password='testpass123'),
+                badge_class=self.badge_class,
+                achievement=self.badge_class,
+                version=self.badge_class.version,
+                revoked=index == 1
+            )
+
+    def test_baked_png(self):
+        url = reverse('core:badges-baked', args=[self.assertion.pk])
+        response = self.client.get(url, HTTP_ACCEPT='image/png')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'image/png')
+        content = b''.join(response.streaming_content)
+        self.assertEqual(int(response['Content-Length']), len(content))
+
+        image = Image.open(io.BytesIO(content))
+        image.load()
+        credential = json.loads(image.info['openbadges'])
+        document = self.client.get(reverse('core:badges-detail', args=[self.assertion.pk])).json()
+        self.assertEqual(credential, document)
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_template_is_cached(self):
+        url = reverse('core:badges-baked', args=[self.assertion.pk])
+        self.client.get(url)
+        with mock.patch.object(baking, 'split_image') as split_image:
+            response = self.client.get(url)
+        split_image.assert_not_called()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_cohort_archive(self):
+        response = self.client.get(reverse('core:badges-baked-archive'), {'badge_class': self.badge_class.pk})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/zip')
+        with zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content))) as archive:
+            names = archive.namelist()
+            image = Image.open(io.BytesIO(archive.read(names[0])))
+            image.load()
+        # L'assertion révoquée n'est pas cuite
+        pks = sorted(Assertion.objects.filter(badge_class=self.badge_class, revoked=False).values_list('pk', flat=True))
+        self.assertEqual(names, [f'badge-{pk}.png' for pk in pks])
+        self.assertEqual(json.loads(image.info['openbadges'])['id'], Assertion.objects.get(pk=pks[0]).identifier)
+
+    @override_settings(API_BASE_URL='http://testserver', VERIFY_WORKERS=1)
+    def test_unbake_and_verify(self):
+        private_key, self.issuer.public_key = crypto.generate_key_pair('ed25519')
+        self.issuer.key_type = 'ed25519'
+        self.issuer.save()
+        sign_assertions(self.issuer, private_key)
+        response = self.client.get(reverse('core:badges-baked', args=[self.assertion.pk]))
+        baked = b''.join(response.streaming_content)
+
+        url = reverse('core:verify-baked')
+        response = self.client.post(url, {'image': SimpleUploadedFile('badge.png', baked)})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['format'], 'png')
+        self.assertTrue(response.json()['result']['verified'])
+        self.assertEqual(response.json()['credential']['id'], self.assertion.identifier)
+
+        # Un credential altéré dans l'image n'est pas vérifié
+        content = baking.unbake(io.BytesIO(baked))[1]
+        self.assertIn('"name":"Badge', content)
+        tampered = bake_bytes(baking.split_image(io.BytesIO(baked)), content.replace('"name":"Badge', '"name":"Faux'))
+        response = self.client.post(url, {'image': SimpleUploadedFile('badge.png', tampered)})
+        self.assertFalse(response.json()['result']['verified'])
+
+        response = self.client.post(url, {'image': SimpleUploadedFile('badge.png', make_png())})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.post(url, {}).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_invalid_requests(self):
+        for badge_class in ('', '²', '99999999999999999999999'):
+            with self.subTest(badge_class=badge_class):
+                response = self.client.get(reverse('core:badges-baked-archive'), {'badge_class': badge_class})
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(reverse('core:badges-baked', args=['abc']))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        BadgeClass.objects.filter(pk=self.badge_class.pk).update(image='')
+        response = self.client.get(reverse('core:badges-baked', args=[self.assertion.pk]))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(reverse('core:badges-baked', args=[self.assertion.pk + 100]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
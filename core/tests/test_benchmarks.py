@@ -0,0 +1,69 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from core.benchmarks import api, canonical, percentile, signatures, summarize
+from core.benchmarks.fixtures import seed
+from core.models import Assertion, BadgeClass, Endorsement, Issuer
+
+
+class BenchmarkHarnessTests(TestCase):
+    """Le harnais de bancs d'essai reste exécutable (à très petite échelle)"""
+
+    def test_summarize(self):
+        stats = summarize([0.3, 0.1, 0.2, 0.4])
+        self.assertEqual(stats['samples'], 4)
+        self.assertEqual(stats['min'], 0.1)
+        self.assertAlmostEqual(stats['median'], 0.25)
+        self.assertAlmostEqual(percentile([0, 10], 0.95), 9.5)
+
+    def test_seed(self):
+        counts = seed(assertions=40, issuers=2, badges=4, endorsements=1, endorsers=3)
+        self.assertEqual(counts, {'issuers': 2, 'badge_classes': 4, 'assertions': 40, 'endorsements': 46})
+        self.assertEqual(Issuer.objects.count(), 2)
+        self.assertEqual(BadgeClass.objects.count(), 4)
+        self.assertEqual(Assertion.objects.count(), 40)
+        self.assertEqual(Endorsement.objects.count(), 46)
+
+    def test_api_measures(self):
+        seed(assertions=30, endorsements=1)
+        results = {result['name']: result for result in api.measure_all(repeat=2)}
+        self.assertTrue(all(result['status'] == 200 for result in results.values() if 'status' in result))
+        self.assertEqual(results['get_assertion_json_ld']['queries'], 0)
+        self.assertEqual(results['detail cached']['queries'], 1)
+        self.assertGreater(results['list']['peak_memory'], 0)
+
+    def test_canonical_measures(self):
+        results = {result['name']: result for result in canonical.run(count=20, repeat=1)}
+        self.assertEqual(results['jcs']['bytes'], results['jcs memoized']['bytes'])
+        self.assertGreater(results['json.dumps sort_keys']['bytes_per_second'], 0)
+
+    def test_signature_measures(self):
+        profiles = [('rsa', 2048), ('ed25519', None), ('secp256k1', None)]
+        results = {result['name']: result for result in signatures.run(count=4, repeat=2, profiles=profiles)}
+        self.assertEqual(len(results), 2 * len(profiles))
+        self.assertEqual(results['rsa-2048 sign']['signature_bytes'], 256)
+        self.assertEqual(results['rsa-2048 sign']['samples'], 2)
+        self.assertEqual(results['secp256k1 verify']['signature_bytes'], 64)
+        self.assertGreater(results['ed25519 verify']['ops_per_second'], 0)
+
+    def test_command_output_and_compare(self):
+        fake_results = [{'suite': 'api', 'name': 'list', 'median': 0.02, 'p99': 0.03, 'queries': 3, 'peak_memory': 1e6}]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'results.json')
+            with mock.patch.object(api, 'run', return_value=fake_results):
+                call_command('benchmark', 'api', '--output', path, stdout=StringIO())
+                with open(path) as output:
+                    report = json.load(output)
+                self.assertEqual(report['results'], fake_results)
+                self.assertIn('commit', report)
+
+                fake_results[0]['median'] = 0.03
+                stdout = StringIO()
+                call_command('benchmark', 'api', '--compare', path, stdout=stdout)
+            self.assertIn('+50.0 %', stdout.getvalue())
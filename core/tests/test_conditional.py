@@ -0,0 +1,129 @@
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from core.models import User, Issuer, BadgeClass, Assertion, Endorsement, EndorsementType
+from core.models.badge import BadgeVersion
+
+
+class ConditionalRequestTests(APITestCase):
+    """Tests des requêtes conditionnelles (ETag / Last-Modified) de l'API"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.issuer = Issuer.objects.create(
+            name='Test Issuer',
+            url='https://example.com',
+            email='issuer@example.com',
+            image='https://example.com/logo.png',
+            version=BadgeVersion.V3.value,
+            owner=self.user
+        )
+        self.badge_class = BadgeClass.objects.create(
+            name='Test Badge',
+            description='Description',
+            criteria_url='https://example.com/criteria',
+            issuer=self.issuer,
+            version=BadgeVersion.V3.value
+        )
+        self.assertion = Assertion.objects.create(
+            recipient=self.user,
+            badge_class=self.badge_class,
+            version=BadgeVersion.V3.value
+        )
+        self.urls = [
+            reverse('core:badges-detail', args=[self.assertion.id]),
+            reverse('core:badges-achievement', args=[self.assertion.id]),
+            reverse('core:badge-with-endorsements') + f'?badge_id={self.badge_class.id}',
+        ]
+
+    def get(self, url, **headers):
+        return self.client.get(url, HTTP_ACCEPT='application/json', **headers)
+
+    def test_validators_present(self):
+        """Les réponses portent un ETag fort et une date Last-Modified"""
+        for url in self.urls:
+            response = self.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertTrue(response['ETag'].startswith('"'))
+            self.assertIn('Last-Modified', response)
+
+    def test_if_none_match_returns_304_in_one_query(self):
+        """Un ETag à jour donne une 304 sans construire le document"""
+        for url in self.urls:
+            etag = self.get(url)['ETag']
+            with self.assertNumQueries(1):
+                response = self.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_if_modified_since(self):
+        """Une date If-Modified-Since postérieure aux modifications donne une 304"""
+        later = http_date((timezone.now() + timezone.timedelta(minutes=1)).timestamp())
+        for url in self.urls:
+            response = self.get(url, HTTP_IF_MODIFIED_SINCE=later)
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_endorsement_changes_etag(self):
+        """L'ajout puis la suppression d'un endorsement changent l'ETag"""
+        url = self.urls[0]
+        initial = self.get(url)['ETag']
+        endorsement = Endorsement.objects.create(
+            type=EndorsementType.BADGE_CLASS,
+            badge_class=self.badge_class,
+            endorser=self.user,
+            claim={'text': 'Excellent'}
+        )
+        endorsed = self.get(url, HTTP_IF_NONE_MATCH=initial)
+        self.assertEqual(endorsed.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(endorsed['ETag'], initial)
+
+        endorsement.delete()
+        removed = self.get(url, HTTP_IF_NONE_MATCH=endorsed['ETag'])
+        self.assertEqual(removed.status_code, status.HTTP_200_OK)
+
+    def test_endorser_profile_changes_etag(self):
+        """Le changement de nom d'un endorser change l'ETag des documents endorsés"""
+        Endorsement.objects.create(
+            type=EndorsementType.BADGE_CLASS,
+            badge_class=self.badge_class,
+            endorser=self.user,
+            claim={'text': 'Excellent'}
+        )
+        etags = {url: self.get(url)['ETag'] for url in self.urls}
+        self.user.display_name = 'Nouveau nom'
+        self.user.save(update_fields=['display_name'])
+        for url, etag in etags.items():
+            with self.subTest(url=url):
+                response = self.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertContains(response, 'Nouveau nom')
+
+    def test_assertion_change_updates_etag(self):
+        """La modification de l'assertion change l'ETag du credential"""
+        url = self.urls[0]
+        etag = self.get(url)['ETag']
+        self.assertion.narrative = 'Nouvelle preuve'
+        self.assertion.save()
+        self.assertEqual(self.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+    def test_invalid_pk(self):
+        """Une clé non numérique donne une 404, pas une erreur serveur"""
+        urls = [
+            '/api/v3/badges/abc/',
+            '/api/v3/badges/²/achievement/',
+            reverse('core:badge-with-endorsements') + '?badge_id=abc',
+            reverse('core:async-badge-with-endorsements') + '?badge_id=²',
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.get(url).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_missing_assertion(self):
+        """Une assertion inexistante retourne une 404"""
+        response = self.get(reverse('core:badges-detail', args=[self.assertion.id + 1]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
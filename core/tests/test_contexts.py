@@ -0,0 +1,82 @@
+import unittest
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from core.jsonld import JSON_LD_CONTEXT
+from core.utils import contexts
+
+OB_V3_CONTEXT = 'https://purl.imsglobal.org/spec/ob/v3p0/context.json'
+
+try:
+    from pyld import jsonld
+except ImportError:  # pragma: no cover - dépendance optionnelle
+    jsonld = None
+
+
+class ContextStoreTests(SimpleTestCase):
+    """Tests du magasin local de contextes JSON-LD"""
+
+    def test_every_declared_context_is_vendored(self):
+        for url in contexts.CONTEXTS:
+            with self.subTest(url=url):
+                self.assertIn('@context', contexts.load_context(url))
+
+    def test_unverified_context_is_not_vendored(self):
+        # Aucune copie non vérifiée de context-3.0.3.json n'est servie à sa place
+        self.assertNotIn(JSON_LD_CONTEXT, contexts.CONTEXTS)
+        with self.assertRaises(contexts.ContextNotFound):
+            contexts.document_loader(JSON_LD_CONTEXT, {})
+
+    def test_parsed_contexts_are_cached(self):
+        url = 'https://www.w3.org/ns/credentials/v2'
+        self.assertIs(contexts.load_context(url), contexts.load_context(url))
+
+    def test_aliases_and_fragments(self):
+        self.assertIs(
+            contexts.load_context('http://w3id.org/openbadges/v2#Assertion'),
+            contexts.load_context('https://w3id.org/openbadges/v2')
+        )
+
+    def test_document_loader(self):
+        remote = contexts.document_loader(OB_V3_CONTEXT, {})
+        self.assertEqual(remote['documentUrl'], OB_V3_CONTEXT)
+        self.assertIsNone(remote['contextUrl'])
+        self.assertIs(remote['document'], contexts.load_context(OB_V3_CONTEXT))
+
+    def test_unknown_context_is_refused(self):
+        with self.assertRaises(contexts.ContextNotFound):
+            contexts.document_loader('https://example.com/context.json', {})
+
+    @override_settings(JSONLD_REMOTE_CONTEXTS=True)
+    def test_unknown_context_uses_network_when_allowed(self):
+        remote = mock.Mock(return_value={'document': {'@context': {}}})
+        with mock.patch.object(contexts, 'remote_document_loader', return_value=remote):
+            contexts.document_loader('https://example.com/context.json', {})
+        remote.assert_called_once_with('https://example.com/context.json', {})
+
+
+@unittest.skipIf(jsonld is None, "pyld n'est pas installé")
+class OfflineExpansionTests(SimpleTestCase):
+    """Les opérations JSON-LD n'accèdent jamais au réseau"""
+
+    def test_loader_is_installed(self):
+        self.assertIs(jsonld.get_document_loader(), contexts.document_loader)
+
+    def test_expand_credential_offline(self):
+        credential = {
+            '@context': ['https://www.w3.org/2018/credentials/v1', OB_V3_CONTEXT],
+            'type': ['VerifiableCredential', 'OpenBadgeCredential'],
+            'issuer': {'id': 'https://example.com/issuers/1', 'type': 'Profile', 'name': 'Test'},
+            'issuanceDate': '2024-01-01T00:00:00Z',
+            'credentialSubject': {
+                'type': 'AchievementSubject',
+                'achievement': {'id': 'https://example.com/badges/1', 'type': 'Achievement', 'name': 'Badge'},
+            },
+        }
+        with mock.patch('urllib.request.urlopen', side_effect=AssertionError('accès réseau')):
+            expanded = jsonld.expand(credential)
+        self.assertIn(
+            'https://purl.imsglobal.org/spec/vc/ob/vocab.html#OpenBadgeCredential',
+            expanded[0]['@type']
+        )
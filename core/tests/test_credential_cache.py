@@ -0,0 +1,106 @@
+import json
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from core.models import User, Issuer, BadgeClass, Assertion, Endorsement, EndorsementType, CredentialCache
+from core.models.badge import BadgeVersion
+
+
+class CredentialCacheTests(APITestCase):
+    """Tests du cache matérialisé des OpenBadgeCredential"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='test@example.com',
+            password='testpass123',
+            display_name='Endorser'
+        )
+        self.issuer = Issuer.objects.create(
+            name='Test Issuer',
+            url='https://example.com',
+            email='issuer@example.com',
+            image='https://example.com/logo.png',
+            version=BadgeVersion.V3.value,
+            owner=self.user
+        )
+        self.badge_class = BadgeClass.objects.create(
+            name='Test Badge',
+            description='Description',
+            criteria_url='https://example.com/criteria',
+            issuer=self.issuer,
+            version=BadgeVersion.V3.value
+        )
+        self.assertion = Assertion.objects.create(
+            recipient=self.user,
+            badge_class=self.badge_class,
+            version=BadgeVersion.V3.value
+        )
+        self.url = reverse('core:badges-detail', args=[self.assertion.id])
+
+    def get_credential(self):
+        response = self.client.get(self.url, HTTP_ACCEPT='application/json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return json.loads(response.content)
+
+    def test_hot_read_is_single_query(self):
+        """Une lecture à chaud ne coûte qu'une requête"""
+        first = self.get_credential()
+        with CaptureQueriesContext(connection) as context:
+            second = self.get_credential()
+        self.assertEqual(len(context.captured_queries), 1)
+        self.assertEqual(first, second)
+
+    def test_badge_class_change_invalidates(self):
+        """La modification du badge invalide le credential"""
+        self.get_credential()
+        self.badge_class.name = 'Nouveau nom'
+        self.badge_class.save()
+        self.assertFalse(CredentialCache.objects.exists())
+        self.assertEqual(self.get_credential()['achievement']['name'], 'Nouveau nom')
+
+    def test_endorsement_invalidates(self):
+        """Un nouvel endorsement du badge invalide le credential"""
+        self.get_credential()
+        Endorsement.objects.create(
+            type=EndorsementType.BADGE_CLASS,
+            badge_class=self.badge_class,
+            endorser=self.user,
+            claim={'text': 'Excellent'}
+        )
+        credential = self.get_credential()
+        self.assertEqual(credential['achievement']['endorsement'][0]['credentialSubject']['endorsementComment'], 'Excellent')
+
+    def test_endorser_profile_change_invalidates(self):
+        """Le changement du nom affiché d'un endorser invalide le credential"""
+        Endorsement.objects.create(
+            type=EndorsementType.ASSERTION,
+            assertion=self.assertion,
+            endorser=self.user,
+            claim={'text': 'Vérifié'}
+        )
+        self.get_credential()
+        self.user.display_name = 'Nouveau nom'
+        self.user.save(update_fields=['display_name'])
+        self.assertEqual(self.get_credential()['endorsement'][0]['issuer']['name'], 'Nouveau nom')
+
+    def test_login_does_not_invalidate(self):
+        """La mise à jour de last_login ne touche pas au cache"""
+        self.get_credential()
+        self.client.login(email='test@example.com', password='testpass123')
+        self.assertTrue(CredentialCache.objects.exists())
+
+    def test_warm_command(self):
+        """La commande warm_credential_cache remplit le cache en masse"""
+        call_command('warm_credential_cache', '--base-url', 'http://testserver/', stdout=StringIO())
+        entry = CredentialCache.objects.get()
+        self.assertEqual(entry.base_url, 'http://testserver')
+        with CaptureQueriesContext(connection) as context:
+            credential = self.get_credential()
+        self.assertEqual(len(context.captured_queries), 1)
+        self.assertEqual(credential, json.loads(entry.content))
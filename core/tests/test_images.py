@@ -0,0 +1,143 @@
+import io
+
+from PIL import Image
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.template import Context, Template
+from django.template.loader import render_to_string
+from django.test import TestCase
+from django.urls import reverse
+
+from core import images
+from core.models import BadgeClass, Issuer
+
+from .test_api import TemporaryMediaMixin
+
+User = get_user_model()
+
+
+def make_image(size=(800, 400), image_format='PNG', mode='RGBA'):
+    output = io.BytesIO()
+    # Rouge semi-transparent : la transparence doit survivre aux conversions
+    Image.new(mode, size, (255, 0, 0, 128) if mode == 'RGBA' else 'red').save(output, image_format)
+    return output.getvalue()
+
+
+class ImageDerivativesTests(TemporaryMediaMixin, TestCase):
+    """Tests des images dérivées des BadgeClass"""
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(email='images@example.com', password='testpass123')
+        self.issuer = Issuer.objects.create(
+            name='Test Issuer',
+            url='https://example.com',
+            email='issuer@example.com',
+            description='Test Issuer Description',
+            image='https://example.com/logo.png',
+            owner=self.user
+        )
+
+    def create_badge_class(self, content, name='badge.png', **kwargs):
+        return BadgeClass.objects.create(
+            name=kwargs.pop('badge_name', 'Test Badge'),
+            description='Test Badge Description',
+            image=SimpleUploadedFile(name, content),
+            criteria_url='https://example.com/criteria',
+            issuer=self.issuer,
+            **kwargs
+        )
+
+    def test_generated_on_upload(self):
+        badge_class = self.create_badge_class(make_image())
+        derivatives = BadgeClass.objects.get(pk=badge_class.pk).image_derivatives
+        self.assertEqual(derivatives['source'], badge_class.image.name)
+        self.assertEqual(
+            [(variant['name'], variant['width'], variant['height']) for variant in derivatives['variants']],
+            [('thumb', 100, 50), ('card', 200, 100), ('full', 512, 256)]
+        )
+        for variant in derivatives['variants']:
+            for extension, image_format in (('png', 'PNG'), ('webp', 'WEBP')):
+                self.assertTrue(variant[extension].startswith('badges/derivatives/'))
+                with default_storage.open(variant[extension]) as stored, Image.open(stored) as image:
+                    self.assertEqual(image.format, image_format)
+                    self.assertEqual(image.size, (variant['width'], variant['height']))
+                    self.assertEqual(image.mode, 'RGBA')
+
+    def test_never_upscaled(self):
+        badge_class = self.create_badge_class(make_image((150, 150), 'JPEG', 'RGB'), 'badge.jpg')
+        variants = badge_class.image_derivatives['variants']
+        # Les tailles card et full dépasseraient l'original : seule la plus proche est gardée
+        self.assertEqual([(variant['name'], variant['width']) for variant in variants], [('thumb', 100), ('card', 150)])
+
+    def test_content_addressed(self):
+        first = self.create_badge_class(make_image())
+        second = self.create_badge_class(make_image(), badge_name='Autre badge')
+        self.assertNotEqual(first.image.name, second.image.name)
+        self.assertEqual(first.image_derivatives['variants'], second.image_derivatives['variants'])
+
+    def test_regenerated_only_when_image_changes(self):
+        badge_class = self.create_badge_class(make_image())
+        self.assertFalse(images.update(badge_class))
+        badge_class.name = 'Renommé'
+        badge_class.save()
+        self.assertEqual(badge_class.image_derivatives['variants'][0]['width'], 100)
+
+        badge_class.image = SimpleUploadedFile('square.png', make_image((300, 300)))
+        badge_class.save()
+        badge_class.refresh_from_db()
+        self.assertEqual(badge_class.image_derivatives['source'], badge_class.image.name)
+        self.assertEqual(badge_class.image_derivatives['variants'][-1]['width'], 300)
+
+    def test_unreadable_image(self):
+        svg = b'<svg xmlns="http://www.w3.org/2000/svg" width="10" height="10"/>'
+        badge_class = self.create_badge_class(svg, 'badge.svg')
+        self.assertEqual(badge_class.image_derivatives['variants'], [])
+        self.assertEqual(images.get_variants(badge_class.image), [])
+
+    def test_management_command(self):
+        badge_class = self.create_badge_class(make_image())
+        BadgeClass.objects.filter(pk=badge_class.pk).update(image_derivatives={})
+        output = io.StringIO()
+        call_command('generate_image_derivatives', stdout=output)
+        self.assertIn('1 badge(s)', output.getvalue())
+        badge_class.refresh_from_db()
+        self.assertEqual(len(badge_class.image_derivatives['variants']), 3)
+
+        call_command('generate_image_derivatives', stdout=output)
+        self.assertIn('0 badge(s)', output.getvalue())
+
+    def test_badge_image_tag(self):
+        badge_class = self.create_badge_class(make_image())
+        rendered = Template(
+            '{% load image_tags %}{% badge_image badge.image alt=badge.name sizes="150px" %}'
+        ).render(Context({'badge': badge_class}))
+        variants = badge_class.image_derivatives['variants']
+        self.assertIn('<picture>', rendered)
+        self.assertIn('type="image/webp"', rendered)
+        self.assertIn(f"/media/{variants[0]['webp']} 100w", rendered)
+        self.assertIn(f"/media/{variants[2]['png']} 512w", rendered)
+        self.assertIn(f'src="/media/{variants[0]["png"]}"', rendered)
+        self.assertIn('sizes="150px"', rendered)
+        self.assertNotIn(badge_class.image.name, rendered)
+
+    def test_badge_image_tag_fallback(self):
+        badge_class = self.create_badge_class(b'<svg xmlns="http://www.w3.org/2000/svg"/>', 'badge.svg')
+        rendered = Template('{% load image_tags %}{% badge_image image %}').render(Context({'image': badge_class.image}))
+        self.assertNotIn('<picture>', rendered)
+        self.assertIn(f'src="{badge_class.image.url}"', rendered)
+
+    def test_public_list(self):
+        badge_class = self.create_badge_class(make_image())
+        response = self.client.get(reverse('core:public-badge-list'))
+        self.assertContains(response, images.get_srcset(badge_class.image, 'webp'))
+        self.assertNotContains(response, f'src="{badge_class.image.url}"')
+
+    def test_navbar_badges(self):
+        badge_class = self.create_badge_class(make_image())
+        rendered = render_to_string('core/badge/partials/navbar_badges.html', {'issuers': [self.issuer]})
+        self.assertIn(images.get_srcset(badge_class.image, 'webp'), rendered)
+        self.assertIn('sizes="32px"', rendered)
+        self.assertNotIn(f'src="{badge_class.image.url}"', rendered)
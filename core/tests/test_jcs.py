@@ -0,0 +1,113 @@
+import json
+import struct
+
+from django.test import SimpleTestCase
+
+from core.utils.jcs import Canonicalizer, canonicalize, format_number
+
+
+def from_ieee(hex_value):
+    return struct.unpack('>d', bytes.fromhex(hex_value))[0]
+
+
+class JCSConformanceTests(SimpleTestCase):
+    """Vecteurs de test de la RFC 8785"""
+
+    def test_number_serialization(self):
+        # RFC 8785, annexe B
+        vectors = [
+            ('0000000000000000', '0'),
+            ('8000000000000000', '0'),
+            ('0000000000000001', '5e-324'),
+            ('8000000000000001', '-5e-324'),
+            ('7fefffffffffffff', '1.7976931348623157e+308'),
+            ('ffefffffffffffff', '-1.7976931348623157e+308'),
+            ('4340000000000000', '9007199254740992'),
+            ('c340000000000000', '-9007199254740992'),
+            ('4430000000000000', '295147905179352830000'),
+            ('44b52d02c7e14af5', '9.999999999999997e+22'),
+            ('44b52d02c7e14af6', '1e+23'),
+            ('44b52d02c7e14af7', '1.0000000000000001e+23'),
+            ('444b1ae4d6e2ef4e', '999999999999999700000'),
+            ('444b1ae4d6e2ef4f', '999999999999999900000'),
+            ('444b1ae4d6e2ef50', '1e+21'),
+            ('3eb0c6f7a0b5ed8c', '9.999999999999997e-7'),
+            ('3eb0c6f7a0b5ed8d', '0.000001'),
+            ('41b3de4355555553', '333333333.3333332'),
+            ('41b3de4355555554', '333333333.33333325'),
+            ('41b3de4355555555', '333333333.3333333'),
+            ('41b3de4355555556', '333333333.3333334'),
+            ('41b3de4355555557', '333333333.33333343'),
+            ('becbf647612f3696', '-0.0000033333333333333333'),
+            ('43143ff3c1cb0959', '1424953923781206.2'),
+        ]
+        for hex_value, expected in vectors:
+            with self.subTest(hex_value=hex_value):
+                self.assertEqual(format_number(from_ieee(hex_value)), expected)
+
+    def test_invalid_numbers(self):
+        for hex_value in ('7fffffffffffffff', '7ff0000000000000'):
+            with self.subTest(hex_value=hex_value), self.assertRaises(ValueError):
+                format_number(from_ieee(hex_value))
+        with self.assertRaises(ValueError):
+            format_number(10 ** 400)
+
+    def test_primitive_data_types(self):
+        # RFC 8785, section 3.2.2
+        document = json.loads(
+            '{"numbers": [333333333.33333329, 1E30, 4.50, 2e-3, 0.000000000000000000000000001],'
+            ' "string": "\\u20ac$\\u000F\\u000aA\'\\u0042\\u0022\\u005c\\\\\\"\\/",'
+            ' "literals": [null, true, false]}'
+        )
+        self.assertEqual(
+            canonicalize(document),
+            '{"literals":[null,true,false],"numbers":[333333333.3333333,1e+30,4.5,0.002,1e-27],'
+            '"string":"€$\\u000f\\nA\'B\\"\\\\\\\\\\"/"}'.encode()
+        )
+
+    def test_sorting(self):
+        # RFC 8785, section 3.2.3
+        document = json.loads(
+            '{"\\u20ac": "Euro Sign", "\\r": "Carriage Return", "\\ufb33": "Hebrew Letter Dalet With Dagesh",'
+            ' "1": "One", "\\ud83d\\ude00": "Emoji: Grinning Face", "\\u0080": "Control",'
+            ' "\\u00f6": "Latin Small Letter O With Diaeresis"}'
+        )
+        values = [value for value in json.loads(canonicalize(document)).values()]
+        self.assertEqual(values, [
+            'Carriage Return', 'One', 'Control', 'Latin Small Letter O With Diaeresis',
+            'Euro Sign', 'Emoji: Grinning Face', 'Hebrew Letter Dalet With Dagesh',
+        ])
+
+    def test_invalid_values(self):
+        for value in ({1: 'clé entière'}, {'date': object()}, '\ud800'):
+            with self.subTest(value=value), self.assertRaises((TypeError, ValueError)):
+                canonicalize(value)
+
+
+class SharedSubtreeTests(SimpleTestCase):
+    """Mémoire des sous-arbres partagés"""
+
+    def test_shared_subtrees_are_reused(self):
+        canonicalizer = Canonicalizer()
+        achievement = {'type': ['Achievement'], 'name': 'Badge', 'version': 3}
+        documents = [
+            {'id': f'urn:{index}', 'achievement': achievement, 'credentialSubject': {'achievement': achievement}}
+            for index in range(3)
+        ]
+        for document in documents:
+            self.assertEqual(
+                canonicalizer.canonicalize(document, shared={id(achievement): ('achievement', 1)}),
+                canonicalize(document)
+            )
+        self.assertEqual((canonicalizer.misses, canonicalizer.hits), (1, 5))
+
+    def test_key_change_recomputes(self):
+        canonicalizer = Canonicalizer()
+        canonicalizer.canonicalize({'a': {'name': 'v1'}}, shared={})
+        subtree = {'name': 'v2'}
+        canonicalizer.canonicalize({'a': subtree}, shared={id(subtree): ('badge', 1, 'v1')})
+        subtree = {'name': 'v3'}
+        self.assertEqual(
+            canonicalizer.canonicalize({'a': subtree}, shared={id(subtree): ('badge', 1, 'v2')}),
+            b'{"a":{"name":"v3"}}'
+        )
@@ -0,0 +1,253 @@
+import itertools
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from core.models.badge import Issuer, BadgeVersion
+from core.utils import crypto, crypto_benchmark, keypool, keys
+from core.utils.keypool import KeyPool
+from core.utils.keys import KeyRegistry
+
+User = get_user_model()
+
+
+class CryptoTests(SimpleTestCase):
+    """Tests des primitives de signature"""
+
+    def test_verify_key_pair(self):
+        for key_type in ('rsa', 'ed25519', 'secp256k1'):
+            with self.subTest(key_type=key_type):
+                private_key, public_key = crypto.generate_key_pair(key_type)
+                self.assertTrue(crypto.verify_key_pair(private_key, public_key, key_type))
+                _, other_public_key = crypto.generate_key_pair(key_type)
+                self.assertFalse(crypto.verify_key_pair(private_key, other_public_key, key_type))
+
+    def test_sign_and_verify_loaded_keys(self):
+        private_key, public_key = crypto.generate_key_pair('ed25519')
+        signature = crypto.sign_message(crypto.load_private_key(private_key, 'ed25519'), b'message')
+        public = crypto.load_public_key(public_key, 'ed25519')
+        self.assertTrue(crypto.verify_signature(public, signature, b'message'))
+        self.assertFalse(crypto.verify_signature(public, signature, b'autre message'))
+
+    def test_secp256k1_backends_agree(self):
+        private_key, public_key = crypto.generate_key_pair('secp256k1')
+        self.assertEqual((len(private_key), len(public_key)), (2 + 64, 2 + 66))
+        signatures = {}
+        for backend in {crypto.coincurve, None}:
+            with self.subTest(backend=backend), mock.patch.object(crypto, 'coincurve', backend):
+                signatures[backend] = crypto.sign_message(crypto.load_private_key(private_key, 'secp256k1'), b'message')
+                self.assertEqual(len(signatures[backend]), 64)
+        for backend in {crypto.coincurve, None}:
+            with self.subTest(backend=backend), mock.patch.object(crypto, 'coincurve', backend):
+                public = crypto.load_public_key(public_key, 'secp256k1')
+                for signature in signatures.values():
+                    self.assertTrue(crypto.verify_signature(public, signature, b'message'))
+                    # La forme « s haut » de la même signature reste acceptée
+                    s = int.from_bytes(signature[32:], 'big')
+                    high_s = signature[:32] + (crypto.SECP256K1_ORDER - s).to_bytes(32, 'big')
+                    self.assertTrue(crypto.verify_signature(public, high_s, b'message'))
+                    self.assertFalse(crypto.verify_signature(public, signature, b'autre message'))
+                    self.assertFalse(crypto.verify_signature(public, signature[:63], b'message'))
+
+    def test_invalid_key(self):
+        with self.assertRaises(ValueError):
+            crypto.load_public_key('pas une clé', 'rsa')
+        with self.assertRaises(ValueError):
+            crypto.load_public_key('02' + '00' * 32, 'secp256k1')
+        self.assertFalse(crypto.verify_key_pair('pas une clé', 'pas une clé', 'rsa'))
+
+
+class KeyRegistryTests(SimpleTestCase):
+    """Tests du cache LRU de clés chargées"""
+
+    def setUp(self):
+        self.registry = KeyRegistry(maxsize=2)
+        self.public_keys = [crypto.generate_key_pair('ed25519')[1] for _ in range(3)]
+
+    def test_keys_are_loaded_once(self):
+        with mock.patch.object(keys, 'load_public_key', wraps=crypto.load_public_key) as load:
+            first = self.registry.public_key(self.public_keys[0], 'ed25519')
+            self.assertIs(self.registry.public_key(self.public_keys[0], 'ed25519'), first)
+        load.assert_called_once()
+        self.assertEqual((self.registry.hits, self.registry.misses), (1, 1))
+
+    def test_least_recently_used_key_is_evicted(self):
+        first = self.registry.public_key(self.public_keys[0], 'ed25519')
+        self.registry.public_key(self.public_keys[1], 'ed25519')
+        self.registry.public_key(self.public_keys[0], 'ed25519')
+        self.registry.public_key(self.public_keys[2], 'ed25519')
+        self.assertEqual(len(self.registry), 2)
+        self.assertIs(self.registry.public_key(self.public_keys[0], 'ed25519'), first)
+        self.assertEqual(self.registry.misses, 3)
+
+    def test_private_and_public_keys_are_separate(self):
+        private_key, public_key = crypto.generate_key_pair('rsa')
+        private = self.registry.private_key(private_key, 'rsa')
+        public = self.registry.public_key(public_key, 'rsa')
+        signature = crypto.sign_message(private, b'message')
+        self.assertTrue(crypto.verify_signature(public, signature, b'message'))
+
+
+class IssuerKeyInvalidationTests(TestCase):
+    """La clé d'un émetteur est évincée du registre lorsqu'elle change"""
+
+    def setUp(self):
+        keys.registry.clear()
+        owner = User.objects.create_user(email='owner@example.com', password='testpass123')
+        self.issuer = Issuer.objects.create(
+            name='Test Issuer',
+            url='https://example.com',
+            email='issuer@example.com',
+            image='https://example.com/logo.png',
+            version=BadgeVersion.V3.value,
+            key_type='ed25519',
+            public_key=crypto.generate_key_pair('ed25519')[1],
+            owner=owner
+        )
+
+    def test_key_change_evicts_previous_key(self):
+        previous = keys.registry.issuer_public_key(self.issuer)
+        self.issuer.name = 'Autre nom'
+        self.issuer.save()
+        self.assertEqual(len(keys.registry), 1)
+
+        self.issuer.public_key = crypto.generate_key_pair('ed25519')[1]
+        self.issuer.save()
+        self.assertEqual(len(keys.registry), 0)
+        self.assertIsNot(keys.registry.issuer_public_key(self.issuer), previous)
+
+    def test_deletion_evicts_key(self):
+        keys.registry.issuer_public_key(self.issuer)
+        self.issuer.delete()
+        self.assertEqual(len(keys.registry), 0)
+
+    def test_issuer_without_key(self):
+        self.issuer.public_key = ''
+        with self.assertRaises(ValueError):
+            keys.registry.issuer_public_key(self.issuer)
+
+
+class KeyPoolTests(SimpleTestCase):
+    """Tests de la réserve de paires de clés pré-générées"""
+
+    def setUp(self):
+        self.generated = []
+        counter = itertools.count(1)
+
+        def generate(key_type):
+            index = next(counter)
+            self.generated.append(index)
+            return f'private-{index}', f'public-{index}'
+
+        self.pool = KeyPool(size=3, low_water=2, key_types=['rsa'], generate=generate)
+        self.addCleanup(self.pool.stop, 5)
+
+    def test_take_returns_pregenerated_pairs(self):
+        self.pool.start()
+        self.assertTrue(self.pool.wait(5))
+        self.assertEqual(self.pool.available('rsa'), 3)
+        self.assertEqual(self.pool.take('rsa'), ('private-1', 'public-1'))
+        self.assertEqual(self.pool.take('rsa'), ('private-2', 'public-2'))
+        self.assertEqual(self.pool.hits, 2)
+
+    def test_refill_below_low_water(self):
+        self.pool.start()
+        self.pool.wait(5)
+        self.pool.take('rsa')
+        self.assertEqual(len(self.generated), 3)
+        self.pool.take('rsa')
+        self.assertTrue(self.pool.wait(5))
+        self.assertEqual(self.pool.available('rsa'), 3)
+        self.assertEqual(len(self.generated), 5)
+
+    def test_empty_pool_generates_inline(self):
+        private_key, _ = self.pool.take('rsa')
+        self.assertEqual(self.pool.misses, 1)
+        self.assertNotIn(private_key, [pair[0] for pair in self.pool.pairs['rsa']])
+        # Les types hors réserve sont générés directement
+        private_key, public_key = self.pool.take('ed25519')
+        self.assertTrue(crypto.verify_key_pair(private_key, public_key, 'ed25519'))
+
+
+class CryptoBenchmarkTests(SimpleTestCase):
+    """Tests des mesures de débit et du conseil de type de clé"""
+
+    MEASURES = [
+        {'label': 'rsa-2048', 'key_type': 'rsa', 'key_size': 2048, 'sign_per_second': 1000, 'verify_per_second': 20000},
+        {'label': 'rsa-4096', 'key_type': 'rsa', 'key_size': 4096, 'sign_per_second': 200, 'verify_per_second': 8000},
+        {'label': 'ed25519', 'key_type': 'ed25519', 'key_size': None, 'sign_per_second': 20000, 'verify_per_second': 8000},
+    ]
+
+    def test_run(self):
+        measures = crypto_benchmark.run(profiles=[('ed25519', None), ('secp256k1', None)], duration=0.01)
+        self.assertEqual([measure['label'] for measure in measures], ['ed25519', 'secp256k1'])
+        for measure in measures:
+            self.assertEqual(measure['signature_bytes'], 64)
+            self.assertGreater(measure['keygen_per_second'], 0)
+            self.assertGreater(measure['verify_per_second'], 0)
+
+    def test_advice_depends_on_verification_ratio(self):
+        ranked = crypto_benchmark.advise(self.MEASURES, verifications=1)
+        self.assertEqual([measure['label'] for measure in ranked], ['ed25519', 'rsa-2048', 'rsa-4096'])
+        self.assertEqual(ranked[0]['relative_cost'], 1)
+        self.assertAlmostEqual(ranked[0]['cost'], 1 / 20000 + 1 / 8000)
+        self.assertEqual(crypto_benchmark.advise(self.MEASURES, verifications=1000)[0]['label'], 'rsa-2048')
+
+
+class GenerateKeysAdminTests(TestCase):
+    """La génération de clés de l'admin prend ses paires dans la réserve"""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_generate_keys(self):
+        admin = User.objects.create_superuser(email='admin@example.com', password='testpass123')
+        issuer = Issuer.objects.create(
+            name='Test Issuer',
+            url='https://example.com',
+            email='issuer@example.com',
+            image='https://example.com/logo.png',
+            version=BadgeVersion.V3.value,
+            owner=admin
+        )
+        self.client.force_login(admin)
+        private_key, public_key = crypto.generate_key_pair('ed25519')
+        with mock.patch.object(keypool.pool, 'take', return_value=(private_key, public_key)) as take:
+            self.client.post(reverse('admin:core_issuer_generate_keys', args=[issuer.pk]), {'key_type': 'ed25519'})
+        take.assert_called_once_with('ed25519')
+        issuer.refresh_from_db()
+        self.assertEqual((issuer.key_type, issuer.public_key), ('ed25519', public_key))
+
+    def test_key_advice(self):
+        admin = User.objects.create_superuser(email='admin@example.com', password='testpass123')
+        issuer = Issuer.objects.create(
+            name='Test Issuer',
+            url='https://example.com',
+            email='issuer@example.com',
+            image='https://example.com/logo.png',
+            version=BadgeVersion.V3.value,
+            owner=admin
+        )
+        self.client.force_login(admin)
+        url = reverse('admin:core_issuer_generate_keys', args=[issuer.pk])
+        response = self.client.get(url)
+        self.assertIsNone(response.context['measures'])
+
+        # RSA 4096 bits, plus rapide à vérifier ici, n'est pas générée par l'admin
+        measures = CryptoBenchmarkTests.MEASURES + [
+            {'label': 'rsa-3072', 'key_type': 'rsa', 'key_size': 3072, 'sign_per_second': 500, 'verify_per_second': 90000},
+        ]
+        measures = [{**measure, 'keygen_per_second': 1, 'signature_bytes': 64, 'public_key_bytes': 44, 'backend': 'cryptography'} for measure in measures]
+        with mock.patch.object(crypto_benchmark, 'run', return_value=measures) as run:
+            response = self.client.get(url, {'measure': '1', 'verifications': '1000'})
+        run.assert_called_once()
+        self.assertEqual(response.context['measures'][0]['label'], 'rsa-3072')
+        self.assertEqual(response.context['recommended']['label'], 'rsa-2048')
+        self.assertContains(response, '<option value="rsa" selected>')
+
+        # Les mesures restent en cache
+        response = self.client.get(url, {'verifications': '1'})
+        self.assertEqual(response.context['recommended']['label'], 'ed25519')
@@ -0,0 +1,53 @@
+import datetime
+import json
+import uuid
+
+from django.test import SimpleTestCase
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from core.renderers import NDJSONRenderer, OpenBadgeJSONRenderer, iter_json_array
+
+
+class OpenBadgeJSONRendererTests(SimpleTestCase):
+    """La sortie du renderer rapide doit rester identique à celle de DRF"""
+
+    def setUp(self):
+        self.data = {
+            "@context": ["https://www.w3.org/2018/credentials/v1"],
+            "id": uuid.UUID('12345678-1234-5678-1234-567812345678'),
+            "awardedDate": timezone.make_aware(datetime.datetime(2024, 1, 2, 3, 4, 5), datetime.timezone.utc),
+            "validFrom": datetime.date(2024, 1, 2),
+            "name": "Badge numérique\u2028«éco»",
+            "tags": [],
+            "expirationDate": None,
+            "count": 3,
+        }
+
+    def test_matches_drf_json_renderer(self):
+        self.assertEqual(OpenBadgeJSONRenderer().render(self.data), JSONRenderer().render(self.data))
+
+    def test_datetime_and_uuid_encoding(self):
+        # Comme DjangoJSONEncoder : dates tronquées à la milliseconde
+        self.data['awardedDate'] = self.data['awardedDate'].replace(microsecond=678901)
+        data = json.loads(OpenBadgeJSONRenderer().render(self.data))
+        self.assertEqual(data['id'], '12345678-1234-5678-1234-567812345678')
+        self.assertEqual(data['awardedDate'], '2024-01-02T03:04:05.678Z')
+        self.assertEqual(data['validFrom'], '2024-01-02')
+
+    def test_indent_falls_back_to_drf(self):
+        media_type = 'application/json; indent=2'
+        self.assertEqual(
+            OpenBadgeJSONRenderer().render(self.data, media_type),
+            JSONRenderer().render(self.data, media_type)
+        )
+
+    def test_streaming_helpers(self):
+        self.assertEqual(''.join(iter_json_array([])), '[]')
+        lines = NDJSONRenderer().render([self.data, self.data]).decode().rstrip('\n').split('\n')
+        self.assertEqual([json.loads(line)['id'] for line in lines], [str(self.data['id'])] * 2)
+
+    def test_integers_wider_than_64_bits(self):
+        self.data['count'] = 10 ** 23
+        self.assertEqual(OpenBadgeJSONRenderer().render(self.data), JSONRenderer().render(self.data))
+        self.assertEqual(json.loads(NDJSONRenderer().render(self.data))['count'], 10 ** 23)
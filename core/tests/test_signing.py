@@ -0,0 +1,193 @@
+import tempfile
+from unittest import mock
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from core.models import Assertion, CredentialCache
+from core import signing
+from core.signing import sign_assertions, sign_cohort, signing_payload
+from core.utils import crypto, merkle
+from core.utils.jcs import canonicalize
+from core.utils.signing import Signer, decode_signature
+
+from .test_api import CredentialFixtureMixin
+
+
+class CanonicalFormTests(TestCase):
+    """Tests de la forme canonique et du signataire"""
+
+    def test_canonicalize(self):
+        self.assertEqual(canonicalize({'b': [1, 'é'], 'a': {'d': None, 'c': True}}), '{"a":{"c":true,"d":null},"b":[1,"é"]}'.encode())
+
+    def test_pool_signatures_are_ordered(self):
+        private_key, public_key = crypto.generate_key_pair('rsa')
+        public = crypto.load_public_key(public_key, 'rsa')
+        messages = [f'message {index}'.encode() for index in range(5)]
+        with Signer(private_key, 'rsa', workers=2) as signer:
+            self.assertIsNotNone(signer.executor)
+            signatures = signer.sign(messages)
+        for message, signature in zip(messages, signatures):
+            self.assertTrue(crypto.verify_signature(public, decode_signature(signature), message))
+
+
+class MerkleTreeTests(TestCase):
+    """Tests des arbres de Merkle"""
+
+    def test_paths_lead_to_root(self):
+        for count in range(1, 10):
+            with self.subTest(count=count):
+                leaves = [merkle.leaf_hash(f'credential {index}'.encode()) for index in range(count)]
+                root, paths = merkle.build_tree(leaves)
+                for leaf, path in zip(leaves, paths):
+                    self.assertEqual(merkle.root_from_path(leaf, path), root)
+                self.assertLessEqual(max(len(path) for path in paths), (count - 1).bit_length())
+
+    def test_tampered_leaf_or_path(self):
+        leaves = [merkle.leaf_hash(f'credential {index}'.encode()) for index in range(5)]
+        root, paths = merkle.build_tree(leaves)
+        self.assertNotEqual(merkle.root_from_path(merkle.leaf_hash(b'autre'), paths[0]), root)
+        self.assertNotEqual(merkle.root_from_path(leaves[0], paths[1]), root)
+        with self.assertRaises(ValueError):
+            merkle.root_from_path(leaves[0], ['x' + paths[0][0][1:]])
+        with self.assertRaises(ValueError):
+            merkle.build_tree([])
+
+
+@override_settings(API_BASE_URL='http://testserver')
+class SignAssertionsTests(CredentialFixtureMixin, APITestCase):
+    """Tests de la signature en masse des assertions"""
+
+    def setUp(self):
+        super().setUp()
+        self.private_key, self.issuer.public_key = crypto.generate_key_pair('ed25519')
+        self.issuer.key_type = 'ed25519'
+        self.issuer.save()
+        self.create_assertions(3)
+
+    def verify_served_credential(self, assertion):
+        credential = self.client.get(reverse('core:badges-detail', args=[assertion.pk])).json()
+        proof = credential['proof']
+        self.assertEqual(proof['verificationMethod'], credential['issuer']['id'])
+        public = crypto.load_public_key(self.issuer.public_key, 'ed25519')
+        return crypto.verify_signature(public, decode_signature(proof['proofValue']), signing_payload(credential))
+
+    def test_served_credentials_carry_verifiable_proof(self):
+        # Un document mis en cache avant la signature ne doit pas être resservi
+        first = Assertion.objects.first()
+        self.client.get(reverse('core:badges-detail', args=[first.pk]))
+        self.assertEqual(sign_assertions(self.issuer, self.private_key, chunk_size=2), 3)
+        self.assertEqual(CredentialCache.objects.count(), 0)
+        for assertion in Assertion.objects.all():
+            self.assertTrue(self.verify_served_credential(assertion))
+
+    def test_signed_assertions_are_skipped(self):
+        sign_assertions(self.issuer, self.private_key)
+        self.assertEqual(sign_assertions(self.issuer, self.private_key), 0)
+        self.assertEqual(sign_assertions(self.issuer, self.private_key, resign=True), 3)
+
+    def test_constant_queries_per_chunk(self):
+        with self.assertNumQueries(2 + 2 * (4 + 2)):
+            sign_assertions(self.issuer, self.private_key, chunk_size=2)
+
+    def test_wrong_key_is_refused(self):
+        other_private_key, _ = crypto.generate_key_pair('ed25519')
+        with self.assertRaises(ValueError):
+            sign_assertions(self.issuer, other_private_key)
+        self.assertFalse(Assertion.objects.exclude(signature='').exists())
+
+    def test_default_base_url_is_refused(self):
+        """Sans API_BASE_URL configurée, les signatures ne correspondraient pas aux documents servis"""
+        with self.settings(API_BASE_URL='http://localhost:8000'):
+            with self.assertRaisesMessage(ValueError, 'API_BASE_URL'):
+                sign_assertions(self.issuer, self.private_key)
+            with self.assertRaisesMessage(ValueError, 'API_BASE_URL'):
+                sign_cohort(self.issuer, self.private_key)
+            self.assertFalse(Assertion.objects.exclude(signature='').exists())
+            # Une URL passée explicitement est acceptée
+            self.assertEqual(sign_assertions(self.issuer, self.private_key, base_url='http://localhost:8000'), 3)
+
+    def test_edits_to_signed_content_clear_signatures(self):
+        """Profile, Achievement et endorsements font partie du document signé"""
+        from core.models.endorsement import Endorsement, EndorsementType
+
+        first, second, third = Assertion.objects.order_by('pk')
+        edits = [
+            (lambda: first.badge_class.save(), [first]),
+            (lambda: Endorsement.objects.filter(assertion=second).delete(), [second]),
+            (lambda: self.endorser.save(update_fields=['display_name']), [first, second, third]),
+            (lambda: self.issuer.save(), [first, second, third]),
+        ]
+        for edit, cleared in edits:
+            sign_assertions(self.issuer, self.private_key)
+            edit()
+            self.assertEqual(
+                list(Assertion.objects.filter(signature='').order_by('pk')),
+                cleared
+            )
+            self.assertEqual(Assertion.objects.filter(signature='').exclude(merkle_proof=[]).count(), 0)
+            # Les assertions effacées sont reprises sans resign, et vérifiables
+            self.assertEqual(sign_assertions(self.issuer, self.private_key), len(cleared))
+            self.assertTrue(self.verify_served_credential(cleared[0]))
+
+        # Une connexion (last_login) ne touche pas aux signatures
+        self.endorser.save(update_fields=['last_login'])
+        self.assertFalse(Assertion.objects.filter(signature='').exists())
+
+    def test_command(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.key') as key_file:
+            key_file.write(self.private_key)
+            key_file.flush()
+            call_command('sign_assertions', self.issuer.pk, '--key-file', key_file.name, stdout=tempfile.TemporaryFile('w'))
+            with self.assertRaises(CommandError):
+                call_command('sign_assertions', 0, '--key-file', key_file.name)
+        self.assertFalse(Assertion.objects.filter(signature='').exists())
+
+
+@override_settings(API_BASE_URL='http://testserver')
+class SignCohortTests(CredentialFixtureMixin, APITestCase):
+    """Tests de la signature d'une cohorte par racine de Merkle"""
+
+    def setUp(self):
+        super().setUp()
+        self.private_key, self.issuer.public_key = crypto.generate_key_pair('ed25519')
+        self.issuer.key_type = 'ed25519'
+        self.issuer.save()
+        self.create_assertions(5)
+
+    def test_one_private_key_operation(self):
+        with mock.patch.object(signing, 'sign_message', wraps=crypto.sign_message) as sign:
+            self.assertEqual(sign_cohort(self.issuer, self.private_key, chunk_size=2), 5)
+        sign.assert_called_once()
+        self.assertEqual(Assertion.objects.values('signature').distinct().count(), 1)
+
+        public = crypto.load_public_key(self.issuer.public_key, 'ed25519')
+        for assertion in Assertion.objects.all():
+            credential = self.client.get(reverse('core:badges-detail', args=[assertion.pk])).json()
+            proof = credential['proof']
+            root = merkle.root_from_path(merkle.leaf_hash(signing_payload(credential)), proof['merkleProof'])
+            self.assertTrue(crypto.verify_signature(public, decode_signature(proof['proofValue']), merkle.root_message(root)))
+
+    def test_single_assertion_is_signed_directly(self):
+        sign_cohort(self.issuer, self.private_key, Assertion.objects.filter(pk=Assertion.objects.first().pk))
+        assertion = Assertion.objects.exclude(signature='').get()
+        self.assertEqual(assertion.merkle_proof, [])
+
+    def test_individual_signature_clears_path(self):
+        sign_cohort(self.issuer, self.private_key)
+        sign_assertions(self.issuer, self.private_key, resign=True)
+        self.assertFalse(any(Assertion.objects.values_list('merkle_proof', flat=True)))
+
+    def test_command(self):
+        badge_class = Assertion.objects.first().badge_class
+        with tempfile.NamedTemporaryFile('w', suffix='.key') as key_file:
+            key_file.write(self.private_key)
+            key_file.flush()
+            call_command(
+                'sign_assertions', self.issuer.pk, '--key-file', key_file.name, '--merkle',
+                '--badge-class', badge_class.pk, stdout=tempfile.TemporaryFile('w')
+            )
+        self.assertEqual(list(Assertion.objects.exclude(signature='').values_list('badge_class', flat=True)), [badge_class.pk])
@@ -0,0 +1,153 @@
+import gzip
+import json
+import tempfile
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import SimpleTestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from core import status_list
+from core.models import Assertion, StatusList
+
+from .test_api import CredentialFixtureMixin
+
+
+class BitstringTests(SimpleTestCase):
+    """Tests de l'encodage de la liste de bits"""
+
+    def test_bit_order(self):
+        bitstring = bytearray(2)
+        status_list.set_bit(bitstring, 0, True)
+        status_list.set_bit(bitstring, 9, True)
+        self.assertEqual(bytes(bitstring), b'\x80\x40')
+        self.assertTrue(status_list.get_bit(bitstring, 9))
+        status_list.set_bit(bitstring, 9, False)
+        self.assertFalse(status_list.get_bit(bitstring, 9))
+        self.assertFalse(status_list.get_bit(bitstring, 100))
+
+    def test_encode_list(self):
+        bitstring = bytearray(status_list.MIN_SIZE // 8)
+        status_list.set_bit(bitstring, 42, True)
+        encoded = status_list.encode_list(bitstring)
+        self.assertTrue(encoded.startswith('u'))
+        self.assertNotIn('=', encoded)
+        # Une liste de 16 Kio presque vide tient en quelques dizaines d'octets
+        self.assertLess(len(encoded), 100)
+        self.assertEqual(status_list.decode_list(encoded), bytes(bitstring))
+
+
+class StatusListTests(CredentialFixtureMixin, APITestCase):
+    """Tests des listes de statut de révocation"""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.create_assertions(3)
+        self.url = reverse('core:status-lists-detail', args=[self.issuer.pk])
+
+    def get_bits(self, response):
+        credential = json.loads(gzip.decompress(response.content)) if response.get('Content-Encoding') == 'gzip' else response.json()
+        return status_list.decode_list(credential['credentialSubject']['encodedList'])
+
+    def test_indexes_are_allocated_at_creation(self):
+        indexes = sorted(Assertion.objects.values_list('status_list_index', flat=True))
+        self.assertEqual(indexes, [0, 1, 2])
+        self.assertEqual(StatusList.objects.get(issuer=self.issuer).next_index, 3)
+
+    def test_credential_status_entry(self):
+        assertion = Assertion.objects.get(status_list_index=1)
+        credential = self.client.get(reverse('core:badges-detail', args=[assertion.pk])).json()
+        self.assertEqual(credential['credentialStatus'], {
+            'id': f'http://testserver{self.url}#1',
+            'type': 'BitstringStatusListEntry',
+            'statusPurpose': 'revocation',
+            'statusListIndex': '1',
+            'statusListCredential': f'http://testserver{self.url}',
+        })
+        self.assertEqual(status_list.get_entry(credential), (self.issuer.pk, 1))
+
+    def test_malformed_credential_status_entry(self):
+        entry = {
+            'statusPurpose': 'revocation',
+            'statusListIndex': '1',
+            'statusListCredential': f'http://testserver{self.url}',
+        }
+        malformed = [
+            {'statusListCredential': 'http://testserver/api/v3/status-lists/abc/'},
+            {'statusListCredential': 'http://testserver/api/v3/status-lists/99999999999999999999999/'},
+            {'statusListIndex': 1e400},
+            {'statusListIndex': '-1'},
+            {'statusListIndex': None},
+        ]
+        for change in malformed:
+            with self.subTest(change=change):
+                self.assertIsNone(status_list.get_entry({'credentialStatus': {**entry, **change}}))
+
+    def test_revocation_updates_one_bit(self):
+        assertion = Assertion.objects.get(status_list_index=1)
+        assertion.revoked = True
+        assertion.save()
+        revision = StatusList.objects.get(issuer=self.issuer).revision
+        bits = status_list.decode_list(StatusList.objects.get(issuer=self.issuer).encoded_list)
+        self.assertEqual([status_list.get_bit(bits, index) for index in range(3)], [False, True, False])
+
+        # Une sauvegarde sans changement de statut ne réécrit pas la liste
+        assertion.save()
+        self.assertEqual(StatusList.objects.get(issuer=self.issuer).revision, revision)
+
+        assertion.revoked = False
+        assertion.save()
+        self.assertEqual(StatusList.objects.get(issuer=self.issuer).bitstring, bytes(status_list.MIN_SIZE // 8))
+
+    def test_served_compressed_with_etag(self):
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        credential = json.loads(gzip.decompress(response.content))
+        self.assertEqual(credential['type'], ['VerifiableCredential', 'BitstringStatusListCredential'])
+        self.assertEqual(credential['id'], f'http://testserver{self.url}')
+
+        plain = self.client.get(self.url)
+        self.assertNotIn('Content-Encoding', plain)
+        self.assertEqual(plain.json(), credential)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_revocation_changes_served_list(self):
+        etag = self.client.get(self.url)['ETag']
+        assertion = Assertion.objects.get(status_list_index=2)
+        assertion.revoked = True
+        assertion.save(update_fields=['revoked'])
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(status_list.get_bit(self.get_bits(response), 2))
+
+    def test_unknown_issuer(self):
+        response = self.client.get(reverse('core:status-lists-detail', args=[self.issuer.pk + 1]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        for pk in ('abc', '²', '99999999999999999999999'):
+            with self.subTest(pk=pk):
+                response = self.client.get(f'/api/v3/status-lists/{pk}/')
+                self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_full_list_grows(self):
+        StatusList.objects.filter(issuer=self.issuer).update(next_index=status_list.MIN_SIZE)
+        self.create_assertions(1)
+        status_list_row = StatusList.objects.get(issuer=self.issuer)
+        self.assertEqual(status_list_row.size, 2 * status_list.MIN_SIZE)
+        self.assertEqual(len(status_list_row.bitstring), 2 * status_list.MIN_SIZE // 8)
+        self.assertTrue(Assertion.objects.filter(status_list_index=status_list.MIN_SIZE).exists())
+
+    def test_command_allocates_existing_assertions(self):
+        Assertion.objects.update(status_list_index=None, revoked=True)
+        StatusList.objects.all().delete()
+        call_command('allocate_status_indexes', '--chunk-size', '2', stdout=tempfile.TemporaryFile('w'))
+        self.assertFalse(Assertion.objects.filter(status_list_index__isnull=True).exists())
+        bits = StatusList.objects.get(issuer=self.issuer).bitstring
+        self.assertEqual([status_list.get_bit(bits, index) for index in range(4)], [True, True, True, False])
@@ -0,0 +1,295 @@
+import copy
+import io
+import json
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache, caches
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from core import verification, verification_cache
+from core.models import Assertion
+from core.signing import sign_assertions, sign_cohort
+from core.utils import crypto
+from core.utils.signing import Verifier, encode_signature
+from core.verification import verify_credentials
+
+from .test_api import CredentialFixtureMixin
+
+
+class VerifierTests(SimpleTestCase):
+    """Tests de la vérification groupée par clé"""
+
+    def test_pool_results_are_ordered(self):
+        for key_type in ('ed25519', 'secp256k1'):
+            with self.subTest(key_type=key_type):
+                private_key, public_key = crypto.generate_key_pair(key_type)
+                private = crypto.load_private_key(private_key, key_type)
+                items = [
+                    (encode_signature(crypto.sign_message(private, f'{index}'.encode())), f'{index}'.encode())
+                    for index in range(200)
+                ]
+                # Une signature sur deux est associée au mauvais message
+                items = [(signature, b'autre' if index % 2 else message) for index, (signature, message) in enumerate(items)]
+                verifier = Verifier(workers=2)
+                try:
+                    [results] = verifier.verify([(public_key, key_type, items)])
+                finally:
+                    verifier.close()
+                self.assertEqual(results, [index % 2 == 0 for index in range(200)])
+
+
+class SignedCredentialsMixin(CredentialFixtureMixin):
+    """Trois credentials signés, tels que servis par l'API"""
+
+    key_type = 'ed25519'
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        verification_cache.get_cache().clear()
+        private_key, self.issuer.public_key = crypto.generate_key_pair(self.key_type)
+        self.issuer.key_type = self.key_type
+        self.issuer.save()
+        self.create_assertions(3)
+        sign_assertions(self.issuer, private_key)
+        self.credentials = self.client.get(reverse('core:badges-list'), {'issuer': 'embed'}).json()['results']
+
+
+@override_settings(API_BASE_URL='http://testserver', VERIFY_WORKERS=1)
+class VerifyCredentialsTests(SignedCredentialsMixin, APITestCase):
+    """Tests de la vérification en masse des credentials signés"""
+
+    @override_settings(VERIFY_CACHE_ALIAS='default')
+    def test_valid_credentials(self):
+        # Cache des verdicts désactivé : seules les requêtes de la vérification sont comptées
+        with self.assertNumQueries(3):
+            verdicts = verify_credentials(self.credentials)
+        self.assertEqual([verdict['verified'] for verdict in verdicts], [True] * 3)
+        self.assertEqual(verdicts[0]['id'], self.credentials[0]['id'])
+        self.assertEqual(verdicts[0]['reasons'], [])
+
+    def test_tampered_credential(self):
+        tampered = copy.deepcopy(self.credentials[0])
+        tampered['name'] = 'Autre badge'
+        [verdict] = verify_credentials([tampered])
+        self.assertFalse(verdict['verified'])
+        self.assertEqual(verdict['checks'], {'signature': False, 'expiry': True, 'revocation': True})
+        self.assertEqual(verdict['reasons'], ['Signature invalide'])
+
+    def test_revoked_and_expired(self):
+        assertion = Assertion.objects.get(identifier=self.credentials[0]['id'])
+        assertion.revoked = True
+        assertion.revocation_reason = 'Fraude'
+        assertion.expires_at = timezone.now() - timedelta(days=1)
+        assertion.save()
+        [verdict] = verify_credentials(self.credentials[:1])
+        self.assertEqual(verdict['checks'], {'signature': True, 'expiry': False, 'revocation': False})
+        self.assertIn('Credential révoqué : Fraude', verdict['reasons'])
+
+    def test_unsigned_and_foreign_credentials(self):
+        unsigned = {key: value for key, value in self.credentials[0].items() if key != 'proof'}
+        impostor = copy.deepcopy(self.credentials[1])
+        impostor['issuer'] = {'id': 'https://example.org/issuers/1', 'type': ['Profile']}
+        verdicts = verify_credentials([unsigned, impostor, 'pas un credential'])
+        self.assertEqual(verdicts[0]['reasons'], ['Credential non signé'])
+        self.assertEqual(verdicts[1]['reasons'], ["La signature n'est pas celle de l'émetteur du credential"])
+        self.assertFalse(verdicts[2]['verified'])
+
+    def test_malformed_credentials(self):
+        """Des champs mal formés donnent un verdict négatif, jamais une erreur serveur"""
+        def altered(**changes):
+            credential = copy.deepcopy(self.credentials[0])
+            for key, value in changes.items():
+                if key == 'proof':
+                    credential['proof'].update(value)
+                else:
+                    credential[key] = value
+            return credential
+
+        # 1e400 est lu comme l'infini par le parseur JSON : le corps est écrit à la main
+        status_entry = {**self.credentials[0]['credentialStatus'], 'statusListIndex': 'INFINI'}
+        cases = [
+            (altered(id=['a', 'b']), 'revocation', "Credential inconnu de cette plateforme"),
+            (altered(id={'a': 1}), 'revocation', "Credential inconnu de cette plateforme"),
+            (altered(id='urn:inconnu', expirationDate='2020-13-45T00:00:00'), 'expiry', "Date d'expiration invalide"),
+            (altered(id='urn:inconnu', expirationDate='demain'), 'expiry', "Date d'expiration invalide"),
+            (altered(proof={'verificationMethod': 'http://testserver/api/v3/issuers/abc/'}),
+             'signature', "Émetteur de la signature inconnu"),
+            (altered(credentialStatus=status_entry), 'signature', "Credential non représentable en JSON canonique"),
+            (altered(credentialStatus={**status_entry, 'statusListIndex': '1',
+                                       'statusListCredential': 'http://testserver/api/v3/status-lists/abc/'}),
+             'signature', "Signature invalide"),
+        ]
+        body = json.dumps({'credentials': [credential for credential, _, _ in cases]})
+        response = self.client.post(
+            reverse('core:verify-list'), body.replace('"INFINI"', '1e400'), content_type='application/json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        for (credential, check, reason), verdict in zip(cases, response.json()['results']):
+            with self.subTest(reason=reason, credential=credential.get('id')):
+                self.assertFalse(verdict['verified'])
+                self.assertFalse(verdict['checks'][check])
+                self.assertIn(reason, verdict['reasons'])
+
+    def test_naive_expiration_date(self):
+        """Une date d'expiration sans fuseau est lue en UTC"""
+        unknown = {key: value for key, value in self.credentials[0].items() if key != 'proof'}
+        unknown['id'] = 'urn:inconnu'
+        expired = verify_credentials([{**unknown, 'expirationDate': '2020-01-01T00:00:00'}])[0]
+        self.assertEqual(expired['reasons'][0], 'Credential expiré le 2020-01-01T00:00:00+00:00')
+        valid = verify_credentials([{**unknown, 'expirationDate': '2999-01-01T00:00:00'}])[0]
+        self.assertTrue(valid['checks']['expiry'])
+
+    def test_endpoint(self):
+        url = reverse('core:verify-list')
+        response = self.client.post(url, {'credentials': self.credentials}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(all(verdict['verified'] for verdict in response.json()['results']))
+
+        self.assertEqual(self.client.post(url, {}, format='json').status_code, status.HTTP_400_BAD_REQUEST)
+        with self.settings(API_VERIFY_MAX_SIZE=2):
+            response = self.client.post(url, {'credentials': self.credentials}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        # Identifiant entier de plus de 64 bits, renvoyé tel quel dans le verdict
+        response = self.client.post(url, {'credentials': [{'id': 10 ** 23}]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['results'][0]['id'], 10 ** 23)
+
+
+@override_settings(API_BASE_URL='http://testserver', VERIFY_WORKERS=1)
+class Secp256k1CredentialsTests(SignedCredentialsMixin, APITestCase):
+    """Credentials signés en ECDSA secp256k1"""
+
+    key_type = 'secp256k1'
+
+    def test_signed_credentials_are_verified(self):
+        self.assertEqual(len(self.credentials[0]['proof']['proofValue']), 86)
+        tampered = copy.deepcopy(self.credentials[0])
+        tampered['name'] = 'Autre nom'
+        verdicts = verify_credentials(self.credentials + [tampered])
+        self.assertEqual([verdict['verified'] for verdict in verdicts], [True] * 3 + [False])
+
+
+@override_settings(API_BASE_URL='http://testserver', VERIFY_WORKERS=1)
+class VerificationCacheTests(SignedCredentialsMixin, APITestCase):
+    """Tests du cache des verdicts de vérification"""
+
+    def test_repeated_verification_is_served_from_cache(self):
+        first = verify_credentials(self.credentials)
+        with CaptureQueriesContext(connection) as queries, \
+                mock.patch.object(verification, 'get_verifier') as get_verifier:
+            self.assertEqual(verify_credentials(self.credentials), first)
+        get_verifier.return_value.verify.assert_called_once_with([])
+        # Hors accès au cache partagé (et leurs points de sauvegarde), seuls les émetteurs sont chargés
+        self.assertEqual(
+            [query['sql'] for query in queries if 'SAVEPOINT' not in query['sql'] and 'core_shared_cache' not in query['sql']],
+            [queries[0]['sql']]
+        )
+        self.assertEqual(verification_cache.get_stats(), {'hits': 3, 'misses': 3})
+
+    def test_invalidation_is_shared_between_processes(self):
+        verify_credentials(self.credentials)
+        # Révocation traitée par un autre processus : sa propre instance du cache partagé
+        other = caches.create_connection(verification_cache.settings.VERIFY_CACHE_ALIAS)
+        with mock.patch.object(verification_cache, 'get_cache', return_value=other):
+            assertion = Assertion.objects.get(identifier=self.credentials[0]['id'])
+            assertion.revoked = True
+            assertion.save()
+        [verdict] = verify_credentials(self.credentials[:1])
+        self.assertFalse(verdict['checks']['revocation'])
+
+    @override_settings(VERIFY_CACHE_ALIAS='default')
+    def test_process_local_cache_is_not_used(self):
+        self.assertIsNone(verification_cache.get_cache())
+        verifier = verification.get_verifier()
+        with mock.patch.object(verifier, 'verify', wraps=verifier.verify) as verify:
+            verify_credentials(self.credentials)
+            verify_credentials(self.credentials)
+        self.assertEqual([len(call.args[0][0][2]) for call in verify.call_args_list], [3, 3])
+        out = io.StringIO()
+        call_command('verification_cache', stdout=out)
+        self.assertIn('LocMemCache', out.getvalue())
+
+    def test_revocation_invalidates_verdicts(self):
+        verify_credentials(self.credentials)
+        assertion = Assertion.objects.get(identifier=self.credentials[0]['id'])
+        assertion.revoked = True
+        assertion.save()
+        [verdict] = verify_credentials(self.credentials[:1])
+        self.assertFalse(verdict['checks']['revocation'])
+
+    def test_key_rotation_invalidates_verdicts(self):
+        verify_credentials(self.credentials)
+        self.issuer.public_key = crypto.generate_key_pair('ed25519')[1]
+        # Mise à jour sans signal : seule l'empreinte de la clé change
+        type(self.issuer).objects.filter(pk=self.issuer.pk).update(public_key=self.issuer.public_key)
+        [verdict] = verify_credentials(self.credentials[:1])
+        self.assertEqual(verdict['reasons'], ['Signature invalide'])
+
+    def test_verdict_does_not_outlive_expiration(self):
+        assertion = Assertion.objects.get(identifier=self.credentials[0]['id'])
+        Assertion.objects.filter(pk=assertion.pk).update(expires_at=timezone.now() + timedelta(seconds=30))
+        wrapped = mock.Mock(wraps=verification_cache.get_cache())
+        with mock.patch.object(verification_cache, 'get_cache', return_value=wrapped):
+            verify_credentials(self.credentials[:1])
+        [timeout] = [
+            call.args[2] for call in wrapped.set.call_args_list
+            if call.args[0].startswith(f'verification:{self.issuer.pk}:')
+        ]
+        self.assertLessEqual(timeout, 30)
+
+    def test_stats_command(self):
+        verify_credentials(self.credentials)
+        verify_credentials(self.credentials[:1])
+        out = io.StringIO()
+        call_command('verification_cache', '--reset', stdout=out)
+        self.assertIn('Taux de succès : 25.0%', out.getvalue())
+        self.assertEqual(verification_cache.get_stats(), {'hits': 0, 'misses': 0})
+
+
+@override_settings(API_BASE_URL='http://testserver', VERIFY_WORKERS=1)
+class CohortVerificationTests(CredentialFixtureMixin, APITestCase):
+    """Tests de la vérification des credentials signés par racine de Merkle"""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        verification_cache.get_cache().clear()
+        private_key, self.issuer.public_key = crypto.generate_key_pair('ed25519')
+        self.issuer.key_type = 'ed25519'
+        self.issuer.save()
+        self.create_assertions(4)
+        sign_cohort(self.issuer, private_key)
+        self.credentials = self.client.get(reverse('core:badges-list'), {'issuer': 'embed'}).json()['results']
+
+    def test_root_signature_is_checked_once(self):
+        verifier = verification.get_verifier()
+        with mock.patch.object(verifier, 'verify', wraps=verifier.verify) as verify:
+            verdicts = verify_credentials(self.credentials)
+            self.assertEqual([verdict['verified'] for verdict in verdicts], [True] * 4)
+            self.assertEqual([len(items) for _, _, items in verify.call_args.args[0]], [1])
+
+            # Verdicts invalidés : la racine, déjà vérifiée, est lue dans le cache
+            Assertion.objects.first().save()
+            verdicts = verify_credentials(self.credentials)
+            self.assertEqual([verdict['verified'] for verdict in verdicts], [True] * 4)
+            self.assertEqual([len(items) for _, _, items in verify.call_args.args[0]], [0])
+
+    def test_tampered_member(self):
+        tampered = copy.deepcopy(self.credentials[1])
+        tampered['name'] = 'Autre badge'
+        broken = copy.deepcopy(self.credentials[2])
+        broken['proof']['merkleProof'] = ['pas une étape']
+        verdicts = verify_credentials([tampered, broken, self.credentials[0]])
+        self.assertEqual(verdicts[0]['reasons'], ['Signature invalide'])
+        self.assertEqual(verdicts[1]['reasons'], ['Chemin Merkle invalide'])
+        self.assertTrue(verdicts[2]['verified'])
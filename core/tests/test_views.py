@@ -4,6 +4,8 @@ from django.contrib.auth import get_user_model
 from core.models.badge import BadgeClass, Issuer
 from django.core.files.uploadedfile import SimpleUploadedFile
 
+from .test_api import TemporaryMediaMixin
+
 User = get_user_model()
 
 class BadgeViewsTests(TestCase):
@@ -149,11 +151,12 @@ class BadgeViewsTests(TestCase):
         # Vérifier que le bouton "Nouveau badge" est présent
         self.assertContains(response, 'Nouveau badge')
 
-class BadgeFormTests(TestCase):
+class BadgeFormTests(TemporaryMediaMixin, TestCase):
     """Tests pour les formulaires de badges"""
     
     def setUp(self):
         """Configuration initiale pour les tests"""
+        super().setUp()
         self.client = Client()
         
         # Créer un utilisateur pour les tests
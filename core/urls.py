@@ -1,13 +1,17 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import HomeViewSet, AuthViewSet, IssuerViewSet, PublicIssuerListView, BadgeClassViewSet, EndorsementViewSet
-from .api import OpenBadgeViewSet
+from .api import IssuerProfileViewSet, OpenBadgeViewSet, StatusListViewSet, VerifyViewSet
+from . import async_api
 
 app_name = 'core'
 
 # API routes
 router = DefaultRouter()
 router.register(r'badges', OpenBadgeViewSet, basename='badges')
+router.register(r'issuers', IssuerProfileViewSet, basename='issuers')
+router.register(r'status-lists', StatusListViewSet, basename='status-lists')
+router.register(r'verify', VerifyViewSet, basename='verify')
 
 # Home views
 home_list = HomeViewSet.as_view({'get': 'list'})
@@ -41,6 +45,12 @@ urlpatterns = [
     # API URLs
     path('api/v3/', include(router.urls)),
     path('api/v3/badge-with-endorsements/', OpenBadgeViewSet.as_view({'get': 'badge_with_endorsements'}), name='badge-with-endorsements'),
+
+    # Variantes asynchrones de l'API (ASGI)
+    path('api/v3/async/badges/', async_api.credential_list, name='async-badges-list'),
+    path('api/v3/async/badges/<int:pk>/', async_api.credential_detail, name='async-badges-detail'),
+    path('api/v3/async/badges/<int:pk>/achievement/', async_api.credential_achievement, name='async-badges-achievement'),
+    path('api/v3/async/badge-with-endorsements/', async_api.badge_with_endorsements, name='async-badge-with-endorsements'),
     
     # Home URLs
     path('', home_list, name='home'),
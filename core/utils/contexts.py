@@ -0,0 +1,108 @@
+"""Contextes JSON-LD embarqués et chargeur de documents hors ligne.
+
+Les contextes utilisés par les documents que nous émettons et vérifions
+(Open Badges 3.0 et 2.0, Verifiable Credentials v1 et v2) sont livrés dans
+``core/contexts/``. ``document_loader`` les sert depuis la mémoire avec la
+signature attendue par pyld, sans jamais accéder au réseau : le débit de
+vérification ne dépend pas de la latence d'un hôte externe et tout fonctionne
+sans connexion.
+
+``install()`` branche ce chargeur comme chargeur par défaut de pyld (s'il est
+installé) ; il est appelé au démarrage de l'application.
+"""
+
+import json
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+
+CONTEXTS_DIR = Path(__file__).resolve().parent.parent / 'contexts'
+
+# URL du contexte -> fichier embarqué. Seuls des documents publiés, vérifiés,
+# y figurent : une copie approximative changerait l'expansion et les
+# signatures sans bruit. context-3.0.3.json (core.jsonld.JSON_LD_CONTEXT)
+# reste à embarquer : le déclarer ici puis lancer update_jsonld_contexts.
+CONTEXTS = {
+    'https://purl.imsglobal.org/spec/ob/v3p0/context.json': 'ob-v3p0.jsonld',
+    'https://www.w3.org/2018/credentials/v1': 'credentials-v1.jsonld',
+    'https://www.w3.org/ns/credentials/v2': 'credentials-v2.jsonld',
+    'https://w3id.org/openbadges/v2': 'openbadges-v2.jsonld',
+}
+
+# Variantes d'écriture rencontrées dans les badges importés
+ALIASES = {
+    'http://www.w3.org/2018/credentials/v1': 'https://www.w3.org/2018/credentials/v1',
+    'http://w3id.org/openbadges/v2': 'https://w3id.org/openbadges/v2',
+    'https://openbadgespec.org/v2/context.json': 'https://w3id.org/openbadges/v2',
+}
+
+
+class ContextNotFound(LookupError):
+    """Contexte JSON-LD absent du magasin local"""
+
+
+def normalize_url(url):
+    """Retourne l'URL canonique d'un contexte (sans fragment, alias résolus)"""
+    url = url.split('#', 1)[0]
+    return ALIASES.get(url, url)
+
+
+@lru_cache(maxsize=None)
+def read_context(filename):
+    """Lit et parse un fichier de contexte embarqué"""
+    with open(CONTEXTS_DIR / filename, encoding='utf-8') as context_file:
+        return json.load(context_file)
+
+
+@lru_cache(maxsize=64)
+def load_context(url):
+    """
+    Retourne le document JSON-LD parsé d'un contexte embarqué.
+
+    Le document est partagé entre les appels : il ne doit pas être modifié.
+    Lève ``ContextNotFound`` pour une URL inconnue.
+    """
+    filename = CONTEXTS.get(normalize_url(url))
+    if filename is None:
+        raise ContextNotFound(url)
+    return read_context(filename)
+
+
+def document_loader(url, options=None):
+    """
+    Chargeur de documents compatible pyld (``jsonld.set_document_loader``).
+
+    Les contextes embarqués sont servis depuis la mémoire. Les autres URL
+    sont refusées, sauf si ``JSONLD_REMOTE_CONTEXTS`` est activé : elles sont
+    alors confiées au chargeur réseau de pyld.
+    """
+    try:
+        document = load_context(url)
+    except ContextNotFound:
+        if not getattr(settings, 'JSONLD_REMOTE_CONTEXTS', False):
+            raise
+        return remote_document_loader()(url, options or {})
+    return {
+        'contentType': 'application/ld+json',
+        'contextUrl': None,
+        'documentUrl': url,
+        'document': document,
+    }
+
+
+@lru_cache(maxsize=None)
+def remote_document_loader():
+    """Chargeur réseau de pyld, utilisé uniquement si les contextes distants sont autorisés"""
+    from pyld import jsonld
+    return jsonld.requests_document_loader()
+
+
+def install():
+    """Installe ``document_loader`` comme chargeur par défaut de pyld, s'il est installé"""
+    try:
+        from pyld import jsonld
+    except ImportError:
+        return False
+    jsonld.set_document_loader(document_loader)
+    return True
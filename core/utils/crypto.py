@@ -1,25 +1,61 @@
-"""Utilitaires pour la gestion des clés cryptographiques."""
+"""Utilitaires pour la gestion des clés cryptographiques.
+
+Formats des clés sérialisées :
+
+* RSA : PEM (PKCS#8 pour la clé privée, SubjectPublicKeyInfo pour la
+  clé publique) ; signatures RSA-PSS/SHA-256 ;
+* Ed25519 : 32 octets bruts en base64 ;
+* secp256k1 : hexadécimal préfixé par ``0x``, comme dans les portefeuilles
+  blockchain (scalaire de 32 octets pour la clé privée, point SEC1
+  compressé de 33 octets pour la clé publique) ; signatures ECDSA/SHA-256
+  de 64 octets ``r || s``, avec ``s`` normalisé dans la moitié basse.
+
+Les opérations secp256k1 passent par ``coincurve`` (libsecp256k1) s'il est
+installé, une dizaine de fois plus rapide que l'implémentation générique
+d'OpenSSL ; sinon par ``cryptography``. Les deux produisent et acceptent
+les mêmes clés et signatures.
+"""
 
 from cryptography.hazmat.primitives import serialization
-from cryptography.hazmat.primitives.asymmetric import rsa, ed25519
+from cryptography.hazmat.primitives.asymmetric import rsa, ed25519, ec, padding
+from cryptography.hazmat.primitives.asymmetric.utils import decode_dss_signature, encode_dss_signature
 from cryptography.hazmat.primitives import hashes
-from cryptography.exceptions import InvalidKey
+from cryptography.exceptions import InvalidKey, InvalidSignature
 import base64
 
+try:
+    import coincurve
+except ImportError:  # pragma: no cover - dépend de l'environnement
+    coincurve = None
+
+# Remplissage RSA-PSS utilisé pour toutes les signatures RSA
+RSA_PADDING = padding.PSS(
+    mgf=padding.MGF1(hashes.SHA256()),
+    salt_length=padding.PSS.MAX_LENGTH
+)
+
+SECP256K1 = ec.SECP256K1()
+
+# Ordre du groupe de secp256k1
+SECP256K1_ORDER = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141
+
+ECDSA = ec.ECDSA(hashes.SHA256())
 
-def generate_key_pair(key_type: str) -> tuple[str, str]:
+
+def generate_key_pair(key_type: str, key_size: int = 2048) -> tuple[str, str]:
     """Génère une paire de clés selon le type spécifié.
     
     Args:
         key_type: Type de clé ('rsa', 'ed25519', 'secp256k1')
+        key_size: Taille des clés RSA, en bits (ignorée pour les autres types)
     
     Returns:
-        Tuple[str, str]: (clé privée, clé publique) au format PEM
+        Tuple[str, str]: (clé privée, clé publique), sérialisées selon le type
     """
     if key_type == 'rsa':
         private_key = rsa.generate_private_key(
             public_exponent=65537,
-            key_size=2048
+            key_size=key_size
         )
         private_pem = private_key.private_bytes(
             encoding=serialization.Encoding.PEM,
@@ -50,82 +86,126 @@ def generate_key_pair(key_type: str) -> tuple[str, str]:
         )
 
     elif key_type == 'secp256k1':
-        # Note: Pour secp256k1, nous utiliserions normalement 'coincurve' ou 'ethereum'
-        # Ici nous utilisons RSA comme placeholder pour l'exemple
-        private_key = rsa.generate_private_key(
-            public_exponent=65537,
-            key_size=2048
-        )
-        private_pem = private_key.private_bytes(
-            encoding=serialization.Encoding.PEM,
-            format=serialization.PrivateFormat.PKCS8,
-            encryption_algorithm=serialization.NoEncryption()
+        private_key = ec.generate_private_key(SECP256K1)
+        public_bytes = private_key.public_key().public_bytes(
+            encoding=serialization.Encoding.X962,
+            format=serialization.PublicFormat.CompressedPoint
         )
-        public_pem = private_key.public_key().public_bytes(
-            encoding=serialization.Encoding.PEM,
-            format=serialization.PublicFormat.SubjectPublicKeyInfo
-        )
-        return f"0x{private_pem.hex()[:64]}", f"0x{public_pem.hex()[:64]}"
+        return f"0x{private_key.private_numbers().private_value:064x}", f"0x{public_bytes.hex()}"
 
     raise ValueError(f"Type de clé non supporté : {key_type}")
 
 
+def parse_hex(value: str) -> bytes:
+    """Décode une valeur hexadécimale préfixée par ``0x``"""
+    if not value.startswith('0x'):
+        raise ValueError("Valeur hexadécimale sans préfixe 0x")
+    return bytes.fromhex(value[2:])
+
+
+def load_private_key(private_key: str, key_type: str):
+    """Charge une clé privée sérialisée (voir les formats en tête de module).
+
+    Le chargement d'une clé RSA est coûteux : passer par
+    ``core.utils.keys.registry`` pour ne le faire qu'une fois par clé.
+
+    Raises:
+        ValueError: si la clé est invalide ou le type non supporté
+    """
+    if key_type == 'rsa':
+        return serialization.load_pem_private_key(private_key.encode(), password=None)
+    elif key_type == 'ed25519':
+        return ed25519.Ed25519PrivateKey.from_private_bytes(base64.b64decode(private_key))
+    elif key_type == 'secp256k1':
+        secret = parse_hex(private_key)
+        if coincurve is not None:
+            return coincurve.PrivateKey(secret)
+        return ec.derive_private_key(int.from_bytes(secret, 'big'), SECP256K1)
+    raise ValueError(f"Type de clé non supporté : {key_type}")
+
+
+def load_public_key(public_key: str, key_type: str):
+    """Charge une clé publique sérialisée (voir les formats en tête de module).
+
+    Raises:
+        ValueError: si la clé est invalide ou le type non supporté
+    """
+    if key_type == 'rsa':
+        return serialization.load_pem_public_key(public_key.encode())
+    elif key_type == 'ed25519':
+        return ed25519.Ed25519PublicKey.from_public_bytes(base64.b64decode(public_key))
+    elif key_type == 'secp256k1':
+        if coincurve is not None:
+            return coincurve.PublicKey(parse_hex(public_key))
+        return ec.EllipticCurvePublicKey.from_encoded_point(SECP256K1, parse_hex(public_key))
+    raise ValueError(f"Type de clé non supporté : {key_type}")
+
+
+def is_secp256k1(key) -> bool:
+    """Indique si une clé chargée est une clé secp256k1 (``cryptography`` ou ``coincurve``)"""
+    if isinstance(key, (ec.EllipticCurvePrivateKey, ec.EllipticCurvePublicKey)):
+        return True
+    return coincurve is not None and isinstance(key, (coincurve.PrivateKey, coincurve.PublicKey))
+
+
+def compact_signature(der: bytes) -> bytes:
+    """Signature ECDSA DER -> 64 octets ``r || s``, ``s`` dans la moitié basse"""
+    r, s = decode_dss_signature(der)
+    s = min(s, SECP256K1_ORDER - s)
+    return r.to_bytes(32, 'big') + s.to_bytes(32, 'big')
+
+
+def der_signature(signature: bytes) -> bytes:
+    """Signature ECDSA ``r || s`` -> DER, ``s`` ramené dans la moitié basse (exigé par libsecp256k1)"""
+    r, s = int.from_bytes(signature[:32], 'big'), int.from_bytes(signature[32:], 'big')
+    return encode_dss_signature(r, min(s, SECP256K1_ORDER - s))
+
+
+def sign_message(private_key, message: bytes) -> bytes:
+    """Signe un message avec une clé privée déjà chargée (RSA-PSS/SHA-256, Ed25519 ou ECDSA secp256k1)"""
+    if isinstance(private_key, rsa.RSAPrivateKey):
+        return private_key.sign(message, RSA_PADDING, hashes.SHA256())
+    if isinstance(private_key, ec.EllipticCurvePrivateKey):
+        return compact_signature(private_key.sign(message, ECDSA))
+    if coincurve is not None and isinstance(private_key, coincurve.PrivateKey):
+        return compact_signature(private_key.sign(message))
+    return private_key.sign(message)
+
+
+def verify_signature(public_key, signature: bytes, message: bytes) -> bool:
+    """Vérifie la signature d'un message avec une clé publique déjà chargée"""
+    try:
+        if isinstance(public_key, rsa.RSAPublicKey):
+            public_key.verify(signature, message, RSA_PADDING, hashes.SHA256())
+        elif is_secp256k1(public_key):
+            if len(signature) != 64:
+                return False
+            if isinstance(public_key, ec.EllipticCurvePublicKey):
+                public_key.verify(der_signature(signature), message, ECDSA)
+            else:
+                return public_key.verify(der_signature(signature), message)
+        else:
+            public_key.verify(signature, message)
+    except InvalidSignature:
+        return False
+    return True
+
+
 def verify_key_pair(private_key: str, public_key: str, key_type: str) -> bool:
     """Vérifie qu'une paire de clés est valide.
     
     Args:
-        private_key: Clé privée au format PEM
-        public_key: Clé publique au format PEM
+        private_key: Clé privée sérialisée
+        public_key: Clé publique sérialisée
         key_type: Type de clé ('rsa', 'ed25519', 'secp256k1')
     
     Returns:
         bool: True si la paire est valide
     """
     try:
-        if key_type == 'rsa':
-            private = serialization.load_pem_private_key(
-                private_key.encode(),
-                password=None
-            )
-            public = serialization.load_pem_public_key(
-                public_key.encode()
-            )
-            # Test simple : on signe et vérifie
-            message = b"test"
-            signature = private.sign(
-                message,
-                padding=padding.PSS(
-                    mgf=padding.MGF1(hashes.SHA256()),
-                    salt_length=padding.PSS.MAX_LENGTH
-                ),
-                algorithm=hashes.SHA256()
-            )
-            public.verify(
-                signature,
-                message,
-                padding.PSS(
-                    mgf=padding.MGF1(hashes.SHA256()),
-                    salt_length=padding.PSS.MAX_LENGTH
-                ),
-                hashes.SHA256()
-            )
-            return True
-
-        elif key_type == 'ed25519':
-            private_bytes = base64.b64decode(private_key)
-            public_bytes = base64.b64decode(public_key)
-            private = ed25519.Ed25519PrivateKey.from_private_bytes(private_bytes)
-            public = ed25519.Ed25519PublicKey.from_public_bytes(public_bytes)
-            message = b"test"
-            signature = private.sign(message)
-            public.verify(signature, message)
-            return True
-
-        elif key_type == 'secp256k1':
-            # TODO: Implémenter la vérification secp256k1
-            return True
-
-    except (ValueError, InvalidKey):
+        # Test simple : on signe et vérifie
+        message = b"test"
+        signature = sign_message(load_private_key(private_key, key_type), message)
+        return verify_signature(load_public_key(public_key, key_type), signature, message)
+    except (ValueError, TypeError, InvalidKey):
         return False
-
-    return False
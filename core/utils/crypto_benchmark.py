@@ -0,0 +1,148 @@
+"""Débit des primitives de ``core.utils.crypto`` sur la machine, et conseil de type de clé.
+
+Pour chaque profil (type de clé, et taille pour RSA), mesure le nombre de
+générations de clés, de signatures et de vérifications par seconde, ainsi
+que la taille des signatures et des clés publiques sérialisées. Les
+mesures sont conservées dans le cache Django pendant
+``CRYPTO_BENCHMARK_TIMEOUT`` secondes : l'admin les affiche sans les
+refaire à chaque page (une mesure complète prend quelques secondes, surtout
+pour générer des clés RSA 4096 bits).
+
+Le coût d'un profil est le temps de calcul total par credential émis : une
+signature, plus autant de vérifications que prévu. La génération de clé,
+faite une fois par émetteur, n'y entre pas. Les profils sont classés par
+coût croissant pour le nombre de vérifications attendu par credential.
+
+Les durées sont mesurées par lots (``sample``) : un appel par lot pour
+l'admin, ``count`` appels par lot pour la suite ``signatures`` de
+``python manage.py benchmark``, qui repose sur ``measure_operations``.
+
+Exemple d'utilisation:
+    measures = get_measures(refresh=True)
+    best = advise(measures, verifications=1000)[0]
+"""
+
+import os
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from . import crypto
+
+CACHE_KEY = 'crypto-benchmark'
+
+# Profils mesurés : (type de clé, taille en bits ou None)
+PROFILES = [
+    ('rsa', 2048),
+    ('rsa', 3072),
+    ('rsa', 4096),
+    ('ed25519', None),
+    ('secp256k1', None),
+]
+
+# Opérations mesurées pour chaque profil
+OPERATIONS = ('keygen', 'sign', 'verify')
+
+# Nombre de vérifications par credential émis, par défaut
+DEFAULT_VERIFICATIONS = 100
+
+
+def get_label(key_type, key_size=None):
+    return f'{key_type}-{key_size}' if key_size else key_type
+
+
+def get_backend(key_type):
+    if key_type == 'secp256k1' and crypto.coincurve is not None:
+        return 'coincurve'
+    return 'cryptography'
+
+
+def sample(func, duration, batch_size=1, repeat=1):
+    """
+    Durées (secondes) de lots de ``batch_size`` appels à ``func``, enchaînés
+    pendant ``duration`` secondes et au moins ``repeat`` fois
+    """
+    samples = []
+    start = time.perf_counter()
+    while len(samples) < repeat or time.perf_counter() - start < duration:
+        batch_start = time.perf_counter()
+        for _ in range(batch_size):
+            func()
+        samples.append(time.perf_counter() - batch_start)
+    return samples
+
+
+def rate(samples, batch_size=1):
+    """Opérations par seconde d'après les durées de lots de ``batch_size`` appels"""
+    return batch_size * len(samples) / sum(samples)
+
+
+def measure_operations(key_type, key_size=None, duration=0.2, batch_size=1, repeat=1, operations=OPERATIONS):
+    """
+    Durées des lots de chaque opération d'un profil (``sample``) sur un
+    message de 1 Kio, et tailles de la signature et de la clé publique (octets)
+    """
+    message = os.urandom(1024)
+    private_key, public_key = crypto.generate_key_pair(key_type, key_size or 2048)
+    private = crypto.load_private_key(private_key, key_type)
+    public = crypto.load_public_key(public_key, key_type)
+    signature = crypto.sign_message(private, message)
+    functions = {
+        'keygen': lambda: crypto.generate_key_pair(key_type, key_size or 2048),
+        'sign': lambda: crypto.sign_message(private, message),
+        'verify': lambda: crypto.verify_signature(public, signature, message),
+    }
+    return {
+        'samples': {operation: sample(functions[operation], duration, batch_size, repeat) for operation in operations},
+        'signature_bytes': len(signature),
+        'public_key_bytes': len(public_key),
+    }
+
+
+def measure_profile(key_type, key_size=None, duration=0.2):
+    """Mesures d'un profil : débits (opérations par seconde) et tailles (octets)"""
+    measured = measure_operations(key_type, key_size, duration)
+    return {
+        'label': get_label(key_type, key_size),
+        'key_type': key_type,
+        'key_size': key_size,
+        'backend': get_backend(key_type),
+        **{f'{operation}_per_second': rate(samples) for operation, samples in measured['samples'].items()},
+        'signature_bytes': measured['signature_bytes'],
+        'public_key_bytes': measured['public_key_bytes'],
+    }
+
+
+def run(profiles=None, duration=0.2):
+    """Mesure chaque profil (tous par défaut)"""
+    return [measure_profile(key_type, key_size, duration) for key_type, key_size in profiles or PROFILES]
+
+
+def get_measures(refresh=False):
+    """Mesures en cache (None si absentes) ; ``refresh`` les refait"""
+    if not refresh:
+        return cache.get(CACHE_KEY)
+    measures = run()
+    cache.set(CACHE_KEY, measures, getattr(settings, 'CRYPTO_BENCHMARK_TIMEOUT', 86400))
+    return measures
+
+
+def get_cost(measure, verifications):
+    """Secondes de calcul par credential émis puis vérifié ``verifications`` fois"""
+    return 1 / measure['sign_per_second'] + verifications / measure['verify_per_second']
+
+
+def advise(measures, verifications=DEFAULT_VERIFICATIONS):
+    """
+    Profils classés par coût croissant pour ``verifications`` vérifications
+    par credential émis ; chaque mesure reçoit son ``cost`` (secondes) et son
+    ``relative_cost`` (rapport au meilleur profil).
+    """
+    ranked = sorted(
+        ({**measure, 'cost': get_cost(measure, verifications)} for measure in measures),
+        key=lambda measure: measure['cost']
+    )
+    for measure in ranked:
+        measure['relative_cost'] = measure['cost'] / ranked[0]['cost']
+    return ranked
@@ -0,0 +1,24 @@
+"""Clés primaires reçues des clients (URL, paramètres, corps JSON).
+
+Une valeur invalide est traitée comme un identifiant inconnu, jamais comme
+une erreur : ``str.isdigit`` accepte des chiffres non ASCII (``²``) que
+``int`` refuse, et une clé hors des bornes d'un ``BigAutoField`` fait
+échouer la requête SQL (``OverflowError`` avec SQLite).
+"""
+
+# Plus grande valeur d'un BigAutoField
+MAX_PK = 2 ** 63 - 1
+
+
+def parse_pk(value):
+    """Clé primaire représentée par ``value`` (entier ou chiffres ASCII), None si invalide ou hors bornes"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, str):
+        # La longueur est bornée avant int() : au-delà de 4 300 chiffres, int() lève ValueError
+        if not (value.isascii() and value.isdigit()) or len(value) > len(str(MAX_PK)):
+            return None
+        value = int(value)
+    if not isinstance(value, int) or not 0 < value <= MAX_PK:
+        return None
+    return value
@@ -0,0 +1,154 @@
+"""Canonicalisation JSON (JCS, RFC 8785).
+
+La forme canonique d'un document JSON est unique : clés des objets triées
+par unités de code UTF-16, chaînes échappées au minimum, nombres écrits
+comme le fait ECMAScript (``Number.prototype.toString``), aucun espace, le
+tout encodé en UTF-8. Deux documents égaux donnent les mêmes octets, qui
+peuvent donc être signés.
+
+Dans un lot de credentials, l'Achievement, le Profile de l'émetteur et
+leurs endorsements se répètent d'un document à l'autre. Un ``Canonicalizer``
+mémorise la forme canonique de ces sous-arbres partagés, désignés par une
+clé fournie par l'appelant (par exemple le badge et sa version), et ne
+canonicalise à neuf que les propriétés propres à chaque destinataire.
+
+Exemple d'utilisation:
+    canonicalize({"b": 1, "a": [True, None]})  # b'{"a":[true,null],"b":1}'
+
+    canonicalizer = Canonicalizer()
+    canonicalizer.canonicalize(credential, shared={id(achievement): ('achievement', pk, updated_at)})
+"""
+
+import math
+from collections import OrderedDict
+from json.encoder import encode_basestring
+
+
+def format_number(value):
+    """
+    Écrit un nombre comme ECMAScript (RFC 8785, section 3.2.2.3).
+
+    Les entiers sont d'abord convertis en double IEEE 754, comme en JSON.
+
+    Raises:
+        ValueError: pour NaN, l'infini ou un entier hors de la plage des doubles
+    """
+    try:
+        value = float(value)
+    except OverflowError:
+        raise ValueError(f"Nombre hors de la plage IEEE 754 : {value}")
+    if not math.isfinite(value):
+        raise ValueError(f"Nombre non représentable en JSON : {value}")
+    if value == 0:
+        return '0'
+
+    # repr() donne déjà les chiffres significatifs les plus courts (comme ECMAScript)
+    sign = '-' if value < 0 else ''
+    mantissa, _, exponent = repr(abs(value)).partition('e')
+    integer, _, fraction = mantissa.partition('.')
+    digits = integer + fraction
+    point = len(integer) + int(exponent or 0)
+    stripped = digits.lstrip('0')
+    point -= len(digits) - len(stripped)
+    digits = stripped.rstrip('0')
+
+    # value = 0.digits × 10^point, avec k = len(digits) chiffres significatifs
+    k, n = len(digits), point
+    if k <= n <= 21:
+        return sign + digits + '0' * (n - k)
+    if 0 < n <= 21:
+        return sign + digits[:n] + '.' + digits[n:]
+    if -6 < n <= 0:
+        return sign + '0.' + '0' * -n + digits
+    exponent = f"e{'+' if n > 0 else '-'}{abs(n - 1)}"
+    if k == 1:
+        return sign + digits + exponent
+    return sign + digits[0] + '.' + digits[1:] + exponent
+
+
+def sort_keys(keys):
+    """Trie des clés par unités de code UTF-16 (identique à l'ordre Python pour l'ASCII)"""
+    if all(key.isascii() for key in keys):
+        return sorted(keys)
+    return sorted(keys, key=lambda key: key.encode('utf-16-be'))
+
+
+class Canonicalizer:
+    """
+    Canonicaliseur JCS avec mémoire des sous-arbres partagés.
+
+    ``shared`` associe l'``id()`` d'un objet ou d'une liste du document à
+    une clé stable : la forme canonique est calculée au premier passage
+    puis réutilisée pour tout sous-arbre de même clé. La clé doit changer
+    avec le contenu (version de l'objet source) ; au plus ``maxsize``
+    sous-arbres sont conservés (LRU).
+    """
+
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self.memo = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def canonicalize(self, value, shared=None) -> bytes:
+        """Retourne la forme canonique (UTF-8) de ``value``"""
+        parts = []
+        self.write(value, parts, shared or {})
+        return ''.join(parts).encode()
+
+    def write(self, value, parts, shared):
+        if isinstance(value, str):
+            parts.append(encode_basestring(value))
+        elif value is None:
+            parts.append('null')
+        elif value is True:
+            parts.append('true')
+        elif value is False:
+            parts.append('false')
+        elif isinstance(value, (int, float)):
+            parts.append(format_number(value))
+        elif isinstance(value, (dict, list, tuple)):
+            key = shared.get(id(value)) if shared else None
+            if key is None:
+                self.write_container(value, parts, shared)
+                return
+            text = self.memo.get(key)
+            if text is None:
+                self.misses += 1
+                subtree = []
+                self.write_container(value, subtree, shared)
+                text = self.memo[key] = ''.join(subtree)
+                if len(self.memo) > self.maxsize:
+                    self.memo.popitem(last=False)
+            else:
+                self.hits += 1
+                self.memo.move_to_end(key)
+            parts.append(text)
+        else:
+            raise TypeError(f"Type non sérialisable en JSON : {type(value).__name__}")
+
+    def write_container(self, value, parts, shared):
+        if isinstance(value, dict):
+            for key in value:
+                if not isinstance(key, str):
+                    raise TypeError(f"Clé d'objet JSON non textuelle : {key!r}")
+            parts.append('{')
+            for index, key in enumerate(sort_keys(list(value))):
+                if index:
+                    parts.append(',')
+                parts.append(encode_basestring(key))
+                parts.append(':')
+                self.write(value[key], parts, shared)
+            parts.append('}')
+        else:
+            parts.append('[')
+            for index, item in enumerate(value):
+                if index:
+                    parts.append(',')
+                self.write(item, parts, shared)
+            parts.append(']')
+
+
+def canonicalize(value) -> bytes:
+    """Forme canonique JCS (RFC 8785) d'une valeur JSON, en UTF-8"""
+    return Canonicalizer(maxsize=0).canonicalize(value)
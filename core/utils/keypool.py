@@ -0,0 +1,138 @@
+"""Réserve de paires de clés pré-générées.
+
+Générer une clé RSA 2048 bits prend de quelques dizaines de millisecondes à
+plus d'une seconde : fait pendant la requête, cela bloque l'admin, et
+davantage encore quand de nombreux émetteurs s'inscrivent en même temps.
+La réserve conserve, pour chaque type de clé, jusqu'à ``KEY_POOL_SIZE``
+paires générées à l'avance par un thread d'arrière-plan : ``take`` retire
+une paire prête en temps constant et réveille le thread dès que la réserve
+passe sous ``KEY_POOL_LOW_WATER``. Si la réserve est vide, la paire est
+générée sur place.
+
+Les paires ne vivent qu'en mémoire, dans le processus, et chacune n'est
+remise qu'une seule fois.
+
+Exemple d'utilisation:
+    private_key, public_key = pool.take('rsa')
+"""
+
+import logging
+import threading
+from collections import deque
+
+from django.conf import settings
+
+from .crypto import generate_key_pair
+
+logger = logging.getLogger(__name__)
+
+
+class KeyPool:
+    """Réserve de paires de clés par type, remplie par un thread d'arrière-plan"""
+
+    def __init__(self, size=None, low_water=None, key_types=None, generate=generate_key_pair):
+        self.size = size
+        self.low_water = low_water
+        self.key_types = key_types
+        self.generate = generate
+        self.pairs = {}
+        # Types en cours de remplissage, jusqu'à la taille de la réserve
+        self.refilling = set()
+        self.condition = threading.Condition()
+        self.thread = None
+        self.stopping = False
+        self.hits = 0
+        self.misses = 0
+
+    def get_size(self):
+        return self.size if self.size is not None else getattr(settings, 'KEY_POOL_SIZE', 8)
+
+    def get_low_water(self):
+        return self.low_water if self.low_water is not None else getattr(settings, 'KEY_POOL_LOW_WATER', 2)
+
+    def get_key_types(self):
+        if self.key_types is not None:
+            return self.key_types
+        return getattr(settings, 'KEY_POOL_TYPES', ['rsa', 'ed25519'])
+
+    def start(self):
+        """Démarre le thread de remplissage (sans effet s'il tourne déjà)"""
+        with self.condition:
+            if self.thread is not None and self.thread.is_alive():
+                return
+            self.stopping = False
+            for key_type in self.get_key_types():
+                if len(self.pairs.setdefault(key_type, deque())) < self.get_low_water():
+                    self.refilling.add(key_type)
+            self.thread = threading.Thread(target=self.run, name='key-pool', daemon=True)
+            self.thread.start()
+
+    def stop(self, timeout=None):
+        """Arrête le thread de remplissage après la génération en cours"""
+        with self.condition:
+            self.stopping = True
+            self.condition.notify_all()
+            thread = self.thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def take(self, key_type):
+        """
+        Retourne une paire (clé privée, clé publique) du type demandé.
+
+        Raises:
+            ValueError: si le type de clé n'est pas supporté
+        """
+        if key_type not in self.get_key_types():
+            return generate_key_pair(key_type)
+
+        with self.condition:
+            pairs = self.pairs.setdefault(key_type, deque())
+            pair = pairs.popleft() if pairs else None
+            if pair is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            if len(pairs) < self.get_low_water():
+                self.refilling.add(key_type)
+                self.condition.notify_all()
+        self.start()
+        return pair if pair is not None else self.generate(key_type)
+
+    def available(self, key_type):
+        """Nombre de paires prêtes pour un type de clé"""
+        with self.condition:
+            return len(self.pairs.get(key_type, ()))
+
+    def wait(self, timeout=None):
+        """Attend la fin du remplissage en cours ; retourne False si ``timeout`` est écoulé"""
+        with self.condition:
+            return self.condition.wait_for(lambda: not self.refilling, timeout)
+
+    def run(self):
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self.refilling or self.stopping)
+                if self.stopping:
+                    return
+                key_type = next(iter(self.refilling))
+
+            # La génération se fait hors verrou : take() reste immédiat
+            try:
+                pair = self.generate(key_type)
+            except Exception:
+                logger.exception("Échec de la génération d'une clé %s pour la réserve", key_type)
+                with self.condition:
+                    self.refilling.discard(key_type)
+                    self.condition.notify_all()
+                continue
+
+            with self.condition:
+                pairs = self.pairs.setdefault(key_type, deque())
+                pairs.append(pair)
+                if len(pairs) >= self.get_size():
+                    self.refilling.discard(key_type)
+                    self.condition.notify_all()
+
+
+pool = KeyPool()
@@ -0,0 +1,119 @@
+"""Registre des clés d'émetteurs déjà chargées.
+
+Charger une clé RSA depuis son PEM coûte bien plus cher que la vérification
+d'une signature Ed25519 : chaque clé n'est donc chargée qu'une fois puis
+conservée dans un cache LRU borné, indexé par l'empreinte de la clé
+sérialisée (la clé privée elle-même n'est jamais conservée en clair dans
+l'index). Les chemins de signature et de vérification prennent leurs objets
+clés ici plutôt que de reparser des chaînes.
+
+Une clé modifiée a une nouvelle empreinte : l'ancienne entrée n'est plus
+atteinte et le signal ``post_save`` de ``Issuer`` l'évince aussitôt.
+
+Exemple d'utilisation:
+    public_key = registry.issuer_public_key(issuer)
+    verify_signature(public_key, signature, message)
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+
+from .crypto import load_private_key, load_public_key
+
+
+def fingerprint(key: str, key_type: str) -> str:
+    """Empreinte SHA-256 d'une clé sérialisée et de son type"""
+    return hashlib.sha256(f'{key_type}:{key.strip()}'.encode()).hexdigest()
+
+
+class KeyRegistry:
+    """
+    Cache LRU de clés chargées, sûr entre threads.
+
+    ``hits`` et ``misses`` comptent les accès depuis la création (ou le
+    dernier ``clear``) pour dimensionner ``maxsize``.
+    """
+
+    def __init__(self, maxsize=None):
+        self.maxsize = maxsize
+        self.keys = OrderedDict()
+        # Dernière empreinte chargée pour chaque émetteur, pour l'éviction
+        self.issuers = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_maxsize(self):
+        return self.maxsize or getattr(settings, 'KEY_REGISTRY_SIZE', 256)
+
+    def get(self, key: str, key_type: str, private=False):
+        """
+        Retourne la clé chargée correspondant à ``key``, en la chargeant au besoin.
+
+        Raises:
+            ValueError: si la clé est invalide ou le type non supporté
+        """
+        digest = ('private:' if private else 'public:') + fingerprint(key, key_type)
+        with self.lock:
+            if digest in self.keys:
+                self.hits += 1
+                self.keys.move_to_end(digest)
+                return self.keys[digest]
+            self.misses += 1
+
+        # Le chargement se fait hors verrou : deux threads peuvent charger la
+        # même clé en parallèle, le second écrase simplement le premier
+        loaded = (load_private_key if private else load_public_key)(key, key_type)
+        with self.lock:
+            self.keys[digest] = loaded
+            self.keys.move_to_end(digest)
+            while len(self.keys) > self.get_maxsize():
+                self.keys.popitem(last=False)
+        return loaded
+
+    def public_key(self, key: str, key_type: str):
+        return self.get(key, key_type)
+
+    def private_key(self, key: str, key_type: str):
+        return self.get(key, key_type, private=True)
+
+    def issuer_public_key(self, issuer):
+        """
+        Retourne la clé publique chargée d'un émetteur.
+
+        Raises:
+            ValueError: si l'émetteur n'a pas de clé ou si elle est invalide
+        """
+        if not issuer.public_key or not issuer.key_type:
+            raise ValueError(f"L'émetteur {issuer.pk} n'a pas de clé publique")
+        loaded = self.public_key(issuer.public_key, issuer.key_type)
+        with self.lock:
+            self.issuers[issuer.pk] = 'public:' + fingerprint(issuer.public_key, issuer.key_type)
+        return loaded
+
+    def forget_issuer(self, issuer, deleted=False):
+        """Évince la clé précédemment chargée d'un émetteur si elle a changé (ou s'il est supprimé)"""
+        current = None
+        if not deleted and issuer.public_key and issuer.key_type:
+            current = 'public:' + fingerprint(issuer.public_key, issuer.key_type)
+        with self.lock:
+            previous = self.issuers.get(issuer.pk)
+            if previous is None or previous == current:
+                return
+            self.keys.pop(previous, None)
+            del self.issuers[issuer.pk]
+
+    def clear(self):
+        with self.lock:
+            self.keys.clear()
+            self.issuers.clear()
+            self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self.keys)
+
+
+registry = KeyRegistry()
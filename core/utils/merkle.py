@@ -0,0 +1,111 @@
+"""Arbres de Merkle pour la signature groupée d'une cohorte de credentials.
+
+Au lieu d'une signature par credential, l'émetteur signe une seule racine :
+celle de l'arbre dont les feuilles sont les empreintes des credentials sous
+forme canonique. Chaque credential porte son chemin d'inclusion (les
+empreintes sœurs, de la feuille à la racine) ; le vérifier revient à
+recalculer la racine en O(log n) puis à contrôler sa signature, commune à
+toute la cohorte.
+
+Les feuilles et les nœuds sont hachés avec des préfixes distincts (RFC 6962)
+et un nœud sans voisin remonte tel quel au niveau supérieur, sans être
+dupliqué. La racine est signée précédée de ``ROOT_PREFIX`` : la signature
+d'une racine ne peut pas passer pour celle d'un credential.
+
+Un chemin est une liste de chaînes : ``l`` ou ``r`` (position de
+l'empreinte sœur, à gauche ou à droite) suivi de l'empreinte en base64url.
+
+Exemple d'utilisation:
+    root, paths = build_tree([leaf_hash(payload) for payload in payloads])
+    signature = sign_message(key, root_message(root))
+    assert root_from_path(leaf_hash(payloads[0]), paths[0]) == root
+"""
+
+import base64
+import hashlib
+
+ROOT_PREFIX = b'openbadges-merkle-root:'
+
+
+def leaf_hash(payload: bytes) -> bytes:
+    return hashlib.sha256(b'\x00' + payload).digest()
+
+
+def node_hash(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(b'\x01' + left + right).digest()
+
+
+def root_message(root: bytes) -> bytes:
+    """Message signé pour une racine"""
+    return ROOT_PREFIX + root
+
+
+def encode_step(side: str, digest: bytes) -> str:
+    return side + base64.urlsafe_b64encode(digest).rstrip(b'=').decode()
+
+
+def decode_step(step: str):
+    """
+    Retourne ``(côté, empreinte)`` d'une étape de chemin.
+
+    Raises:
+        ValueError: si l'étape est mal formée
+    """
+    if not isinstance(step, str) or step[:1] not in ('l', 'r'):
+        raise ValueError("Étape de chemin Merkle invalide")
+    try:
+        digest = base64.urlsafe_b64decode(step[1:] + '=' * (-len(step[1:]) % 4))
+    except (ValueError, TypeError):
+        raise ValueError("Étape de chemin Merkle invalide")
+    if len(digest) != hashlib.sha256().digest_size:
+        raise ValueError("Étape de chemin Merkle invalide")
+    return step[0], digest
+
+
+def build_tree(leaves):
+    """
+    Construit l'arbre des feuilles données.
+
+    Retourne la racine et, pour chaque feuille dans l'ordre, son chemin
+    d'inclusion.
+
+    Raises:
+        ValueError: si aucune feuille n'est fournie
+    """
+    if not leaves:
+        raise ValueError("Un arbre de Merkle demande au moins une feuille")
+    levels = [list(leaves)]
+    while len(levels[-1]) > 1:
+        level = levels[-1]
+        parents = [node_hash(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            parents.append(level[-1])
+        levels.append(parents)
+
+    paths = []
+    for index in range(len(leaves)):
+        path = []
+        position = index
+        for level in levels[:-1]:
+            sibling = position ^ 1
+            if sibling < len(level):
+                path.append(encode_step('l' if sibling < position else 'r', level[sibling]))
+            position //= 2
+        paths.append(path)
+    return levels[-1][0], paths
+
+
+def root_from_path(leaf: bytes, path) -> bytes:
+    """
+    Recalcule la racine à partir d'une feuille et de son chemin.
+
+    Raises:
+        ValueError: si le chemin est mal formé
+    """
+    if not isinstance(path, list):
+        raise ValueError("Chemin Merkle invalide")
+    node = leaf
+    for step in path:
+        side, digest = decode_step(step)
+        node = node_hash(digest, node) if side == 'l' else node_hash(node, digest)
+    return node
@@ -0,0 +1,158 @@
+"""Signature et vérification en masse : forme canonique et pools de processus.
+
+Ce module n'importe aucun modèle Django : les processus des pools le
+chargent seul, y compris avec la méthode de démarrage ``spawn`` (macOS,
+Windows). Chaque processus charge une clé une seule fois : la clé privée à
+son démarrage, les clés publiques dans son propre registre.
+
+Les signatures RSA et, sans ``coincurve``, secp256k1 sont coûteuses (de
+l'ordre de la milliseconde) et sont réparties sur ``workers`` processus. Une signature Ed25519 coûte moins
+cher que l'envoi du message à un autre processus : elle est faite sur place.
+
+Exemple d'utilisation:
+    with Signer(private_key, 'rsa') as signer:
+        signatures = signer.sign([canonicalize(document) for document in documents])
+"""
+
+import base64
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from .crypto import load_private_key, sign_message, verify_signature
+from .jcs import canonicalize
+from .keys import KeyRegistry, registry
+
+# Types de clés signés dans le pool de processus
+POOL_KEY_TYPES = {'rsa', 'secp256k1'}
+
+# Nombre minimal de signatures confiées à un processus de vérification
+VERIFY_CHUNK_SIZE = 64
+
+# Clé privée chargée d'un processus du pool de signature
+_worker_key = None
+
+# Clés publiques chargées d'un processus du pool de vérification
+_worker_registry = KeyRegistry(maxsize=256)
+
+
+def encode_signature(signature: bytes) -> str:
+    """Encode une signature en base64url sans remplissage"""
+    return base64.urlsafe_b64encode(signature).rstrip(b'=').decode()
+
+
+def decode_signature(value: str) -> bytes:
+    """Décode une signature encodée par ``encode_signature``"""
+    return base64.urlsafe_b64decode(value + '=' * (-len(value) % 4))
+
+
+def _init_worker(private_key, key_type):
+    global _worker_key
+    _worker_key = load_private_key(private_key, key_type)
+
+
+def _sign_chunk(messages):
+    return [encode_signature(sign_message(_worker_key, message)) for message in messages]
+
+
+class Signer:
+    """
+    Signe des messages avec une clé privée, sur place ou dans un pool de processus.
+
+    ``workers`` vaut par défaut le nombre de processeurs de la machine ; avec
+    un seul worker (ou une clé Ed25519), aucun processus n'est créé.
+    """
+
+    def __init__(self, private_key: str, key_type: str, workers=None):
+        self.key = load_private_key(private_key, key_type)
+        self.workers = workers or os.cpu_count() or 1
+        self.executor = None
+        if self.workers > 1 and key_type in POOL_KEY_TYPES:
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(private_key, key_type)
+            )
+
+    def submit(self, messages):
+        """
+        Lance la signature d'un lot et retourne un callable donnant ses signatures.
+
+        Dans le pool, le lot est découpé en une part par processus : l'appelant
+        peut préparer le lot suivant pendant la signature.
+        """
+        if self.executor is None:
+            signatures = [encode_signature(sign_message(self.key, message)) for message in messages]
+            return lambda: signatures
+        size = -(-len(messages) // self.workers)
+        futures = [
+            self.executor.submit(_sign_chunk, messages[start:start + size])
+            for start in range(0, len(messages), size)
+        ]
+        return lambda: [signature for future in futures for signature in future.result()]
+
+    def sign(self, messages):
+        """Signe une liste de messages et retourne leurs signatures encodées, dans l'ordre"""
+        return self.submit(messages)()
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def verify_items(public_key, items):
+    """Vérifie des couples (signature encodée, message) avec une clé publique chargée"""
+    results = []
+    for signature, message in items:
+        try:
+            results.append(verify_signature(public_key, decode_signature(signature), message))
+        except (ValueError, TypeError):
+            results.append(False)
+    return results
+
+
+def _verify_chunk(public_key, key_type, items):
+    return verify_items(_worker_registry.public_key(public_key, key_type), items)
+
+
+class Verifier:
+    """
+    Vérifie des signatures groupées par clé publique.
+
+    Chaque groupe ``(clé publique, type, [(signature, message), ...])`` est
+    découpé en lots d'au moins ``VERIFY_CHUNK_SIZE`` signatures, vérifiés en
+    parallèle sur ``workers`` processus. Sans pool, ou pour une demande trop
+    petite pour le justifier, les clés sont prises dans le registre partagé
+    et les signatures vérifiées sur place.
+    """
+
+    def __init__(self, workers=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.executor = ProcessPoolExecutor(max_workers=self.workers) if self.workers > 1 else None
+
+    def verify(self, groups):
+        """Retourne, pour chaque groupe, la liste des résultats (booléens) dans l'ordre"""
+        total = sum(len(items) for _, _, items in groups)
+        if self.executor is None or total < 2 * VERIFY_CHUNK_SIZE:
+            return [verify_items(registry.public_key(key, key_type), items) for key, key_type, items in groups]
+
+        size = max(VERIFY_CHUNK_SIZE, -(-total // self.workers))
+        futures = [
+            [
+                self.executor.submit(_verify_chunk, key, key_type, items[start:start + size])
+                for start in range(0, len(items), size)
+            ]
+            for key, key_type, items in groups
+        ]
+        return [[result for future in chunks for result in future.result()] for chunks in futures]
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
@@ -0,0 +1,280 @@
+"""Vérification en masse d'OpenBadgeCredentials signés.
+
+Pour un lot de credentials (tels que servis par l'API, avec leur ``proof``) :
+
+* les assertions et les émetteurs concernés sont lus en deux requêtes,
+  quelle que soit la taille du lot ;
+* les signatures sont regroupées par clé d'émetteur et vérifiées en
+  parallèle (``core.utils.signing.Verifier``), chaque clé publique n'étant
+  chargée qu'une fois ;
+* pour un credential signé avec sa cohorte (``merkleProof``), la racine
+  de l'arbre est recalculée depuis le credential et son chemin, et la
+  signature de chaque racine n'est vérifiée qu'une fois ;
+* l'expiration (``expires`` / ``expires_at``) est contrôlée d'après la
+  base ; la révocation d'après la liste de statut désignée par le
+  ``credentialStatus`` du credential (``core.status_list``), lue en une
+  requête pour tous les émetteurs, ou à défaut d'après ``Assertion.revoked``.
+
+Chaque credential reçoit un verdict détaillant les contrôles et, en cas
+d'échec, les raisons. Les verdicts sont conservés dans le cache
+(``core.verification_cache``) : un credential déjà vérifié ne coûte ni
+requête d'assertion ni vérification de signature.
+
+Exemple d'utilisation:
+    verdicts = verify_credentials([credential, ...])
+"""
+
+from datetime import timezone as dt_timezone
+from urllib.parse import urlparse
+
+from django.conf import settings
+from django.db.models import Q
+from django.urls import Resolver404, resolve
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import verification_cache
+from .models import Issuer, Assertion, StatusList
+from .signing import signing_payload
+from .status_list import get_bit, get_entry
+from .utils import merkle
+from .utils.ids import parse_pk
+from .utils.jcs import canonicalize
+from .utils.keys import registry
+from .utils.signing import Verifier
+
+_verifier = None
+
+
+def get_verifier():
+    """Retourne le vérificateur partagé, créé au premier usage (``VERIFY_WORKERS`` processus)"""
+    global _verifier
+    if _verifier is None:
+        _verifier = Verifier(workers=getattr(settings, 'VERIFY_WORKERS', None))
+    return _verifier
+
+
+def get_issuer_pk(url):
+    """Retourne la clé primaire de l'émetteur d'une URL de Profile (/api/v3/issuers/{id}/), ou None"""
+    if not isinstance(url, str):
+        return None
+    try:
+        match = resolve(urlparse(url).path)
+    except Resolver404:
+        return None
+    if match.view_name != 'core:issuers-detail':
+        return None
+    return parse_pk(match.kwargs['pk'])
+
+
+def get_expiration(credential, assertion):
+    """
+    Date d'expiration d'après la base, ou d'après le document pour un
+    credential inconnu. Une date sans fuseau est lue en UTC ; lève
+    ``ValueError`` si ``expirationDate`` n'est pas une date valide.
+    """
+    if assertion is not None:
+        return assertion.expires or assertion.expires_at
+    value = credential.get('expirationDate')
+    if value is None:
+        return None
+    # parse_datetime retourne None pour un format inconnu, lève ValueError pour une date impossible
+    expiration = parse_datetime(value) if isinstance(value, str) else None
+    if expiration is None:
+        raise ValueError(value)
+    if timezone.is_naive(expiration):
+        expiration = timezone.make_aware(expiration, dt_timezone.utc)
+    return expiration
+
+
+def is_revoked(assertion, entry, bitstrings):
+    """Bit de la liste de statut désignée par ``entry`` si elle est connue, sinon ``Assertion.revoked``"""
+    if entry is not None and entry[0] in bitstrings:
+        return get_bit(bitstrings[entry[0]], entry[1])
+    return assertion.revoked
+
+
+class Verdict:
+    """Résultat de la vérification d'un credential"""
+
+    def __init__(self, credential):
+        self.id = credential.get('id') if isinstance(credential, dict) else None
+        self.checks = {'signature': False, 'expiry': False, 'revocation': False}
+        self.reasons = []
+
+    def fail(self, check, reason):
+        self.checks[check] = False
+        self.reasons.append(reason)
+
+    def as_dict(self):
+        return {
+            'id': self.id,
+            'verified': all(self.checks.values()),
+            'checks': self.checks,
+            'reasons': self.reasons,
+        }
+
+
+def check_signatures(groups):
+    """
+    Vérifie les signatures regroupées par clé et retourne l'ensemble des
+    triplets ``(clé, signature, message)`` valides.
+
+    Chaque couple (signature, message) n'est vérifié qu'une fois : les
+    membres d'une cohorte partagent la signature de leur racine. Les
+    racines déjà vérifiées sont lues dans le cache.
+    """
+    unique = {
+        group: list(dict.fromkeys((signature, message) for _, signature, message in items))
+        for group, items in groups.items()
+    }
+    root_keys = {
+        (group, signature, message): verification_cache.make_root_key(*group, signature, message)
+        for group, pairs in unique.items()
+        for signature, message in pairs if message.startswith(merkle.ROOT_PREFIX)
+    }
+    known = verification_cache.get_roots(list(root_keys.values()))
+    valid = {triple for triple, key in root_keys.items() if key in known}
+
+    pending = {group: [pair for pair in pairs if (group, *pair) not in valid] for group, pairs in unique.items()}
+    checked = get_verifier().verify([(key, key_type, pairs) for (key, key_type), pairs in pending.items()])
+    for (group, pairs), results in zip(pending.items(), checked):
+        valid.update((group, *pair) for pair, is_valid in zip(pairs, results) if is_valid)
+
+    verification_cache.store_roots([key for triple, key in root_keys.items() if triple in valid and key not in known])
+    return valid
+
+
+def verify_credentials(credentials, now=None):
+    """
+    Vérifie une liste de credentials et retourne un verdict (dictionnaire) par credential, dans l'ordre.
+
+    Un credential est vérifié si sa signature est valide pour la clé de
+    l'émetteur qui l'a émis, s'il n'a pas expiré et s'il correspond à une
+    assertion connue et non révoquée. Les verdicts des credentials signés
+    par un émetteur connu sont mis en cache (``core.verification_cache``).
+    """
+    now = now or timezone.now()
+    verdicts = [Verdict(credential) for credential in credentials]
+
+    proofs = [credential.get('proof') if isinstance(credential, dict) else None for credential in credentials]
+    issuer_pks = {
+        get_issuer_pk(proof.get('verificationMethod'))
+        for proof in proofs if isinstance(proof, dict)
+    }
+    issuers = Issuer.objects.in_bulk([pk for pk in issuer_pks if pk is not None])
+
+    # Verdicts en cache : seuls les credentials d'un émetteur doté d'une clé ont une clé de cache
+    generations = verification_cache.get_generations(
+        [pk for pk, issuer in issuers.items() if issuer.public_key and issuer.key_type]
+    )
+    payloads = {}
+    cache_keys = {}
+    for index, (credential, proof) in enumerate(zip(credentials, proofs)):
+        issuer = issuers.get(get_issuer_pk(proof.get('verificationMethod'))) if isinstance(proof, dict) else None
+        if issuer is None or issuer.pk not in generations:
+            continue
+        try:
+            payloads[index] = signing_payload(credential)
+            credential_digest = verification_cache.digest(payloads[index], canonicalize(proof))
+        except ValueError:
+            # Nombre non représentable (1e400 est lu comme l'infini) : vérifié, et refusé, plus bas
+            continue
+        cache_keys[index] = verification_cache.make_key(issuer, generations[issuer.pk], credential_digest)
+    cached = verification_cache.get_verdicts(list(cache_keys.values()))
+    results = {index: cached[key] for index, key in cache_keys.items() if key in cached}
+    pending = [index for index in range(len(credentials)) if index not in results]
+
+    identifiers = {verdicts[index].id for index in pending if isinstance(verdicts[index].id, str)}
+    assertions = {}
+    if identifiers:
+        for assertion in Assertion.objects.select_related('badge_class').filter(
+            Q(credential_id__in=identifiers) | Q(identifier__in=identifiers)
+        ):
+            for key in (assertion.credential_id, assertion.identifier):
+                if key:
+                    assertions[key] = assertion
+
+    entries = {index: get_entry(credentials[index]) for index in pending}
+    list_issuers = {entry[0] for entry in entries.values() if entry is not None}
+    bitstrings = dict(
+        StatusList.objects.filter(issuer_id__in=list_issuers).values_list('issuer_id', 'bitstring')
+    ) if list_issuers else {}
+
+    # Signatures regroupées par clé d'émetteur : (clé, type) -> [(index, signature, message)]
+    groups = {}
+    # Durée de conservation des verdicts, bornée par l'expiration du credential
+    timeouts = {}
+    for index in pending:
+        credential, proof, verdict = credentials[index], proofs[index], verdicts[index]
+        if not isinstance(credential, dict):
+            verdict.fail('signature', "Le credential n'est pas un objet JSON")
+            continue
+        # Un identifiant non textuel (liste, objet) ne désigne aucune assertion
+        assertion = assertions.get(verdict.id) if isinstance(verdict.id, str) else None
+
+        timeouts[index] = verification_cache.get_timeout()
+        try:
+            expiration = get_expiration(credential, assertion)
+        except ValueError:
+            verdict.fail('expiry', "Date d'expiration invalide")
+        else:
+            if expiration is not None and expiration <= now:
+                verdict.fail('expiry', f"Credential expiré le {expiration.isoformat()}")
+            else:
+                verdict.checks['expiry'] = True
+                if expiration is not None:
+                    timeouts[index] = min(timeouts[index], int((expiration - now).total_seconds()))
+
+        if assertion is None:
+            verdict.fail('revocation', "Credential inconnu de cette plateforme")
+        elif is_revoked(assertion, entries[index], bitstrings):
+            verdict.fail('revocation', f"Credential révoqué : {assertion.revocation_reason}".rstrip(' :'))
+        else:
+            verdict.checks['revocation'] = True
+
+        if not isinstance(proof, dict) or not isinstance(proof.get('proofValue'), str):
+            verdict.fail('signature', "Credential non signé")
+            continue
+        issuer = issuers.get(get_issuer_pk(proof.get('verificationMethod')))
+        if issuer is None:
+            verdict.fail('signature', "Émetteur de la signature inconnu")
+            continue
+        claimed_issuer = credential.get('issuer')
+        if isinstance(claimed_issuer, dict):
+            claimed_issuer = claimed_issuer.get('id')
+        if claimed_issuer != proof['verificationMethod'] or (assertion and assertion.badge_class.issuer_id != issuer.pk):
+            verdict.fail('signature', "La signature n'est pas celle de l'émetteur du credential")
+            continue
+        try:
+            registry.issuer_public_key(issuer)
+        except ValueError:
+            verdict.fail('signature', "L'émetteur n'a pas de clé publique valide")
+            continue
+        try:
+            message = payloads.get(index) or signing_payload(credential)
+        except ValueError:
+            verdict.fail('signature', "Credential non représentable en JSON canonique")
+            continue
+        if 'merkleProof' in proof:
+            # Credential d'une cohorte : la signature porte sur la racine de l'arbre
+            try:
+                message = merkle.root_message(merkle.root_from_path(merkle.leaf_hash(message), proof['merkleProof']))
+            except ValueError:
+                verdict.fail('signature', "Chemin Merkle invalide")
+                continue
+        groups.setdefault((issuer.public_key, issuer.key_type), []).append((index, proof['proofValue'], message))
+
+    valid = check_signatures(groups)
+    for group, items in groups.items():
+        for index, signature, message in items:
+            if (group, signature, message) in valid:
+                verdicts[index].checks['signature'] = True
+            else:
+                verdicts[index].fail('signature', "Signature invalide")
+
+    verification_cache.store_verdicts([
+        (cache_keys[index], verdicts[index].as_dict(), timeouts[index])
+        for index in pending if index in cache_keys
+    ])
+    return [results[index] if index in results else verdicts[index].as_dict() for index in range(len(credentials))]
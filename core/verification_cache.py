@@ -0,0 +1,154 @@
+"""Cache des verdicts de vérification (``core.verification``).
+
+Un même credential est souvent vérifié de nombreuses fois (plateformes de
+recrutement qui recontrôlent les portefeuilles des candidats) : le verdict
+est conservé dans le cache Django pendant ``VERIFY_CACHE_TIMEOUT`` secondes,
+sans dépasser l'expiration du credential.
+
+La clé d'un verdict combine :
+
+* l'empreinte SHA-256 de la forme canonique du credential (avec sa preuve) ;
+* l'empreinte de la clé publique de l'émetteur : une rotation de clé rend
+  les anciens verdicts inaccessibles ;
+* une génération propre à l'émetteur, renouvelée par signaux dès qu'une de
+  ses assertions (révocation, expiration) ou l'émetteur lui-même change.
+
+Les signatures de racines de cohortes (``core.utils.merkle``) valides sont
+aussi retenues, par empreinte de clé : une racine partagée par des
+milliers de credentials n'est vérifiée qu'une fois.
+
+Verdicts, générations et compteurs ``hits`` / ``misses`` sont tenus dans
+le cache ``VERIFY_CACHE_ALIAS``, qui doit être partagé par tous les
+processus (``DatabaseCache``, Redis, Memcached) : une révocation traitée
+par un processus doit invalider les verdicts de tous les autres. Sur un
+cache propre au processus (``LocMemCache``), les verdicts ne sont pas mis
+en cache du tout.
+
+Les générations sont des jetons aléatoires : une génération évincée du
+cache est remplacée par un nouveau jeton, jamais par une valeur déjà
+utilisée. ``python manage.py verification_cache`` affiche les compteurs.
+"""
+
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+
+from .utils.keys import fingerprint
+
+GENERATION_KEY = 'verification:generation:{}'
+STATS_KEYS = {'hits': 'verification:hits', 'misses': 'verification:misses'}
+
+
+def get_cache():
+    """Cache partagé des verdicts, ou None si le cache configuré est propre au processus"""
+    cache = caches[getattr(settings, 'VERIFY_CACHE_ALIAS', 'default')]
+    return None if isinstance(cache, LocMemCache) else cache
+
+
+def get_timeout():
+    return getattr(settings, 'VERIFY_CACHE_TIMEOUT', 300)
+
+
+def digest(payload, proof_payload) -> str:
+    """Empreinte d'un credential à partir de ses formes canoniques (sans ``proof``, puis ``proof``)"""
+    return hashlib.sha256(payload + b'\x00' + proof_payload).hexdigest()
+
+
+def get_generations(issuer_pks):
+    """Génération courante de chaque émetteur, créée au besoin ; vide sans cache partagé"""
+    cache = get_cache()
+    if cache is None:
+        return {}
+    keys = {pk: GENERATION_KEY.format(pk) for pk in issuer_pks}
+    found = cache.get_many(keys.values())
+    generations = {}
+    missing = {}
+    for pk, key in keys.items():
+        if key in found:
+            generations[pk] = found[key]
+        else:
+            generations[pk] = missing[key] = uuid.uuid4().hex
+    if missing:
+        cache.set_many(missing, None)
+    return generations
+
+
+def make_key(issuer, generation, credential_digest):
+    key_fingerprint = fingerprint(issuer.public_key, issuer.key_type)
+    return f'verification:{issuer.pk}:{generation}:{key_fingerprint}:{credential_digest}'
+
+
+def get_verdicts(keys):
+    """Verdicts en cache pour une liste de clés : dictionnaire clé -> verdict"""
+    found = get_cache().get_many(keys) if keys else {}
+    record(hits=len(found), misses=len(keys) - len(found))
+    return found
+
+
+def store_verdicts(entries):
+    """Enregistre des couples ``(clé, verdict, durée)`` ; une durée nulle n'est pas conservée"""
+    cache = get_cache()
+    default, bounded = {}, []
+    for key, verdict, timeout in entries:
+        if timeout == get_timeout():
+            default[key] = verdict
+        elif timeout > 0:
+            bounded.append((key, verdict, timeout))
+    if default:
+        cache.set_many(default, get_timeout())
+    for key, verdict, timeout in bounded:
+        cache.set(key, verdict, timeout)
+
+
+def make_root_key(public_key, key_type, signature, message):
+    """Clé d'une signature de racine Merkle vérifiée, pour une clé publique donnée"""
+    signed = hashlib.sha256(signature.encode() + b'\x00' + message).hexdigest()
+    return f'verification:root:{fingerprint(public_key, key_type)}:{signed}'
+
+
+def get_roots(keys):
+    """Parmi ``keys``, celles des signatures de racines déjà vérifiées"""
+    cache = get_cache()
+    return set(cache.get_many(keys)) if keys and cache is not None else set()
+
+
+def store_roots(keys):
+    """Retient des signatures de racines valides"""
+    cache = get_cache()
+    if keys and cache is not None:
+        cache.set_many({key: True for key in keys}, get_timeout())
+
+
+def invalidate(issuer_pk):
+    """Rend obsolètes les verdicts des credentials d'un émetteur"""
+    cache = get_cache()
+    if cache is not None:
+        cache.set(GENERATION_KEY.format(issuer_pk), uuid.uuid4().hex, None)
+
+
+def record(hits=0, misses=0):
+    cache = get_cache()
+    if cache is None:
+        return
+    for name, count in (('hits', hits), ('misses', misses)):
+        if count:
+            try:
+                cache.incr(STATS_KEYS[name], count)
+            except ValueError:
+                cache.set(STATS_KEYS[name], count, None)
+
+
+def get_stats():
+    """Compteurs ``hits`` et ``misses`` depuis la dernière remise à zéro"""
+    cache = get_cache()
+    values = cache.get_many(STATS_KEYS.values()) if cache is not None else {}
+    return {name: values.get(key, 0) for name, key in STATS_KEYS.items()}
+
+
+def reset_stats():
+    cache = get_cache()
+    if cache is not None:
+        cache.delete_many(STATS_KEYS.values())
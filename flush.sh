@@ -10,6 +10,7 @@ touch core/migrations/__init__.py
 
 poetry run python manage.py makemigrations
 poetry run python manage.py migrate
+poetry run python manage.py createcachetable
 
 poetry run python manage.py loaddata fixtures/badges.json
 poetry run coverage run manage.py test core.tests -v 2
\ No newline at end of file